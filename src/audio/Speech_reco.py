@@ -1,27 +1,967 @@
+#!/usr/bin/env python3
+"""
+SpeechSession class for recognizing speech from the microphone
+Part of the audio module
+
+A session opens the microphone and calibrates the recognizer's energy
+threshold once, then keeps both for every turn, so a turn starts listening
+immediately instead of after a second of calibration. A background thread
+re-calibrates right after a turn ends, once the re-calibration interval has
+passed or sooner when the noise measured while listening has drifted far
+from the calibration. It never samples while a turn waits for speech: the
+next turn's prompt is only shown once any re-calibration has finished.
+
+listen_forever() keeps capturing while earlier utterances are still being
+recognized: Recognizer.listen_in_background captures on its own thread and
+hands each utterance to a recognition thread pool, and the transcripts are
+yielded in the order they were spoken.
+
+VoiceActivityDetector classifies 20 ms frames as speech or not from their
+energy and zero-crossing rate with NumPy. Sessions use it to stop capturing
+after a shorter pause than the recognizer's pause_threshold and to cut
+leading, trailing and long inner silences before uploading. Run this module
+with "bench" to measure the savings on WAV recordings (synthetic ones are
+generated when no files are given), from capture alone and end to end,
+capture plus recognition with the given backend:
+
+    python -m audio.Speech_reco bench [--backend vosk] [recording.wav ...]
+
+Recognition goes through a backend from audio.stt_backends, chosen per
+session: Google online (the default), or Vosk and PocketSphinx offline. When
+Google can't be reached the fallback backend is tried. With Vosk, listen_once()
+reports partial hypotheses while the user is still speaking.
+"""
+
+import asyncio
+import atexit
+import collections
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
 import speech_recognition as sr
 
+from audio.stt_backends import RecognitionBackend, RecognitionStream, default_backends
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class _OpenSource(sr.AudioSource):
+    """
+    An already open source, for APIs that open their source themselves
+
+    listen_in_background() enters its source, which would open the
+    microphone a second time; entering this wrapper reuses the session's
+    stream and leaving it keeps the stream open.
+    """
+
+    def __init__(self, source: sr.AudioSource):
+        self.source = source
+        self.stream = source.stream
+        self.CHUNK = source.CHUNK
+        self.SAMPLE_RATE = source.SAMPLE_RATE
+        self.SAMPLE_WIDTH = source.SAMPLE_WIDTH
+
+    def __enter__(self) -> sr.AudioSource:
+        return self.source
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+class _RecordingStream:
+    """Audio stream wrapper keeping a copy of what is read from it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.chunks = []
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.chunks.append(data)
+        return data
+
+
+class VoiceActivityDetector:
+    """Energy and zero-crossing voice activity detection over fixed-size frames"""
+
+    def __init__(self, frame_ms: int = 20, energy_ratio: float = 3.0, min_energy: float = 100.0,
+                 fricative_ratio: float = 0.5, zcr_threshold: float = 0.25, padding_ms: int = 200,
+                 max_pause_ms: int = 300, end_silence_ms: int = 500, min_speech_ms: int = 100):
+        """
+        Initialize the detector
+
+        Args:
+            frame_ms (int): Frame length in milliseconds
+            energy_ratio (float): Speech energy relative to the noise floor when no threshold is given
+            min_energy (float): Lowest RMS energy (16-bit scale) that can count as speech
+            fricative_ratio (float): Share of the energy threshold above which frames with a high
+                zero-crossing rate (s, sh, f) still count as speech
+            zcr_threshold (float): Zero crossings per sample marking a fricative frame
+            padding_ms (int): Audio kept before and after speech so word edges aren't clipped
+            max_pause_ms (int): Longest pause kept inside an utterance; longer ones are shortened
+            end_silence_ms (int): Silence after speech that ends a capture
+            min_speech_ms (int): Speech needed before a capture counts as an utterance
+        """
+        if np is None:
+            raise ImportError("VoiceActivityDetector needs numpy: pip install numpy")
+        self.frame_ms = frame_ms
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.fricative_ratio = fricative_ratio
+        self.zcr_threshold = zcr_threshold
+        self.padding_ms = padding_ms
+        self.max_pause_ms = max_pause_ms
+        self.end_silence_ms = end_silence_ms
+        self.min_speech_ms = min_speech_ms
+        # Ambient noise measured by the last listen(), see measure_noise()
+        self.noise_floor: Optional[float] = None
+
+    def frame_size(self, sample_rate: int) -> int:
+        """Samples per frame at a sample rate"""
+        return max(1, sample_rate * self.frame_ms // 1000)
+
+    def frame_features(self, data: bytes, sample_rate: int,
+                       sample_width: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Measure each whole frame of raw audio
+
+        Args:
+            data (bytes): Mono PCM audio
+            sample_rate (int): Samples per second
+            sample_width (int): Bytes per sample
+
+        Returns:
+            tuple: RMS energy (16-bit scale) and zero crossings per sample of each frame
+        """
+        if sample_width != 2:
+            data = sr.AudioData(data, sample_rate, sample_width).get_raw_data(convert_width=2)
+        size = self.frame_size(sample_rate)
+        count = len(data) // (2 * size)
+        frames = np.frombuffer(data, dtype='<i2', count=count * size).reshape(count, size).astype(np.float64)
+        energy = np.sqrt(np.mean(frames * frames, axis=1)) if count else np.zeros(0)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / size
+        return energy, zcr
+
+    def measure_noise(self, data: bytes, sample_rate: int, sample_width: int) -> Optional[float]:
+        """
+        Estimate the ambient noise in raw audio
+
+        Args:
+            data (bytes): Mono PCM audio
+            sample_rate (int): Samples per second
+            sample_width (int): Bytes per sample
+
+        Returns:
+            float: 10th-percentile frame energy in the audio's own sample width, the scale of
+                Recognizer.energy_threshold; None for audio shorter than a frame
+        """
+        energy, _ = self.frame_features(data, sample_rate, sample_width)
+        return self._noise_level(energy, sample_width)
+
+    @staticmethod
+    def _noise_level(energy: 'np.ndarray', sample_width: int) -> Optional[float]:
+        if len(energy) == 0:
+            return None
+        return float(np.percentile(energy, 10)) / 2.0 ** (16 - 8 * sample_width)
+
+    def speech_frames(self, data: bytes, sample_rate: int, sample_width: int,
+                      energy_threshold: Optional[float] = None) -> 'np.ndarray':
+        """
+        Classify each whole frame of raw audio as speech or not
+
+        Args:
+            data (bytes): Mono PCM audio
+            sample_rate (int): Samples per second
+            sample_width (int): Bytes per sample
+            energy_threshold (float, optional): RMS energy of speech in the audio's own sample
+                width, e.g. Recognizer.energy_threshold. Estimated from the quietest frames if None
+
+        Returns:
+            numpy.ndarray: True for each speech frame
+        """
+        energy, zcr = self.frame_features(data, sample_rate, sample_width)
+        return self._classify(energy, zcr, sample_width, energy_threshold)
+
+    def _classify(self, energy: 'np.ndarray', zcr: 'np.ndarray', sample_width: int,
+                  energy_threshold: Optional[float]) -> 'np.ndarray':
+        """Speech flags from frame features"""
+        if len(energy) == 0:
+            return np.zeros(0, dtype=bool)
+        if energy_threshold is None:
+            threshold = max(self.min_energy, float(np.percentile(energy, 10)) * self.energy_ratio)
+        else:
+            # Scale to the 16-bit samples the energy is measured on
+            threshold = max(self.min_energy, energy_threshold * 2.0 ** (16 - 8 * sample_width))
+        return (energy > threshold) | ((energy > threshold * self.fricative_ratio) & (zcr > self.zcr_threshold))
+
+    def keep_frames(self, speech: 'np.ndarray') -> 'np.ndarray':
+        """
+        Frames to keep: speech with padding, and inner pauses up to max_pause_ms
+
+        Args:
+            speech (numpy.ndarray): Speech flag per frame, from speech_frames()
+
+        Returns:
+            numpy.ndarray: True for each frame to keep; all False when there is no speech
+        """
+        count = len(speech)
+        if not speech.any():
+            return np.zeros(count, dtype=bool)
+
+        # Pad speech on both sides by dilating the mask
+        pad = self.padding_ms // self.frame_ms
+        window = np.ones(2 * pad + 1, dtype=np.int64)
+        padded = np.convolve(speech.astype(np.int64), window, mode='same') > 0
+
+        # Keep the first max_pause_ms of every gap between padded speech,
+        # nothing before the first speech and nothing after the last
+        index = np.arange(count)
+        last = np.maximum.accumulate(np.where(padded, index, -1))
+        keep = padded | ((last >= 0) & (index - last <= self.max_pause_ms // self.frame_ms))
+        keep &= index <= index[padded][-1]
+        return keep
+
+    def trim(self, audio: sr.AudioData, energy_threshold: Optional[float] = None) -> sr.AudioData:
+        """
+        Remove non-speech from captured audio
+
+        Args:
+            audio (AudioData): Captured audio
+            energy_threshold (float, optional): RMS energy of speech; estimated if None
+
+        Returns:
+            AudioData: The trimmed audio, or audio unchanged when no speech was found
+        """
+        keep = self.keep_frames(self.speech_frames(audio.frame_data, audio.sample_rate, audio.sample_width,
+                                                   energy_threshold))
+        if not keep.any():
+            return audio
+        frame_bytes = self.frame_size(audio.sample_rate) * audio.sample_width
+        frames = np.frombuffer(audio.frame_data, dtype=np.uint8, count=len(keep) * frame_bytes)
+        kept = frames.reshape(len(keep), frame_bytes)[keep]
+        return sr.AudioData(kept.tobytes(), audio.sample_rate, audio.sample_width)
+
+    def listen(self, source: sr.AudioSource, energy_threshold: Optional[float] = None,
+               timeout: Optional[float] = None, phrase_time_limit: Optional[float] = None,
+               on_audio: Optional[Callable[[bytes], None]] = None) -> sr.AudioData:
+        """
+        Capture one utterance from an open source, ending it end_silence_ms after speech stops
+
+        Works like Recognizer.listen(), but the end of the utterance is found
+        from the frame classification instead of waiting out pause_threshold,
+        and the result is already trimmed.
+
+        Args:
+            source (AudioSource): Open audio source
+            energy_threshold (float, optional): RMS energy of speech, e.g. Recognizer.energy_threshold
+            timeout (float, optional): Seconds to wait for speech to start. Waits forever if None
+            phrase_time_limit (float, optional): Longest utterance in seconds
+            on_audio (callable, optional): Called with each piece of the untrimmed utterance
+                as it is captured, starting with the audio from before the onset
+
+        Returns:
+            AudioData: The trimmed utterance
+
+        Raises:
+            speech_recognition.WaitTimeoutError: When no speech starts within timeout
+
+        Afterwards noise_floor holds measure_noise() of the last ten seconds
+        read, timeouts included, so callers can track ambient noise without
+        the recognizer's adaptive threshold.
+        """
+        energies = collections.deque(maxlen=10000 // self.frame_ms)
+        try:
+            return self._listen(source, energy_threshold, timeout, phrase_time_limit, on_audio, energies)
+        finally:
+            if energies:
+                self.noise_floor = self._noise_level(np.fromiter(energies, dtype=np.float64),
+                                                     source.SAMPLE_WIDTH)
+
+    def _listen(self, source: sr.AudioSource, energy_threshold: Optional[float], timeout: Optional[float],
+                phrase_time_limit: Optional[float], on_audio: Optional[Callable[[bytes], None]],
+                energies: collections.deque) -> sr.AudioData:
+        """Capture loop of listen(), appending every frame's energy to energies"""
+        chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+        # Audio kept from before speech starts, so the first word is complete: the
+        # padding plus the chunk the onset began in, when only its tail was loud
+        preroll = collections.deque(maxlen=int(self.padding_ms / 1000 / chunk_seconds) + 2)
+        chunks = []
+        waited = 0.0
+        speaking = silence = 0.0
+        while True:
+            buffer = source.stream.read(source.CHUNK)
+            if not buffer:
+                break
+            energy, zcr = self.frame_features(buffer, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            energies.extend(energy.tolist())
+            speech = self._classify(energy, zcr, source.SAMPLE_WIDTH, energy_threshold).any()
+
+            if not chunks:
+                waited += chunk_seconds
+                preroll.append(buffer)
+                if speech:
+                    chunks = list(preroll)
+                    speaking, silence = chunk_seconds, 0.0
+                    if on_audio is not None:
+                        for chunk in chunks:
+                            on_audio(chunk)
+                elif timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+
+            chunks.append(buffer)
+            if on_audio is not None:
+                on_audio(buffer)
+            if speech:
+                speaking += chunk_seconds + silence
+                silence = 0.0
+            else:
+                silence += chunk_seconds
+            if silence * 1000 >= self.end_silence_ms:
+                if speaking * 1000 >= self.min_speech_ms:
+                    break
+                # Too short to be speech (a click or a cough); wait for a real utterance
+                preroll.clear()
+                preroll.extend(chunks[-preroll.maxlen:])
+                chunks = []
+            elif phrase_time_limit and speaking + silence > phrase_time_limit:
+                break
+
+        audio = sr.AudioData(b''.join(chunks), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        return self.trim(audio, energy_threshold)
+
+    def __repr__(self) -> str:
+        return f"VoiceActivityDetector(frame_ms={self.frame_ms}, end_silence_ms={self.end_silence_ms})"
+
+
+class SpeechSession:
+    """Speech recognizer with an open input stream reused across turns"""
+
+    def __init__(self, language: str = 'en-IN', source: Optional[sr.AudioSource] = None,
+                 device_index: Optional[int] = None, calibration_duration: float = 1.0,
+                 recalibrate_interval: Optional[float] = 60.0, recalibrate_duration: float = 0.5,
+                 drift_ratio: float = 2.0, vad: Optional[VoiceActivityDetector] = None,
+                 use_vad: bool = True, backend: str = 'google', fallback_backend: Optional[str] = 'vosk'):
+        """
+        Initialize the session; the microphone is opened by start()
+
+        Args:
+            language (str): Recognition language, e.g. 'en-IN' for Indian English
+            source (AudioSource, optional): Audio source to listen to. Uses the microphone if None
+            device_index (int, optional): Microphone device. Uses the default input if None
+            calibration_duration (float): Seconds of ambient noise sampled at startup
+            recalibrate_interval (float, optional): Seconds after a calibration at which the end
+                of the next turn triggers a background re-calibration. Only drift triggers them if None
+            recalibrate_duration (float): Seconds of ambient noise sampled when re-calibrating
+            drift_ratio (float): Factor by which the adapted energy threshold may move away
+                from the calibrated one before re-calibrating early
+            vad (VoiceActivityDetector, optional): Detector for ending and trimming utterances.
+                A default one is created if None and use_vad is True
+            use_vad (bool): End utterances and trim silence with voice activity detection.
+                Needs numpy; without it the recognizer's own endpointing is used
+            backend (str): Recognition backend: 'google' (online), 'vosk' or 'sphinx' (offline)
+            fallback_backend (str, optional): Backend tried when the chosen one can't be reached,
+                if it is available on this machine
+        """
+        self.language = language
+        self.recognizer = sr.Recognizer()
+        self.source = source if source is not None else sr.Microphone(device_index=device_index)
+        self.calibration_duration = calibration_duration
+        self.recalibrate_interval = recalibrate_interval
+        self.recalibrate_duration = recalibrate_duration
+        self.drift_ratio = drift_ratio
+        self.vad = vad
+        if self.vad is None and use_vad and np is not None:
+            self.vad = VoiceActivityDetector()
+        self.backends = default_backends()
+        self.default_backend = backend
+        self.fallback_backend = fallback_backend
+
+        self.calibrated_threshold = None
+        # Ambient noise measured by the VAD during calibration, the baseline for its noise_floor
+        self.calibrated_noise = None
+        self.calibrations = 0
+        self._calibrated_at = None
+        self._opened = False
+        self._closed = threading.Event()
+        # Set when re-calibration is needed early, and when a turn ends
+        self._recalibrate = threading.Event()
+        self._turn_ended = threading.Event()
+        # Held while the stream is being read, so listening and calibration never overlap
+        self._stream_lock = threading.Lock()
+        self._calibrator = None
+        self._listen_lock = threading.Lock()
+        self._stop_listening = threading.Event()
+
+    def start(self) -> 'SpeechSession':
+        """
+        Open the input stream, calibrate and start background re-calibration
+
+        Returns:
+            SpeechSession: self, so a session can be created and started in one line
+        """
+        if self._opened:
+            return self
+        self.source.__enter__()
+        self._opened = True
+        self._closed.clear()
+        self.calibrate(self.calibration_duration)
+        self._calibrator = threading.Thread(target=self._run_calibrator, name='speech-calibrator', daemon=True)
+        self._calibrator.start()
+        return self
+
+    def close(self) -> None:
+        """Stop re-calibrating and close the input stream"""
+        if not self._opened:
+            return
+        self._closed.set()
+        self._turn_ended.set()
+        self._stop_listening.set()
+        if self._calibrator is not None and self._calibrator is not threading.current_thread():
+            self._calibrator.join()
+        with self._stream_lock:
+            self._opened = False
+            self.source.__exit__(None, None, None)
+
+    def __enter__(self) -> 'SpeechSession':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def register_backend(self, backend: RecognitionBackend) -> None:
+        """
+        Add or replace a recognition backend
+
+        Args:
+            backend (RecognitionBackend): Backend, registered under its name
+        """
+        self.backends[backend.name] = backend
+
+    def set_backend(self, name: str) -> bool:
+        """
+        Choose the recognition backend
+
+        Args:
+            name (str): Backend name
+
+        Returns:
+            bool: True if the backend exists, False otherwise
+        """
+        if name not in self.backends:
+            print(f"Unknown speech recognition backend '{name}'")
+            return False
+        self.default_backend = name
+        return True
+
+    def _get_backend(self) -> RecognitionBackend:
+        """Return the chosen backend"""
+        if self.default_backend not in self.backends:
+            raise ValueError(f"Unknown speech recognition backend '{self.default_backend}'")
+        return self.backends[self.default_backend]
+
+    def _candidate_backends(self) -> List[RecognitionBackend]:
+        """Chosen backend followed by the fallback, if it is usable here"""
+        primary = self._get_backend()
+        fallback = self.backends.get(self.fallback_backend) if self.fallback_backend else None
+        if fallback is None or fallback is primary or not fallback.available():
+            return [primary]
+        return [primary, fallback]
+
+    def calibrate(self, duration: Optional[float] = None) -> float:
+        """
+        Sample ambient noise and set the energy threshold from it
+
+        Args:
+            duration (float, optional): Seconds to sample. Uses recalibrate_duration if None
+
+        Returns:
+            float: The new energy threshold
+        """
+        with self._stream_lock:
+            return self._calibrate(duration)
+
+    def _calibrate(self, duration: Optional[float] = None) -> float:
+        """Sample ambient noise (stream lock held)"""
+        self._drain()
+        duration = duration or self.recalibrate_duration
+        if self.vad is None:
+            self.recognizer.adjust_for_ambient_noise(self.source, duration)
+        else:
+            # Keep the calibration audio, so the VAD measures the baseline for drift the same way
+            stream = self.source.stream
+            recording = self.source.stream = _RecordingStream(stream)
+            try:
+                self.recognizer.adjust_for_ambient_noise(self.source, duration)
+            finally:
+                self.source.stream = stream
+            self.calibrated_noise = self.vad.measure_noise(b''.join(recording.chunks), self.source.SAMPLE_RATE,
+                                                           self.source.SAMPLE_WIDTH)
+        self.calibrated_threshold = self.recognizer.energy_threshold
+        self.calibrations += 1
+        self._calibrated_at = time.monotonic()
+        self._recalibrate.clear()
+        return self.calibrated_threshold
+
+    def listen_once(self, timeout: Optional[float] = None, phrase_time_limit: Optional[float] = None,
+                    on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Capture one phrase and recognize it
+
+        With a streaming backend (Vosk) and voice activity detection, the
+        phrase is recognized while it is captured, so the text is ready as
+        soon as the user stops speaking.
+
+        Args:
+            timeout (float, optional): Seconds to wait for speech to start. Waits forever if None
+            phrase_time_limit (float, optional): Longest phrase in seconds
+            on_partial (callable, optional): Called with the partial hypothesis whenever it
+                changes while the user is speaking. Only streaming backends report them
+
+        Returns:
+            str: Recognized text, or None if nothing could be recognized
+        """
+        if not self._opened:
+            self.start()
+
+        stream = self._open_stream() if self.vad is not None else None
+        on_audio = None
+        if stream is not None:
+            def on_audio(data: bytes) -> None:
+                partial = stream.accept(data)
+                if partial and on_partial is not None:
+                    on_partial(partial)
+
+        try:
+            # Waits for any re-calibration, so speech after the prompt is never sampled as noise
+            with self._stream_lock:
+                self._drain()
+                print("Please say something...")
+                if self.vad is not None:
+                    audio = self.vad.listen(self.source, self.recognizer.energy_threshold, timeout,
+                                            phrase_time_limit, on_audio)
+                else:
+                    audio = self.recognizer.listen(self.source, timeout, phrase_time_limit)
+        except sr.WaitTimeoutError:
+            print("No speech detected.")
+            return None
+        finally:
+            # The VAD path never adapts the recognizer's threshold; it measures the noise instead
+            self._check_drift(self.vad.noise_floor if self.vad is not None else None)
+            self._turn_ended.set()
+
+        if stream is not None:
+            return self._finish_stream(stream, audio)
+        # With a VAD, VoiceActivityDetector.listen() captured and already trimmed the audio
+        return self._recognize(audio, trim=False)
+
+    def listen_forever(self, workers: int = 2, max_pending: int = 4,
+                       phrase_time_limit: Optional[float] = None) -> Iterator[str]:
+        """
+        Listen continuously, yielding transcripts in the order they were spoken
+
+        Capture never waits for recognition: each utterance is recognized on
+        a pool of worker threads while the next one is captured. Captured
+        utterances wait in a bounded queue; when max_pending of them are
+        waiting to be consumed, capture pauses until the caller catches up.
+        Utterances that can't be recognized are skipped.
+
+        Listening stops when the generator is closed (e.g. the for loop over
+        it is left) or stop_listening() is called. Partial hypotheses are
+        only reported by listen_once().
+
+        Args:
+            workers (int): Utterances recognized at once
+            max_pending (int): Captured utterances that may wait to be consumed
+            phrase_time_limit (float, optional): Longest phrase in seconds
+
+        Yields:
+            str: Recognized text
+        """
+        if not self._opened:
+            self.start()
+
+        if not self._listen_lock.acquire(blocking=False):
+            raise RuntimeError("This session is already listening")
+        # Keep the calibrator off the stream until listening stops
+        self._stream_lock.acquire()
+        self._stop_listening.clear()
+
+        pending = queue.Queue(maxsize=max(1, max_pending))
+        executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='speech-recognize')
+
+        def captured(recognizer, audio):
+            future = executor.submit(self._recognize, audio)
+            # Backpressure: the capture thread waits for a free slot
+            while not self._stop_listening.is_set():
+                try:
+                    pending.put(future, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            future.cancel()
+
+        stop_capture = None
+        try:
+            stop_capture = self.recognizer.listen_in_background(_OpenSource(self.source), captured,
+                                                                phrase_time_limit)
+            while not self._stop_listening.is_set():
+                try:
+                    future = pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                text = future.result()
+                if text is not None:
+                    yield text
+        finally:
+            self._stop_listening.set()
+            if stop_capture is not None:
+                stop_capture(wait_for_stop=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._check_drift()
+            self._stream_lock.release()
+            self._listen_lock.release()
+            self._turn_ended.set()
+
+    async def alisten_forever(self, workers: int = 2, max_pending: int = 4,
+                              phrase_time_limit: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Listen continuously from an asyncio event loop, like listen_forever()
+
+        Args:
+            workers (int): Utterances recognized at once
+            max_pending (int): Captured utterances that may wait to be consumed
+            phrase_time_limit (float, optional): Longest phrase in seconds
+
+        Yields:
+            str: Recognized text
+        """
+        loop = asyncio.get_running_loop()
+        transcripts = self.listen_forever(workers, max_pending, phrase_time_limit)
+        # One thread steps the generator, so it is never resumed concurrently
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speech-listen')
+        try:
+            while True:
+                text = await loop.run_in_executor(executor, next, transcripts, None)
+                if text is None:
+                    return
+                yield text
+        finally:
+            self.stop_listening()
+            await loop.run_in_executor(executor, transcripts.close)
+            executor.shutdown(wait=False)
+
+    def stop_listening(self) -> None:
+        """Stop listen_forever() from any thread; it returns once its current utterance is handled"""
+        self._stop_listening.set()
+
+    def _recognize(self, audio: sr.AudioData, trim: bool = True,
+                   backends: Optional[List[RecognitionBackend]] = None) -> Optional[str]:
+        """
+        Recognize captured audio, returning None if nothing could be recognized
+
+        Args:
+            audio (AudioData): Captured utterance
+            trim (bool): Cut silence with the VAD first; False for audio the VAD captured
+            backends (list, optional): Backends to try in order. Uses the chosen one and the
+                fallback if None
+        """
+        if trim and self.vad is not None:
+            audio = self.vad.trim(audio, self.recognizer.energy_threshold)
+        for backend in backends if backends is not None else self._candidate_backends():
+            try:
+                text = backend.recognize(audio, self.language)
+                print(f"You said: {text}")
+                return text
+            except sr.UnknownValueError:
+                print("Sorry, I could not understand the audio.")
+                return None
+            except sr.RequestError as e:
+                # Offline or the engine is missing: try the fallback, if any
+                print(f"Could not request results from '{backend.name}'; {e}")
+        return None
+
+    def _open_stream(self) -> Optional[RecognitionStream]:
+        """Start incremental recognition with the chosen backend, or None if it doesn't stream"""
+        backend = self._get_backend()
+        if not backend.streaming:
+            return None
+        try:
+            return backend.open_stream(self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH, self.language)
+        except (sr.RequestError, ValueError) as e:
+            print(f"Warning: Could not start streaming recognition: {e}")
+            return None
+
+    def _finish_stream(self, stream: RecognitionStream, audio: sr.AudioData) -> Optional[str]:
+        """
+        Recognize the rest of a streamed phrase, returning None if nothing could be recognized
+
+        Args:
+            stream (RecognitionStream): Stream fed while the phrase was captured
+            audio (AudioData): The captured phrase, recognized by the fallback backend
+                if the stream fails
+        """
+        try:
+            text = stream.finish()
+            print(f"You said: {text}")
+            return text
+        except sr.UnknownValueError:
+            print("Sorry, I could not understand the audio.")
+            return None
+        except sr.RequestError as e:
+            print(f"Could not request results from '{self.default_backend}'; {e}")
+        fallbacks = self._candidate_backends()[1:]
+        if not fallbacks:
+            return None
+        return self._recognize(audio, trim=False, backends=fallbacks)
+
+    def _drain(self) -> None:
+        """Discard audio the microphone buffered between turns (stream lock held)"""
+        stream = getattr(getattr(self.source, 'stream', None), 'pyaudio_stream', None)
+        if stream is None:
+            return
+        try:
+            available = stream.get_read_available()
+            if available:
+                stream.read(available, exception_on_overflow=False)
+        except Exception as e:
+            print(f"Warning: Could not drain microphone buffer: {e}")
+
+    def _check_drift(self, noise_floor: Optional[float] = None) -> None:
+        """
+        Ask for early re-calibration when the noise moved too far from the calibration
+
+        Args:
+            noise_floor (float, optional): Ambient noise the VAD measured while listening,
+                compared with calibrated_noise. The recognizer's adapted threshold is
+                compared with calibrated_threshold instead if None
+        """
+        if noise_floor is not None and self.calibrated_noise:
+            ratio = noise_floor / self.calibrated_noise
+        elif noise_floor is None and self.calibrated_threshold and self.recognizer.energy_threshold:
+            ratio = self.recognizer.energy_threshold / self.calibrated_threshold
+        else:
+            return
+        if ratio > self.drift_ratio or ratio < 1.0 / self.drift_ratio:
+            self._recalibrate.set()
+
+    def _recalibration_due(self) -> bool:
+        """Check if drift was detected or the re-calibration interval has passed"""
+        if self._recalibrate.is_set():
+            return True
+        return (self.recalibrate_interval is not None and self._calibrated_at is not None
+                and time.monotonic() - self._calibrated_at >= self.recalibrate_interval)
+
+    def _run_calibrator(self) -> None:
+        """
+        Background loop re-calibrating right after turns end
+
+        The user has just stopped speaking then, and the next turn's prompt
+        waits for the stream lock, so ambient noise is all there is to sample.
+        If the next turn took the stream first, this waits for it to end.
+        """
+        while True:
+            self._turn_ended.wait()
+            self._turn_ended.clear()
+            if self._closed.is_set():
+                return
+            if not self._recalibration_due():
+                continue
+            with self._stream_lock:
+                if self._closed.is_set() or not self._opened:
+                    return
+                try:
+                    self._calibrate()
+                except Exception as e:
+                    print(f"Warning: Re-calibration failed: {e}")
+                    self._recalibrate.clear()
+
+    def __repr__(self) -> str:
+        return (f"SpeechSession(language='{self.language}', backend='{self.default_backend}', "
+                f"energy_threshold={self.recognizer.energy_threshold:.0f}, calibrations={self.calibrations})")
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> SpeechSession:
+    """Return the process-wide microphone session, opening it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = SpeechSession().start()
+            atexit.register(_session.close)
+        return _session
+
 
 def recognize_speech_from_mic():
-    # Initialize recognizer
-    r = sr.Recognizer()
+    # Reuse the open microphone and its calibration from previous calls
+    return get_session().listen_once()
+
+def _write_fixtures(directory: str, count: int = 4, sample_rate: int = 16000) -> List[str]:
+    """Write synthetic utterances: voiced bursts and a fricative between quiet pauses over a noise floor"""
+    import wave
+
+    rng = np.random.default_rng(23)
+    paths = []
+    for n in range(count):
+        parts = [rng.normal(0, 60, int(sample_rate * rng.uniform(0.8, 1.5)))]
+        for _ in range(rng.integers(2, 5)):
+            length = int(sample_rate * rng.uniform(0.3, 0.7))
+            t = np.arange(length) / sample_rate
+            pitch = rng.uniform(100, 220)
+            voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+            envelope = np.sin(np.pi * np.arange(length) / length) ** 0.5
+            parts.append(voiced * envelope * rng.uniform(3000, 8000))
+            if rng.random() < 0.5:
+                parts.append(rng.normal(0, 900, int(sample_rate * 0.15)))
+            parts.append(rng.normal(0, 60, int(sample_rate * rng.uniform(0.05, 0.3))))
+        parts.append(rng.normal(0, 60, int(sample_rate * rng.uniform(1.5, 2.5))))
+        samples = np.clip(np.concatenate(parts), -32768, 32767).astype('<i2')
+
+        path = os.path.join(directory, f'utterance_{n}.wav')
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(sample_rate)
+            f.writeframes(samples.tobytes())
+        paths.append(path)
+    return paths
+
+
+class _CountingStream:
+    """Audio stream wrapper counting the bytes read from it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
 
-    # Use the default microphone as the audio source
-    with sr.Microphone() as source:
-        print("Please say something...")
-        r.adjust_for_ambient_noise(source)  # Optional, reduces noise
-        audio = r.listen(source)
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
 
+
+def _capture(path: str, vad: Optional[VoiceActivityDetector]) -> Tuple[sr.AudioData, int, float]:
+    """Capture the first utterance of a recording the way a session would
+
+    Returns the audio, the bytes consumed from the recording and the calibrated energy threshold.
+    """
+    recognizer = sr.Recognizer()
+    recognizer.dynamic_energy_threshold = False
+    with sr.AudioFile(path) as source:
+        recognizer.adjust_for_ambient_noise(source, 0.5)
+        source.stream = _CountingStream(source.stream)
+        if vad is None:
+            audio = recognizer.listen(source)
+        else:
+            audio = vad.listen(source, recognizer.energy_threshold)
+        return audio, source.stream.bytes_read, recognizer.energy_threshold
+
+
+def _flac_size(audio: sr.AudioData) -> Optional[int]:
+    """Size of audio as uploaded to Google, or None without a FLAC encoder"""
     try:
-        # Recognize speech using Google's free API
-        text = r.recognize_google(audio, language='en-IN')  # 'en-IN' for Indian English
-        print(f"You said: {text}")
-        return text
-    except sr.UnknownValueError:
-        print("Sorry, I could not understand the audio.")
+        return len(audio.get_flac_data())
+    except (OSError, AssertionError):
         return None
+
+
+def _recognition_ms(backend: RecognitionBackend, audio: sr.AudioData) -> Optional[float]:
+    """Milliseconds backend takes to recognize audio, or None if it can't be reached"""
+    start = time.perf_counter()
+    try:
+        backend.recognize(audio, 'en-IN')
+    except sr.UnknownValueError:
+        pass  # Nothing recognized still took a full round trip
     except sr.RequestError as e:
-        print(f"Could not request results; {e}")
+        print(f"{backend.name}: {e}")
         return None
+    return (time.perf_counter() - start) * 1000
+
+
+def _benchmark(paths: List[str], backend_name: str = 'google') -> None:
+    """Compare Recognizer.listen() with VoiceActivityDetector.listen() on recordings"""
+    import tempfile
+
+    vad = VoiceActivityDetector()
+    backend = default_backends().get(backend_name)
+    if backend is None or not backend.available():
+        print(f"Backend '{backend_name}' is not available; end-to-end latency is not measured")
+        backend = None
+    latencies = []
+    with tempfile.TemporaryDirectory() as directory:
+        if not paths:
+            paths = _write_fixtures(directory)
+            print("No recordings given; using synthetic utterances")
+
+        totals = [0, 0, 0.0, 0.0, 0, 0]
+        print(f"{'file':<24} {'bytes':>9} {'vad':>9} {'saved':>6} {'capture ms':>11} {'vad':>7} {'saved':>7} "
+              f"{'speech kept':>12}")
+        for path in paths:
+            plain, plain_read, threshold = _capture(path, None)
+            trimmed, trimmed_read, _ = _capture(path, vad)
+            bytes_per_ms = plain.sample_rate * plain.sample_width / 1000
+            plain_ms = plain_read / bytes_per_ms
+            trimmed_ms = trimmed_read / bytes_per_ms
+            plain_bytes = _flac_size(plain) or len(plain.frame_data)
+            trimmed_bytes = _flac_size(trimmed) or len(trimmed.frame_data)
+            totals[0] += plain_bytes
+            totals[1] += trimmed_bytes
+            totals[2] += plain_ms
+            totals[3] += trimmed_ms
+            # Speech frames in each capture, to show that trimming did not cut words
+            plain_speech = int(vad.speech_frames(plain.frame_data, plain.sample_rate, plain.sample_width,
+                                                 threshold).sum())
+            trimmed_speech = int(vad.speech_frames(trimmed.frame_data, trimmed.sample_rate, trimmed.sample_width,
+                                                   threshold).sum())
+            totals[4] += plain_speech
+            totals[5] += trimmed_speech
+            if backend is not None:
+                # What the session does: no VAD uploads the capture as is, the VAD path its trimmed capture
+                plain_recognition = _recognition_ms(backend, plain)
+                trimmed_recognition = _recognition_ms(backend, trimmed) if plain_recognition is not None else None
+                if trimmed_recognition is None:
+                    print("End-to-end latency is not measured")
+                    backend = None
+                else:
+                    latencies.append((os.path.basename(path), plain_ms + plain_recognition,
+                                      trimmed_ms + trimmed_recognition))
+            print(f"{os.path.basename(path)[:24]:<24} {plain_bytes:>9} {trimmed_bytes:>9} "
+                  f"{1 - trimmed_bytes / plain_bytes:>6.0%} {plain_ms:>11.0f} {trimmed_ms:>7.0f} "
+                  f"{plain_ms - trimmed_ms:>7.0f} {trimmed_speech / max(plain_speech, 1):>12.0%}")
+
+        print(f"{'total':<24} {totals[0]:>9} {totals[1]:>9} {1 - totals[1] / totals[0]:>6.0%} "
+              f"{totals[2]:>11.0f} {totals[3]:>7.0f} {totals[2] - totals[3]:>7.0f} "
+              f"{totals[5] / max(totals[4], 1):>12.0%}")
+        print("bytes are FLAC as uploaded when a FLAC encoder is available, raw PCM otherwise")
+
+        if backend is not None and latencies:
+            print(f"\nEnd to end with '{backend.name}': capture plus recognition")
+            print(f"{'file':<24} {'ms':>9} {'vad':>9} {'saved':>9}")
+            for name, plain_total, trimmed_total in latencies:
+                print(f"{name[:24]:<24} {plain_total:>9.0f} {trimmed_total:>9.0f} {plain_total - trimmed_total:>9.0f}")
+            plain_total = sum(latency[1] for latency in latencies)
+            trimmed_total = sum(latency[2] for latency in latencies)
+            print(f"{'total':<24} {plain_total:>9.0f} {trimmed_total:>9.0f} {plain_total - trimmed_total:>9.0f}")
+
 
 if __name__ == "__main__":
-    recognize_speech_from_mic()
+    if sys.argv[1:2] == ['bench']:
+        args = sys.argv[2:]
+        if args[:1] == ['--backend'] and len(args) > 1:
+            _benchmark(args[2:], args[1])
+        else:
+            _benchmark(args)
+    else:
+        recognize_speech_from_mic()
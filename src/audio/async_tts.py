@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+AsyncTextToSpeech class for using text-to-speech from an asyncio event loop
+Part of the audio module
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from audio.playback import PlaybackHandle
+from audio.text_to_speech import TextToSpeech
+
+
+class AsyncTextToSpeech:
+    """
+    asyncio front end for TextToSpeech
+
+    Synthesis runs on a thread pool so many requests can download at once
+    without blocking the event loop. Playback stays on the TextToSpeech
+    worker thread, one utterance at a time, and its completion is awaited
+    through a callback rather than a blocked thread.
+    """
+
+    def __init__(self, tts: Optional[TextToSpeech] = None, max_concurrency: int = 8, **kwargs):
+        """
+        Initialize the AsyncTextToSpeech class
+
+        Args:
+            tts (TextToSpeech, optional): Instance to wrap. A new one is created from kwargs if None
+            max_concurrency (int): Maximum number of synthesis requests in flight
+            **kwargs: Passed to TextToSpeech when tts is None
+        """
+        self.tts = tts or TextToSpeech(**kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='tts-synth')
+
+    async def synthesize(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,
+                         voice_id: Optional[str] = None, backend: Optional[str] = None,
+                         deadline_ms: Optional[int] = None) -> Optional[bytes]:
+        """
+        Convert text to speech without playing it
+
+        Args:
+            text (str): Text to convert to speech
+            language (str, optional): Language code. Uses current_language if None
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            voice_id (str, optional): Voice identifier
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds
+
+        Returns:
+            bytes: Encoded audio (MP3 from gTTS, WAV from espeak), or None on failure
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.tts.synthesize, text, language, slow, voice_id,
+                                          backend, deadline_ms)
+
+    async def speak(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,
+                    voice_id: Optional[str] = None, backend: Optional[str] = None,
+                    deadline_ms: Optional[int] = None) -> bool:
+        """
+        Convert text to speech and play it
+
+        Cancelling the awaiting task stops the utterance.
+
+        Args:
+            text (str): Text to convert to speech
+            language (str, optional): Language code. Uses current_language if None
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            voice_id (str, optional): Voice identifier
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds. Playback
+                itself is not limited
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        data = await self.synthesize(text, language, slow, voice_id, backend, deadline_ms)
+        if data is None:
+            return False
+
+        handle = self.tts.play_audio(data, block=False)
+        try:
+            await self._wait(handle)
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+        return bool(handle.result)
+
+    async def save(self, text: str, filename: str, language: Optional[str] = None,
+                   slow: Optional[bool] = None, backend: Optional[str] = None,
+                   deadline_ms: Optional[int] = None, voice_id: Optional[str] = None) -> bool:
+        """
+        Convert text to speech and save to file
+
+        Args:
+            text (str): Text to convert to speech
+            filename (str): Output filename. gTTS writes MP3, espeak writes WAV
+            language (str, optional): Language code. Uses current_language if None
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds
+            voice_id (str, optional): Voice identifier
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.tts.save, text, filename, language, slow,
+                                          backend, deadline_ms, voice_id)
+
+    @staticmethod
+    async def _wait(handle: PlaybackHandle) -> None:
+        """Await a playback handle without tying up a thread"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(_):
+            if not future.done():
+                future.set_result(None)
+
+        handle.add_done_callback(lambda h: loop.call_soon_threadsafe(resolve, h))
+        await future
+
+    def stop(self) -> None:
+        """Stop current audio playback"""
+        self.tts.stop()
+
+    def close(self) -> None:
+        """Shut down the synthesis thread pool"""
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> 'AsyncTextToSpeech':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"AsyncTextToSpeech({self.tts!r})"
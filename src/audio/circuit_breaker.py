@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+CircuitBreaker class for tracking the health of a synthesis backend
+Part of the audio module
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class CircuitBreaker:
+    """
+    Error-rate and latency based circuit breaker
+
+    The breaker is 'closed' while the backend is healthy. Repeated failures,
+    a high error rate, or calls slower than slow_call_seconds per chunk of
+    work trip it 'open', and callers should go to a fallback instead. While open, a background
+    thread runs the probe function with exponential backoff and closes the
+    breaker once a probe succeeds.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+
+    def __init__(self, name: str, probe: Optional[Callable[[], object]] = None,
+                 failure_threshold: int = 3, error_rate_threshold: float = 0.5,
+                 slow_call_seconds: Optional[float] = 5.0, window_size: int = 20, min_calls: int = 5,
+                 reset_timeout: float = 15.0, max_reset_timeout: float = 300.0):
+        """
+        Initialize the breaker
+
+        Args:
+            name (str): Name of the guarded backend
+            probe (callable, optional): Health check raising on failure. Without one the
+                breaker closes again after reset_timeout
+            failure_threshold (int): Consecutive failures that trip the breaker
+            error_rate_threshold (float): Failure ratio over the window that trips the breaker
+            slow_call_seconds (float, optional): Calls slower than this per chunk of work count
+                as failures. Disabled if None
+            window_size (int): Number of recent calls kept for error rate and latency stats
+            min_calls (int): Calls needed in the window before the error rate is considered
+            reset_timeout (float): Seconds before the first recovery probe
+            max_reset_timeout (float): Upper bound for the probe backoff
+        """
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self.trip_count = 0
+        self._calls = deque(maxlen=window_size)  # (ok, latency)
+        self._consecutive_failures = 0
+        self._lock = threading.Lock()
+        self._probe_thread = None
+
+    def allow_request(self) -> bool:
+        """Check if calls should go to this backend"""
+        return self.state == self.CLOSED
+
+    def record_success(self, latency: float, chunks: int = 1) -> None:
+        """
+        Record a completed call
+
+        Args:
+            latency (float): Call duration in seconds
+            chunks (int): Pieces of work the call did (e.g. text chunks fetched one after
+                another), which scale the slow call limit
+        """
+        if self.slow_call_seconds is not None and latency > self.slow_call_seconds * max(1, chunks):
+            self.record_failure(latency)
+            return
+        with self._lock:
+            self._calls.append((True, latency))
+            self._consecutive_failures = 0
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        """
+        Record a failed or too slow call
+
+        Args:
+            latency (float, optional): Call duration in seconds, if known
+        """
+        with self._lock:
+            self._calls.append((False, latency))
+            self._consecutive_failures += 1
+            if self.state == self.CLOSED and self._should_trip():
+                self._trip()
+
+    def _should_trip(self) -> bool:
+        if self._consecutive_failures >= self.failure_threshold:
+            return True
+        if len(self._calls) >= self.min_calls:
+            return self.error_rate >= self.error_rate_threshold
+        return False
+
+    def _trip(self) -> None:
+        """Open the breaker and start probing for recovery (lock held)"""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trip_count += 1
+        print(f"Warning: TTS backend '{self.name}' is failing, switching to fallback")
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._probe_thread = threading.Thread(target=self._probe_until_recovered,
+                                                  name=f'tts-probe-{self.name}', daemon=True)
+            self._probe_thread.start()
+
+    def _probe_until_recovered(self) -> None:
+        delay = self.reset_timeout
+        while True:
+            time.sleep(delay)
+            try:
+                if self.probe is not None:
+                    start = time.monotonic()
+                    self.probe()
+                    if self.slow_call_seconds is not None and time.monotonic() - start > self.slow_call_seconds:
+                        raise TimeoutError("probe too slow")
+                self.reset()
+                print(f"TTS backend '{self.name}' recovered")
+                return
+            except Exception:
+                delay = min(delay * 2, self.max_reset_timeout)
+
+    def reset(self) -> None:
+        """Close the breaker and forget past calls"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.opened_at = None
+            self._calls.clear()
+            self._consecutive_failures = 0
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of failed calls in the window"""
+        if not self._calls:
+            return 0.0
+        return sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Latency of successful calls in the window at a percentile
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in seconds, or None with no successful calls
+        """
+        with self._lock:
+            latencies = sorted(latency for ok, latency in self._calls if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100.0 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def stats(self) -> Dict[str, object]:
+        """Current state, error rate and latency percentiles"""
+        return {
+            'state': self.state,
+            'calls': len(self._calls),
+            'error_rate': self.error_rate,
+            'p50': self.latency_percentile(50),
+            'p95': self.latency_percentile(95),
+            'p99': self.latency_percentile(99),
+            'trips': self.trip_count,
+        }
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker(name='{self.name}', state='{self.state}', error_rate={self.error_rate:.2f})"
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+HinglishModel class for telling romanized Hindi from English
+Part of the audio module
+
+Each word is scored with character trigram log-probability tables for
+romanized Hindi and for English, so spellings the word lists never saw
+("kyaaa", "bahuuut") still score as Hindi and punctuation does not get in
+the way ("hai?" is the word "hai"). The word scores give the probability
+that each word is Hindi, and a text's confidence is the probability that
+more than `ratio` of its words are, so a two-word phrase needs stronger
+evidence than a fixed share of keyword hits would.
+
+Words found in the Hinglish lexicon (see audio.lexicon), alone or inside
+one of its phrases, get extra evidence towards Hindi on top of their
+trigram score. The tables are generated from the word lists in
+resources/language_data and loaded once per process by get_hinglish_model(). Run this module to compare
+the model with the keyword heuristic on the labeled phrases there, or with
+"train" to rebuild the tables after editing the word lists. The labeled
+phrases share words with the word lists, so the model is cross-validated:
+each fold's phrases are scored by a model and lexicon built without any of
+their words, with the prior chosen on the other folds the same way. The
+keyword heuristic is scored with its full keyword list:
+
+    python -m audio.hinglish_model
+    python -m audio.hinglish_model train
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from audio.lexicon import PHRASE_BASE, WORD_BASE, Lexicon, get_lexicon
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LANGUAGE_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'resources', 'language_data')
+DEFAULT_MODEL_PATH = os.path.join(LANGUAGE_DATA_DIR, 'hinglish_ngrams.json')
+
+# Trigram symbols: a word boundary, then the letters. Words are padded with
+# one boundary on each side, so a word of n letters has n trigrams
+ALPHABET = ' abcdefghijklmnopqrstuvwxyz'
+_SIZE = len(ALPHABET)
+_SYMBOLS = {c: i for i, c in enumerate(ALPHABET)}
+_WORD = re.compile(r'[A-Za-z]+')
+# Priors tried when training; see _choose_prior()
+_PRIORS = (-4.0, -3.5, -3.0, -2.5, -2.0, -1.5, -1.0, -0.5, 0.0)
+# Texts with more words than this get a normal approximation of their Hindi
+# word count distribution; the exact one costs O(words²)
+_EXACT_WORDS = 200
+
+
+def read_word_list(path: str) -> List[str]:
+    """
+    Read a word list: one entry per line, blank lines and # comments skipped
+
+    Args:
+        path (str): File to read
+
+    Returns:
+        list: Lowercase entries in file order
+    """
+    with open(path, encoding='utf-8') as f:
+        return [line.strip().lower() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+class HinglishModel:
+    """Character trigram classifier for romanized Hindi vs English words"""
+
+    def __init__(self, log_probs: Dict[str, Dict[str, float]], unseen: Dict[str, float],
+                 prior: float = 0.0, ratio: float = 0.2, max_evidence: float = 8.0,
+                 lexicon: Optional[Lexicon] = None, lexicon_evidence: float = 4.0):
+        """
+        Initialize the model from its tables
+
+        Args:
+            log_probs (dict): Trigram log-probabilities for 'hi' and 'en'
+            unseen (dict): Log-probability of a trigram missing from each table
+            prior (float): Log-odds added to every word, the bias towards Hindi
+            ratio (float): Share of Hindi words above which a text is Hinglish
+            max_evidence (float): Cap on a word's log-odds either way
+            lexicon (Lexicon, optional): Known romanized Hindi words and phrases
+            lexicon_evidence (float): Log-odds added to words matched by the lexicon
+        """
+        self.prior = prior
+        self.ratio = ratio
+        self.max_evidence = max_evidence
+        self.lexicon = lexicon
+        self.lexicon_evidence = lexicon_evidence
+
+        # Log-likelihood ratio (Hindi over English) for every trigram, indexed
+        # by the symbols' base-27 value, so scoring is plain list indexing
+        self._llr = [unseen['hi'] - unseen['en']] * _SIZE ** 3
+        for trigram in set(log_probs['hi']) | set(log_probs['en']):
+            a, b, c = (_SYMBOLS[ch] for ch in trigram)
+            self._llr[(a * _SIZE + b) * _SIZE + c] = (log_probs['hi'].get(trigram, unseen['hi'])
+                                                      - log_probs['en'].get(trigram, unseen['en']))
+        self._llr_array = np.array(self._llr) if np is not None else None
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH, lexicon: Optional[Lexicon] = None) -> 'HinglishModel':
+        """
+        Load a model written by train_model()
+
+        Args:
+            path (str): JSON file with the tables
+            lexicon (Lexicon, optional): Known romanized Hindi words and phrases
+
+        Returns:
+            HinglishModel: The model
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('alphabet') != ALPHABET:
+            raise ValueError(f"Unsupported Hinglish model alphabet in {path}")
+        return cls(data['log_probs'], data['unseen'], data.get('prior', 0.0), data.get('ratio', 0.2),
+                   lexicon=lexicon)
+
+    @staticmethod
+    def words(text: str) -> List[str]:
+        """Lowercase runs of ASCII letters in text, the words the model scores"""
+        return [word.lower() for word in _WORD.findall(text)]
+
+    def word_score(self, word: str, in_lexicon: bool = False) -> float:
+        """
+        Log-odds that a lowercase word is romanized Hindi rather than English
+
+        Args:
+            word (str): Word of ASCII letters
+            in_lexicon (bool): The lexicon matched the word, alone or in a phrase
+
+        Returns:
+            float: Positive for Hindi, negative for English
+        """
+        llr = self._llr
+        symbols = [0] + [_SYMBOLS[c] for c in word] + [0]
+        score = self.prior
+        for i in range(1, len(symbols) - 1):
+            score += llr[(symbols[i - 1] * _SIZE + symbols[i]) * _SIZE + symbols[i + 1]]
+        if in_lexicon:
+            score += self.lexicon_evidence
+        return min(self.max_evidence, max(-self.max_evidence, score))
+
+    def word_scores(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Score every word of text, using the lexicon when there is one
+
+        Args:
+            text (str): Text to analyze
+
+        Returns:
+            list: (word, log-odds of Hindi) pairs in order
+        """
+        words = self.words(text)
+        matched = self.lexicon.match(words) if self.lexicon is not None else [False] * len(words)
+        return [(word, self.word_score(word, hit)) for word, hit in zip(words, matched)]
+
+    def confidence(self, text: str) -> float:
+        """
+        Probability that text is Hinglish
+
+        Args:
+            text (str): Text to analyze
+
+        Returns:
+            float: Confidence between 0 and 1; 0 when text has no words
+        """
+        probs = [1.0 / (1.0 + math.exp(-score)) for _, score in self.word_scores(text)]
+        count = len(probs)
+        if not count:
+            return 0.0
+        needed = self.ratio * count
+        if count > _EXACT_WORDS:
+            return _normal_tail(sum(probs), sum(p * (1.0 - p) for p in probs), needed)
+
+        # Distribution of the number of Hindi words (Poisson binomial), one word at a time
+        dist = [1.0] + [0.0] * count
+        for j, p in enumerate(probs):
+            q = 1.0 - p
+            for k in range(j + 1, 0, -1):
+                dist[k] = dist[k] * q + dist[k - 1] * p
+            dist[0] *= q
+        return sum(dist[k] for k in range(count + 1) if k > needed)
+
+    def is_hinglish(self, text: str, threshold: float = 0.5) -> bool:
+        """
+        Check if text is Hinglish
+
+        Args:
+            text (str): Text to analyze
+            threshold (float): Confidence above which text counts as Hinglish
+
+        Returns:
+            bool: True if Hinglish is detected
+        """
+        return self.confidence(text) > threshold
+
+    def confidences(self, texts: Sequence[str]):
+        """
+        Hinglish confidence for many texts at once
+
+        Gives the same values as confidence() for every text. Trigram scores
+        for all texts come from one code point array, and the word count
+        distributions are built for all texts with the same number of words
+        together.
+
+        Args:
+            texts (sequence): Texts to analyze
+
+        Returns:
+            numpy.ndarray: Confidence for each text, in input order
+
+        Raises:
+            ImportError: When NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("HinglishModel.confidences() needs numpy: pip install numpy")
+
+        texts = list(texts)
+        count = len(texts)
+        result = np.zeros(count)
+        if count == 0:
+            return result
+
+        # Symbol per character, 0 for anything but an ASCII letter; texts are
+        # joined with NUL, so words never run from one text into the next
+        joined = '\0'.join(texts)
+        if joined.isascii():
+            codepoints = np.frombuffer(joined.encode('ascii'), dtype=np.uint8).astype(np.int64)
+        else:
+            codepoints = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.int64)
+        lowered = codepoints | 0x20
+        symbols = np.zeros(len(codepoints) + 2, dtype=np.int64)
+        symbols[1:-1] = np.where((lowered >= 0x61) & (lowered <= 0x7A), lowered - 0x60, 0)
+
+        # One trigram per letter, centred on it; a word starts after a boundary
+        letters = np.flatnonzero(symbols)
+        if not len(letters):
+            return result
+        scores = self._llr_array[(symbols[letters - 1] * _SIZE + symbols[letters]) * _SIZE + symbols[letters + 1]]
+        first = np.flatnonzero(symbols[letters - 1] == 0)
+        word_scores = np.add.reduceat(scores, first) + self.prior
+
+        # Words per text, from where each text starts in the symbol array
+        text_starts = np.cumsum([1] + [len(text) + 1 for text in texts[:-1]])
+        rows = np.searchsorted(text_starts, letters[first], side='right') - 1
+        words = np.bincount(rows, minlength=count)
+        offsets = np.concatenate(([0], np.cumsum(words)[:-1]))
+
+        if self.lexicon is not None:
+            word_scores += self.lexicon_evidence * self._lexicon_hits(symbols, letters, first, rows)
+        np.clip(word_scores, -self.max_evidence, self.max_evidence, out=word_scores)
+        probs = 1.0 / (1.0 + np.exp(-word_scores))
+
+        for size in np.unique(words[words > 0]).tolist():
+            group = np.flatnonzero(words == size)
+            group_probs = probs[offsets[group, None] + np.arange(size)]
+            if size > _EXACT_WORDS:
+                means = group_probs.sum(axis=1).tolist()
+                variances = (group_probs * (1.0 - group_probs)).sum(axis=1).tolist()
+                result[group] = [_normal_tail(mean, variance, self.ratio * size)
+                                 for mean, variance in zip(means, variances)]
+                continue
+            dist = np.zeros((len(group), size + 1))
+            dist[:, 0] = 1.0
+            for j in range(size):
+                p = group_probs[:, j, None]
+                q = 1.0 - p
+                dist[:, 1:j + 2] = dist[:, 1:j + 2] * q + dist[:, :j + 1] * p
+                dist[:, 0] *= q[:, 0]
+            result[group] = dist[:, np.arange(size + 1) > self.ratio * size].sum(axis=1)
+        return result
+
+    def _lexicon_hits(self, symbols, letters, first, rows):
+        """
+        Lexicon.match() for every word of a batch at once
+
+        Words are compared by the hashes of audio.lexicon rather than run
+        through the phrase automaton: a word hash from its letters, and a
+        phrase hash from each window of consecutive words in the same text.
+
+        Returns:
+            numpy.ndarray: True for each matched word
+        """
+        # Position of each letter in its word, and the matching power of WORD_BASE
+        word_ids = np.cumsum(symbols[letters - 1] == 0) - 1
+        positions = np.arange(len(letters)) - first[word_ids]
+        powers = _powers(WORD_BASE, int(positions.max()) + 1)
+        hashes = np.add.reduceat(symbols[letters].astype(np.uint64) * powers[positions], first)
+        matched = _isin(hashes, self.lexicon.word_hashes)
+
+        size = len(hashes)
+        covered = np.zeros(size + 1, dtype=np.int64)
+        phrase_powers = _powers(PHRASE_BASE, max(self.lexicon.phrase_lengths, default=0))
+        for length in self.lexicon.phrase_lengths:
+            windows = size - length + 1
+            if windows <= 0:
+                break
+            combined = np.zeros(windows, dtype=np.uint64)
+            for j in range(length):
+                combined += hashes[j:j + windows] * phrase_powers[j]
+            starts = np.flatnonzero(_isin(combined, self.lexicon.phrase_hashes)
+                                    & (rows[:windows] == rows[length - 1:]))
+            np.add.at(covered, starts, 1)
+            np.add.at(covered, starts + length, -1)
+        return matched | (np.cumsum(covered[:-1]) > 0)
+
+    def __repr__(self) -> str:
+        return f"HinglishModel(ratio={self.ratio}, prior={self.prior}, lexicon={self.lexicon!r})"
+
+
+def _normal_tail(mean: float, variance: float, needed: float) -> float:
+    """Normal approximation, with continuity correction, of the chance that more than needed words are Hindi"""
+    # The smallest count above needed, less half a word
+    edge = math.floor(needed) + 0.5
+    if variance <= 0.0:
+        return 1.0 if mean > edge else 0.0
+    return 0.5 * math.erfc((edge - mean) / math.sqrt(2.0 * variance))
+
+
+def _powers(base: int, count: int):
+    """base**i modulo 2**64 for i < count, as a uint64 array"""
+    powers = [1] * count
+    for i in range(1, count):
+        powers[i] = powers[i - 1] * base & 0xFFFFFFFFFFFFFFFF
+    return np.array(powers, dtype=np.uint64)
+
+
+def _isin(values, sorted_hashes: List[int]):
+    """Membership of uint64 values in a sorted list of hashes"""
+    if not sorted_hashes:
+        return np.zeros(len(values), dtype=bool)
+    table = np.array(sorted_hashes, dtype=np.uint64)
+    found = np.minimum(np.searchsorted(table, values), len(table) - 1)
+    return table[found] == values
+
+
+def train_model(hindi_words: Iterable[str], english_words: Iterable[str], path: str = DEFAULT_MODEL_PATH,
+                smoothing: float = 0.5, prior: float = -3.5, ratio: float = 0.2) -> HinglishModel:
+    """
+    Build the trigram tables from word lists and write them to path
+
+    Args:
+        hindi_words (iterable): Romanized Hindi words
+        english_words (iterable): English words
+        path (str): JSON file to write
+        smoothing (float): Add-k smoothing constant for trigram counts
+        prior (float): Log-odds added to every word, the bias towards Hindi
+        ratio (float): Share of Hindi words above which a text is Hinglish
+
+    Returns:
+        HinglishModel: The trained model
+    """
+    log_probs, unseen = _trigram_tables(hindi_words, english_words, smoothing)
+    data = {'alphabet': ALPHABET, 'smoothing': smoothing, 'prior': prior, 'ratio': ratio,
+            'unseen': unseen, 'log_probs': log_probs}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write('\n')
+    return HinglishModel(log_probs, unseen, prior, ratio)
+
+
+def _trigram_tables(hindi_words: Iterable[str], english_words: Iterable[str],
+                    smoothing: float) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+    """Smoothed trigram log-probabilities and unseen log-probability per language"""
+    trigrams = _SIZE * (_SIZE - 1) * _SIZE  # The middle symbol is always a letter
+    log_probs = {}
+    unseen = {}
+    for language, words in (('hi', hindi_words), ('en', english_words)):
+        counts = Counter()
+        for word in words:
+            if not _WORD.fullmatch(word):
+                continue
+            padded = ' ' + word.lower() + ' '
+            counts.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        total = sum(counts.values()) + smoothing * trigrams
+        log_probs[language] = {t: round(math.log((c + smoothing) / total), 4) for t, c in sorted(counts.items())}
+        unseen[language] = round(math.log(smoothing / total), 4)
+    return log_probs, unseen
+
+
+_model = None
+_model_failed = False
+_model_lock = threading.Lock()
+
+
+def get_hinglish_model() -> Optional[HinglishModel]:
+    """Return the process-wide Hinglish model, loading it on first use; None if it can't be loaded"""
+    global _model, _model_failed
+    with _model_lock:
+        if _model is None and not _model_failed:
+            try:
+                _model = HinglishModel.load(lexicon=get_lexicon())
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error loading Hinglish model: {e}")
+                _model_failed = True
+        return _model
+
+
+def _load_eval(path: str = os.path.join(LANGUAGE_DATA_DIR, 'hinglish_eval.tsv')) -> List[Tuple[bool, str]]:
+    """Labeled phrases as (is Hinglish, text)"""
+    with open(path, encoding='utf-8') as f:
+        rows = [line.rstrip('\n').split('\t', 1) for line in f if line.strip() and not line.startswith('#')]
+    return [(label == 'hi', text) for label, text in rows]
+
+
+def _folds(samples: List[Tuple[bool, str]], folds: int) -> List[Tuple[range, set]]:
+    """Labeled phrases split into folds, as (sample indices, words in them)"""
+    result = []
+    for fold in range(folds):
+        held = range(fold, len(samples), folds)
+        result.append((held, {word for i in held for word in HinglishModel.words(samples[i][1])}))
+    return result
+
+
+def _held_out_model(vocabulary: set) -> HinglishModel:
+    """A model whose tables and lexicon were built from the word lists without any word in vocabulary"""
+    entries = [entry for entry in read_word_list(os.path.join(LANGUAGE_DATA_DIR, 'hinglish_words.txt'))
+               if not vocabulary.intersection(entry.split())]
+    english = [word for word in read_word_list(os.path.join(LANGUAGE_DATA_DIR, 'english_words.txt'))
+               if word not in vocabulary]
+    return HinglishModel(*_trigram_tables(entries, english, 0.5), lexicon=Lexicon(entries))
+
+
+def _choose_prior(samples: List[Tuple[bool, str]], folds: List[Tuple[range, set]],
+                  exclude: Optional[set] = None) -> float:
+    """
+    The prior that scores labeled phrases best when their words are held out of training
+
+    Each fold is scored by a model built without the fold's words, and
+    without the words in exclude.
+
+    Returns:
+        float: Best prior from _PRIORS; ties go to the one nearest zero
+    """
+    correct = Counter()
+    for held, vocabulary in folds:
+        model = _held_out_model(vocabulary | (exclude or set()))
+        for prior in _PRIORS:
+            model.prior = prior
+            correct[prior] += sum(1 for i in held if model.is_hinglish(samples[i][1]) == samples[i][0])
+    return max(_PRIORS, key=lambda prior: (correct[prior], -abs(prior)))
+
+
+def _cross_validate(samples: List[Tuple[bool, str]], folds: int = 10):
+    """
+    Predictions for labeled phrases from models that never saw their words
+
+    The phrases are split into folds. Each fold is scored by a model built
+    from the word lists minus every word in the fold's phrases, with a
+    lexicon missing them too. Its prior is picked by
+    _choose_prior() on the other folds, with the scored fold's words held
+    out as well, so nothing is tuned on the phrases being scored. The
+    keyword heuristic is not trained on the word lists, so it is scored
+    with the full HINGLISH_KEYWORDS.
+
+    Returns:
+        tuple: Keyword heuristic and trigram model predictions in sample order, and the priors picked
+    """
+    from audio.language_processing import HINGLISH_KEYWORDS, is_hinglish
+
+    split = _folds(samples, folds)
+    keywords = list(HINGLISH_KEYWORDS)
+    keyword_predictions = [is_hinglish(text, keywords) for _, text in samples]
+    model_predictions = [False] * len(samples)
+    chosen = []
+    for fold, (held, vocabulary) in enumerate(split):
+        model = _held_out_model(vocabulary)
+        model.prior = _choose_prior(samples, split[:fold] + split[fold + 1:], vocabulary)
+        chosen.append(model.prior)
+        for i in held:
+            model_predictions[i] = model.is_hinglish(samples[i][1])
+    return keyword_predictions, model_predictions, chosen
+
+
+def _benchmark(repeat: int = 200) -> None:
+    """Compare the model with the keyword heuristic for held-out accuracy and throughput"""
+    import time
+    from audio.language_processing import HINGLISH_KEYWORDS, is_hinglish
+
+    samples = _load_eval()
+    model = HinglishModel.load(lexicon=get_lexicon())
+    keywords = list(HINGLISH_KEYWORDS)
+    keyword_predictions, model_predictions, priors = _cross_validate(samples)
+
+    def report(name, predict, predicted):
+        correct = sum(1 for (label, _), guess in zip(samples, predicted) if label == guess)
+        missed = sum(1 for (label, _), guess in zip(samples, predicted) if label and not guess)
+        false = sum(1 for (label, _), guess in zip(samples, predicted) if guess and not label)
+        texts = [text for _, text in samples] * repeat
+        start = time.perf_counter()
+        for text in texts:
+            predict(text)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20} accuracy {correct / len(samples):6.1%} (missed {missed}, false {false}), "
+              f"{len(texts) / elapsed:10.0f} texts/s")
+
+    print(f"{len(samples)} labeled phrases, accuracy cross-validated in {len(priors)} folds "
+          f"with their words held out of training (priors picked: {min(priors)} to {max(priors)})")
+    report("keyword heuristic", lambda text: is_hinglish(text, keywords), keyword_predictions)
+    report("trigram model", model.is_hinglish, model_predictions)
+
+    if np is not None:
+        texts = [text for _, text in samples] * repeat
+        start = time.perf_counter()
+        batch = model.confidences(texts)
+        elapsed = time.perf_counter() - start
+        expected = [model.confidence(text) for _, text in samples]
+        mismatches = int(np.sum((batch[:len(samples)] > 0.5) != (np.array(expected) > 0.5)))
+        print(f"{'trigram model batch':<20} {len(texts) / elapsed:37.0f} texts/s, mismatches {mismatches}")
+
+
+if __name__ == '__main__':
+    import sys
+
+    if sys.argv[1:] == ['train']:
+        prior = _choose_prior(_load_eval(), _folds(_load_eval(), 10))
+        train_model(read_word_list(os.path.join(LANGUAGE_DATA_DIR, 'hinglish_words.txt')),
+                    read_word_list(os.path.join(LANGUAGE_DATA_DIR, 'english_words.txt')), prior=prior)
+        print(f"Wrote {DEFAULT_MODEL_PATH} with prior {prior}")
+    else:
+        _benchmark()
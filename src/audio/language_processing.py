@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+ScriptClassifier class for picking a TTS language from the script of a text
+Part of the audio module
+
+Every code point is mapped to a script class through a table built once per
+process from the ranges below, so classifying a text is one pass of table
+lookups however many scripts are known. A few classes mark letters only one
+language of a shared script uses (e.g. Ukrainian і/ї/є in Cyrillic, Urdu ے
+in Arabic, kana among Han ideographs) and refine the language choice.
+
+detect_languages() applies the same rules to whole batches with NumPy, for
+classifying large corpora offline. Run this module to benchmark it against
+the per-string functions:
+
+    python -m audio.language_processing
+"""
+
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Script classes as (script, language). The first entry of each script is its
+# base class, and its language the default for that script; later entries
+# are marker letters pointing to a more specific language. Index 0 is for
+# code points without a script (spaces, digits, punctuation, symbols).
+SCRIPT_CLASSES: List[Tuple[Optional[str], Optional[str]]] = [
+    (None, None),
+    ('Latin', None),
+    ('Latin', 'vi'),
+    ('Greek', 'el'),
+    ('Cyrillic', 'ru'),
+    ('Cyrillic', 'uk'),
+    ('Cyrillic', 'sr'),
+    ('Hebrew', 'he'),
+    ('Arabic', 'ar'),
+    ('Arabic', 'ur'),
+    ('Devanagari', 'hi'),
+    ('Bengali', 'bn'),
+    ('Bengali', 'as'),
+    ('Gurmukhi', 'pa'),
+    ('Gujarati', 'gu'),
+    ('Oriya', 'or'),
+    ('Tamil', 'ta'),
+    ('Telugu', 'te'),
+    ('Kannada', 'kn'),
+    ('Malayalam', 'ml'),
+    ('Thai', 'th'),
+    ('Hangul', 'ko'),
+    ('Han', 'zh'),
+    ('Han', 'ja'),
+]
+
+_CLASS_IDS = {entry: i for i, entry in enumerate(SCRIPT_CLASSES)}
+
+# Script name to the index of its base class
+_BASE_IDS = {}
+for _i, (_script, _) in enumerate(SCRIPT_CLASSES):
+    _BASE_IDS.setdefault(_script, _i)
+
+# (first, last, class) code point ranges. Later entries override earlier
+# ones, so marker letters come after the block they belong to.
+_RANGES = [
+    (0x0041, 0x005A, ('Latin', None)),
+    (0x0061, 0x007A, ('Latin', None)),
+    (0x00C0, 0x00D6, ('Latin', None)),
+    (0x00D8, 0x00F6, ('Latin', None)),
+    (0x00F8, 0x024F, ('Latin', None)),
+    (0x1E00, 0x1EFF, ('Latin', None)),
+    (0x2C60, 0x2C7F, ('Latin', None)),
+    (0xA720, 0xA7FF, ('Latin', None)),
+    (0xFF21, 0xFF3A, ('Latin', None)),
+    (0xFF41, 0xFF5A, ('Latin', None)),
+    (0x01A0, 0x01A1, ('Latin', 'vi')),  # Ơ ơ
+    (0x01AF, 0x01B0, ('Latin', 'vi')),  # Ư ư
+    (0x1EA0, 0x1EF9, ('Latin', 'vi')),  # Vietnamese tone-marked vowels
+    (0x0370, 0x03FF, ('Greek', 'el')),
+    (0x1F00, 0x1FFF, ('Greek', 'el')),
+    (0x0400, 0x052F, ('Cyrillic', 'ru')),
+    (0x1C80, 0x1C8F, ('Cyrillic', 'ru')),
+    (0x2DE0, 0x2DFF, ('Cyrillic', 'ru')),
+    (0xA640, 0xA69F, ('Cyrillic', 'ru')),
+    (0x0404, 0x0404, ('Cyrillic', 'uk')),  # Є
+    (0x0406, 0x0407, ('Cyrillic', 'uk')),  # І Ї
+    (0x0454, 0x0454, ('Cyrillic', 'uk')),  # є
+    (0x0456, 0x0457, ('Cyrillic', 'uk')),  # і ї
+    (0x0490, 0x0491, ('Cyrillic', 'uk')),  # Ґ ґ
+    (0x0402, 0x0402, ('Cyrillic', 'sr')),  # Ђ
+    (0x0408, 0x040B, ('Cyrillic', 'sr')),  # Ј Љ Њ Ћ
+    (0x040F, 0x040F, ('Cyrillic', 'sr')),  # Џ
+    (0x0452, 0x0452, ('Cyrillic', 'sr')),  # ђ
+    (0x0458, 0x045B, ('Cyrillic', 'sr')),  # ј љ њ ћ
+    (0x045F, 0x045F, ('Cyrillic', 'sr')),  # џ
+    (0x0590, 0x05FF, ('Hebrew', 'he')),
+    (0xFB1D, 0xFB4F, ('Hebrew', 'he')),
+    (0x0600, 0x06FF, ('Arabic', 'ar')),
+    (0x0750, 0x077F, ('Arabic', 'ar')),
+    (0x08A0, 0x08FF, ('Arabic', 'ar')),
+    (0xFB50, 0xFDFF, ('Arabic', 'ar')),
+    (0xFE70, 0xFEFF, ('Arabic', 'ar')),
+    (0x0679, 0x0679, ('Arabic', 'ur')),  # ٹ
+    (0x0688, 0x0688, ('Arabic', 'ur')),  # ڈ
+    (0x0691, 0x0691, ('Arabic', 'ur')),  # ڑ
+    (0x06BA, 0x06BA, ('Arabic', 'ur')),  # ں
+    (0x06BE, 0x06BE, ('Arabic', 'ur')),  # ھ
+    (0x06C1, 0x06C1, ('Arabic', 'ur')),  # ہ
+    (0x06D2, 0x06D2, ('Arabic', 'ur')),  # ے
+    (0x0900, 0x097F, ('Devanagari', 'hi')),
+    (0xA8E0, 0xA8FF, ('Devanagari', 'hi')),
+    (0x0980, 0x09FF, ('Bengali', 'bn')),
+    (0x09F0, 0x09F1, ('Bengali', 'as')),  # ৰ ৱ
+    (0x0A00, 0x0A7F, ('Gurmukhi', 'pa')),
+    (0x0A80, 0x0AFF, ('Gujarati', 'gu')),
+    (0x0B00, 0x0B7F, ('Oriya', 'or')),
+    (0x0B80, 0x0BFF, ('Tamil', 'ta')),
+    (0x0C00, 0x0C7F, ('Telugu', 'te')),
+    (0x0C80, 0x0CFF, ('Kannada', 'kn')),
+    (0x0D00, 0x0D7F, ('Malayalam', 'ml')),
+    (0x0E00, 0x0E7F, ('Thai', 'th')),
+    (0x1100, 0x11FF, ('Hangul', 'ko')),
+    (0x3130, 0x318F, ('Hangul', 'ko')),
+    (0xAC00, 0xD7AF, ('Hangul', 'ko')),
+    (0x3400, 0x4DBF, ('Han', 'zh')),
+    (0x4E00, 0x9FFF, ('Han', 'zh')),
+    (0xF900, 0xFAFF, ('Han', 'zh')),
+    (0x20000, 0x2FA1F, ('Han', 'zh')),
+    (0x3040, 0x30FF, ('Han', 'ja')),  # Hiragana and Katakana
+    (0x31F0, 0x31FF, ('Han', 'ja')),
+    (0xFF66, 0xFF9F, ('Han', 'ja')),
+    # Shared by several scripts, so they say nothing about which one
+    (0x0964, 0x0965, (None, None)),  # Danda, double danda
+    (0x0660, 0x0669, (None, None)),  # Arabic-Indic digits
+    (0x06F0, 0x06F9, (None, None)),
+    (0x060C, 0x060C, (None, None)),  # Arabic comma
+]
+
+# Common romanized Hindi words
+HINGLISH_KEYWORDS = (
+    'hai', 'hain', 'kar', 'kya', 'kaise', 'kahan', 'kab', 'kyun', 'kaun',
+    'aur', 'main', 'hum', 'tum', 'aap', 'yeh', 'woh', 'iske', 'uske',
+    'mera', 'tera', 'hamara', 'tumhara', 'apka', 'iska', 'uska',
+    'karna', 'hona', 'jana', 'aana', 'lena', 'dena', 'dekha', 'suna',
+    'accha', 'bura', 'bada', 'chota', 'naya', 'purana', 'thik', 'galat',
+    'bahut', 'kam', 'zyada', 'sab', 'kuch', 'koi', 'sabko', 'kisiko'
+)
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def script_table() -> bytes:
+    """
+    Return the code point to script class table, building it on first use
+
+    Returns:
+        bytes: Index into SCRIPT_CLASSES for every code point up to U+10FFFF
+    """
+    global _table
+    with _table_lock:
+        if _table is None:
+            table = bytearray(0x110000)
+            for first, last, entry in _RANGES:
+                table[first:last + 1] = bytes([_CLASS_IDS[entry]]) * (last - first + 1)
+            _table = bytes(table)
+        return _table
+
+
+def class_counts(text: str) -> Counter:
+    """
+    Count the characters of text in each script class, in one pass
+
+    Args:
+        text (str): Text to scan
+
+    Returns:
+        Counter: Index into SCRIPT_CLASSES to number of characters
+    """
+    return Counter(map(script_table().__getitem__, map(ord, text)))
+
+
+def script_counts(text: str) -> Dict[str, int]:
+    """
+    Count the letters of text in each script
+
+    Args:
+        text (str): Text to scan
+
+    Returns:
+        dict: Script name to number of characters, leaving out spaces, digits and punctuation
+    """
+    counts = {}
+    for class_id, count in class_counts(text).items():
+        script = SCRIPT_CLASSES[class_id][0]
+        if script is not None:
+            counts[script] = counts.get(script, 0) + count
+    return counts
+
+
+class ScriptClassifier:
+    """Maps the dominant writing system of a text to a TTS language code"""
+
+    def __init__(self, languages: Iterable[str], threshold: float = 0.3, min_chars: int = 1,
+                 script_languages: Optional[Dict[str, str]] = None):
+        """
+        Initialize the classifier
+
+        Args:
+            languages (iterable): Language codes that may be returned, e.g. supported_languages
+            threshold (float): Share of a text's letters a script needs before it decides the language
+            min_chars (int): Letters a text needs before any language is detected
+            script_languages (dict, optional): Script name to language overrides for scripts
+                shared by several languages, e.g. {'Devanagari': 'mr'}
+        """
+        self.languages = frozenset(languages)
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.script_languages = dict(script_languages or {})
+
+    def _language(self, script: str, markers: Dict[str, int]) -> Optional[str]:
+        """Language for a script, refined by its marker letters when they are supported"""
+        if script in self.script_languages:
+            return self.script_languages[script]
+        if markers:
+            # Most frequent marker; ties go to the one listed first in SCRIPT_CLASSES
+            marker = max(markers, key=lambda lang: (markers[lang], -_CLASS_IDS[(script, lang)]))
+            if marker in self.languages:
+                return marker
+        base = SCRIPT_CLASSES[_BASE_IDS[script]][1]
+        return base if base in self.languages else None
+
+    def decide(self, counts: Counter) -> Optional[str]:
+        """
+        Pick a language from script class counts, e.g. from class_counts()
+
+        Args:
+            counts (Counter): Index into SCRIPT_CLASSES to number of characters
+
+        Returns:
+            str: Language code, or None if no script with a known language is dominant enough
+        """
+        totals = {}
+        markers = {}
+        for class_id, count in counts.items():
+            script, language = SCRIPT_CLASSES[class_id]
+            if script is None:
+                continue
+            totals[script] = totals.get(script, 0) + count
+            if class_id != _BASE_IDS[script]:
+                markers.setdefault(script, {})[language] = count
+
+        letters = sum(totals.values())
+        if letters < max(1, self.min_chars):
+            return None
+
+        # Most frequent script first; ties go to the one listed first in SCRIPT_CLASSES
+        for script in sorted(totals, key=lambda name: (-totals[name], _BASE_IDS[name])):
+            if totals[script] / letters < self.threshold:
+                break
+            language = self._language(script, markers.get(script, {}))
+            if language is not None:
+                return language
+        return None
+
+    def detect(self, text: str) -> Optional[str]:
+        """
+        Detect the language of text from its script
+
+        Args:
+            text (str): Text to analyze
+
+        Returns:
+            str: Language code, or None when the script does not decide it (e.g. Latin text)
+        """
+        return self.decide(class_counts(text))
+
+    def __repr__(self) -> str:
+        return f"ScriptClassifier(languages={len(self.languages)}, threshold={self.threshold})"
+
+
+def is_hinglish(text: str, keywords: Iterable[str], ratio: float = 0.2) -> bool:
+    """
+    Check if more than ratio of the words in text are Hinglish keywords
+
+    Args:
+        text (str): Text to analyze
+        keywords (iterable): Romanized Hindi words, lowercase
+        ratio (float): Share of keyword words above which text counts as Hinglish
+
+    Returns:
+        bool: True if Hinglish is detected
+    """
+    words = text.lower().split()
+    if not words:
+        return False
+    return sum(1 for word in words if word in keywords) / len(words) > ratio
+
+
+def detect_language(text: str, classifier: ScriptClassifier, keywords: Iterable[str],
+                    default: str = 'en', model=None) -> str:
+    """
+    Detect the TTS language of one text: by script, then Hinglish, then default
+
+    Args:
+        text (str): Text to analyze
+        classifier (ScriptClassifier): Script rules
+        keywords (iterable): Romanized Hindi words, lowercase
+        default (str): Language when neither script nor Hinglish detection decide
+        model (HinglishModel, optional): Detects Hinglish instead of the keywords
+
+    Returns:
+        str: Language code
+    """
+    language = classifier.detect(text)
+    if language is not None:
+        return language
+    if model.is_hinglish(text) if model is not None else is_hinglish(text, keywords):
+        return 'hi'
+    return default
+
+
+_TOKEN = re.compile(r'\S+\s*')
+
+
+def segment_languages(text: str, classifier: ScriptClassifier, keywords: Iterable[str],
+                      default: str = 'en', model=None) -> List[Tuple[str, str]]:
+    """
+    Split text into runs that each have one TTS language
+
+    Whitespace-separated words are grouped into runs of the same script.
+    Each run gets its language the way detect_language() would pick it for
+    the run alone, so romanized Latin runs can come out as Hinglish ('hi'),
+    and neighbouring runs that end up with the same language are merged.
+    Words without letters (numbers, punctuation) join the run before them.
+
+    Args:
+        text (str): Text to split, e.g. "Your meeting हैं at 5 baje"
+        classifier (ScriptClassifier): Script rules
+        keywords (iterable): Romanized Hindi words, lowercase
+        default (str): Language for runs neither script nor Hinglish detection decide
+        model (HinglishModel, optional): Detects Hinglish instead of the keywords
+
+    Returns:
+        list: (language, text) pairs in order; empty if text has nothing to say
+    """
+    runs = []  # [script, text, class counts]
+    leading = ''
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        counts = class_counts(token)
+        totals = Counter()
+        for class_id, count in counts.items():
+            script = SCRIPT_CLASSES[class_id][0]
+            if script is not None:
+                totals[script] += count
+        if not totals:
+            if runs:
+                runs[-1][1] += token
+            else:
+                leading += token
+            continue
+
+        script = max(totals, key=lambda name: (totals[name], -_BASE_IDS[name]))
+        if runs and runs[-1][0] == script:
+            runs[-1][1] += token
+            runs[-1][2].update(counts)
+        else:
+            runs.append([script, leading + token, counts])
+            leading = ''
+
+    if not runs:
+        return [(default, text.strip())] if text.strip() else []
+
+    segments = []
+    for script, part, counts in runs:
+        language = classifier.decide(counts)
+        if language is None:
+            language = default
+            if script == 'Latin' and (model.is_hinglish(part) if model is not None else is_hinglish(part, keywords)):
+                language = 'hi'
+        if segments and segments[-1][0] == language:
+            segments[-1] = (language, segments[-1][1] + part)
+        else:
+            segments.append((language, part))
+    return [(language, part.strip()) for language, part in segments]
+
+
+# Texts handled at a time by detect_languages(); 16k texts of a few dozen
+# characters keep each block's arrays within a few MB, in the CPU cache
+_BLOCK_TEXTS = 16384
+
+
+def detect_languages(texts: Sequence[str], classifier: ScriptClassifier, keywords: Iterable[str],
+                     default: str = 'en', ratio: float = 0.2, model=None):
+    """
+    Detect the TTS language of many texts at once
+
+    Gives the same answer as detect_language() for every text. Texts are
+    converted to code point arrays a block at a time, each block's script
+    histograms come from a single bincount and the per-text decisions are
+    array operations; keyword words are split and looked up by str and dict
+    methods over whole blocks. The Python overhead is per block rather than
+    per character.
+
+    Args:
+        texts (sequence): Texts to analyze
+        classifier (ScriptClassifier): Script rules
+        keywords (iterable): Romanized Hindi words, lowercase
+        default (str): Language when neither script nor Hinglish detection decide
+        ratio (float): Share of keyword words above which a text counts as Hinglish
+        model (HinglishModel, optional): Detects Hinglish instead of the keywords
+
+    Returns:
+        numpy.ndarray: Language code for each text, in input order
+
+    Raises:
+        ImportError: When NumPy is not installed
+    """
+    if np is None:
+        raise ImportError("detect_languages() needs numpy: pip install numpy")
+
+    texts = list(texts)
+    count = len(texts)
+    if count == 0:
+        return np.array([], dtype=str)
+
+    # Language codes as integers; 0 means no language
+    codes = [None] + sorted(set(classifier.languages) | set(classifier.script_languages.values()))
+    code_ids = {code: i for i, code in enumerate(codes)}
+
+    # Script histograms, a block of texts at a time
+    decided = np.zeros(count, dtype=bool)
+    script_code = np.zeros(count, dtype=np.int64)
+    for first in range(0, count, _BLOCK_TEXTS):
+        block = texts[first:first + _BLOCK_TEXTS]
+        joined = ''.join(block)
+        # Pure ASCII text is Latin without markers, which never decides the
+        # language unless Latin is overridden, so it needs no histogram
+        if joined.isascii() and 'Latin' not in classifier.script_languages:
+            continue
+        codepoints = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        lengths = np.fromiter(map(len, block), dtype=np.int64, count=len(block))
+        rows = slice(first, first + len(block))
+        decided[rows], script_code[rows] = _script_codes(codepoints, lengths, classifier, code_ids)
+
+    # Hinglish for the texts the script left undecided
+    hinglish = np.zeros(count, dtype=bool)
+    subset = np.flatnonzero(~decided)
+    if len(subset) and model is not None:
+        hinglish[subset] = model.confidences(texts if len(subset) == count else
+                                             [texts[i] for i in subset.tolist()]) > 0.5
+    elif len(subset):
+        keywords = set(keywords)
+        for first in range(0, len(subset), _BLOCK_TEXTS):
+            rows = subset[first:first + _BLOCK_TEXTS]
+            words, hits = _keyword_counts([texts[i] for i in rows.tolist()], keywords)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                hinglish[rows] = (words > 0) & (hits / words > ratio)
+
+    labels = np.array(codes[1:] + ['hi', default], dtype=str)
+    # Map code ids to labels, with the Hinglish and default fallbacks last
+    index = np.where(decided, script_code - 1, np.where(hinglish, len(codes) - 1, len(codes)))
+    return labels[index]
+
+
+def _script_codes(codepoints, lengths, classifier: ScriptClassifier, code_ids: Dict[Optional[str], int]):
+    """
+    Apply ScriptClassifier.decide() to every text at once
+
+    Args:
+        codepoints (numpy.ndarray): The texts' characters, concatenated
+        lengths (numpy.ndarray): Characters per text
+
+    Returns:
+        tuple: Whether each text's language was decided, and its code id
+    """
+    count = len(lengths)
+
+    # Script class histogram with one row per class and one column per text,
+    # so every step below works on whole rows
+    keys = np.repeat(np.arange(count), lengths)
+    if len(codepoints):
+        # Row offset of each class, for the code points up to the largest one here
+        offsets = np.frombuffer(script_table(), dtype=np.uint8)[:int(codepoints.max()) + 1] * np.int64(count)
+        keys += offsets[codepoints]
+    histogram = np.bincount(keys, minlength=len(SCRIPT_CLASSES) * count).reshape(len(SCRIPT_CLASSES), count)
+    letters = lengths - histogram[0]  # Every class but the first belongs to a script
+
+    # The most frequent script with a language and a large enough share wins.
+    # Like decide(), only scripts a text uses are considered, so each script
+    # works on just those texts; scripts are visited in SCRIPT_CLASSES order
+    # and only a larger count replaces the leader, matching its tie-break
+    best = np.zeros(count, dtype=np.int64)
+    winner = np.zeros(count, dtype=np.int64)
+    for script in list(_BASE_IDS)[1:]:  # Skip the class without a script
+        class_ids = [i for i, (name, _) in enumerate(SCRIPT_CLASSES) if name == script]
+        # A script's classes are adjacent in SCRIPT_CLASSES
+        total = histogram[class_ids[0]:class_ids[-1] + 1].sum(axis=0)
+        present = np.flatnonzero(total)
+        if script in classifier.script_languages:
+            language = code_ids[classifier.script_languages[script]]
+        else:
+            base = SCRIPT_CLASSES[class_ids[0]][1]
+            language = code_ids[base] if base in classifier.languages else 0
+            # Marker letters refine the language where any are supported
+            if any(SCRIPT_CLASSES[i][1] in classifier.languages for i in class_ids[1:]):
+                marker_counts = histogram[class_ids[1]:class_ids[-1] + 1, present]
+                marker_codes = np.array([code_ids[SCRIPT_CLASSES[i][1]] if SCRIPT_CLASSES[i][1] in classifier.languages
+                                         else language for i in class_ids[1:]])
+                # argmax picks the first of equal counts, matching the scalar tie-break
+                language = np.where(marker_counts.any(axis=0), marker_codes[marker_counts.argmax(axis=0)],
+                                    language)
+                keep = language != 0
+                present, language = present[keep], language[keep]
+        if not len(present) or np.isscalar(language) and language == 0:
+            continue
+        totals = total[present]
+        lead = (totals / letters[present] >= classifier.threshold) & (totals > best[present])
+        best[present[lead]] = totals[lead]
+        winner[present[lead]] = language if np.isscalar(language) else language[lead]
+    decided = (winner != 0) & (letters >= max(1, classifier.min_chars))
+    return decided, winner
+
+
+def _keyword_counts(texts: List[str], keywords: Iterable[str]):
+    """
+    Count the words of each text, as str.lower().split() gives them, and how many are keywords
+
+    The texts are lowered and split as one string with a NUL word between
+    them, so the splitting and keyword lookups run in C; texts that contain
+    NUL themselves are split one by one. With ASCII keywords and only ASCII
+    whitespace in the texts, the string is lowered and split as UTF-8 bytes,
+    which is several times faster and finds the same words and keywords: the
+    Kelvin sign is the one non-ASCII letter that lowercases to ASCII.
+
+    Returns:
+        tuple: Word count and keyword count arrays, one entry per text
+    """
+    count = len(texts)
+    joined = ' \0 '.join(texts)
+    if joined.count('\0') != count - 1:
+        # A text holds NUL itself
+        words = [text.lower().split() for text in texts]
+        return (np.fromiter(map(len, words), dtype=np.int64, count=count),
+                np.fromiter((sum(1 for word in text_words if word in keywords) for text_words in words),
+                            dtype=np.int64, count=count))
+
+    # 1 for a keyword, 2 for the separator between texts, 0 for any other word
+    if all(word.isascii() for word in keywords) and not any(space in joined for space in _unicode_spaces()):
+        tokens = joined.replace('\u212a', 'k').encode('utf-8', 'surrogatepass').lower().split()
+        kinds = defaultdict(int, ((word.encode('ascii'), 1) for word in keywords))
+        kinds[b'\0'] = 2
+    else:
+        tokens = joined.lower().split()
+        kinds = defaultdict(int, dict.fromkeys(keywords, 1))
+        kinds['\0'] = 2
+    kind = np.fromiter(map(kinds.__getitem__, tokens), dtype=np.int8, count=len(tokens))
+    bounds = np.concatenate(([-1], np.flatnonzero(kind == 2), [len(tokens)]))
+    hits = np.concatenate(([0], np.cumsum(kind == 1)))
+    return np.diff(bounds) - 1, hits[bounds[1:]] - hits[bounds[:-1] + 1]
+
+
+_spaces = None
+
+
+def _unicode_spaces() -> str:
+    """Characters str.split() splits on and bytes.split() doesn't, all below U+3001"""
+    global _spaces
+    if _spaces is None:
+        _spaces = ''.join(c for c in map(chr, range(0x3001)) if c.isspace() and not c.encode('utf-8').isspace())
+    return _spaces
+
+
+def _benchmark(size: int = 200000, repeat: int = 3) -> None:
+    """Compare detect_languages() with detect_language() on a synthetic corpus, best of repeat runs each"""
+    import random
+    import time
+
+    samples = [
+        "Hello, how are you doing today?", "Your meeting is at 5 pm",
+        "main kya karun, bahut kaam hai", "aap kaise ho yaar", "मैं ठीक हूँ, आप कैसे हैं?",
+        "வணக்கம் நண்பா", "నమస్కారం, ఎలా ఉన్నారు?", "আমি ভালো আছি", "آپ کیسے ہیں؟", "مرحبا بك",
+        "Привет, как дела?", "Привіт, як справи?", "你好，今天天气很好", "こんにちは、元気ですか",
+        "안녕하세요", "สวัสดีครับ", "Γειά σου κόσμε", "שלום עולם", "Tôi khỏe, cảm ơn",
+        "Your meeting हैं at 5 baje", "ok", "", "12:30 !!",
+    ]
+    rng = random.Random(7)
+    corpus = [rng.choice(samples) + ' ' + rng.choice(samples) if rng.random() < 0.3 else rng.choice(samples)
+              for _ in range(size)]
+    languages = ['en', 'hi', 'ta', 'te', 'bn', 'ur', 'ar', 'ru', 'uk', 'zh', 'ja', 'ko', 'th', 'el', 'he', 'vi']
+    keywords = list(HINGLISH_KEYWORDS)
+    classifier = ScriptClassifier(languages)
+
+    scalar = vectorized = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        expected = [detect_language(text, classifier, keywords) for text in corpus]
+        scalar = min(scalar, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        actual = detect_languages(corpus, classifier, keywords)
+        vectorized = min(vectorized, time.perf_counter() - start)
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f"{size} texts: per-string {scalar:.3f}s, batch {vectorized:.3f}s, "
+          f"speedup {scalar / vectorized:.1f}x, mismatches {mismatches}")
+
+
+if __name__ == '__main__':
+    _benchmark()
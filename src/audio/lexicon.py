@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Lexicon class for matching romanized Hindi words and phrases
+Part of the audio module
+
+Single words are kept in a frozenset. Multi-word phrases ("koi baat nahi",
+"band kar do") are compiled into an Aho-Corasick automaton over the
+normalized text (lowercase words joined by single spaces), stored as a full
+transition table, so matching costs one table lookup per character however
+many phrases there are. Phrases are matched on word boundaries only. The
+table is a flat array of 32-bit ints built level by level, so 50,000
+entries compile in under two seconds into about 75 MB.
+
+The lexicon is read from resources/language_data/hinglish_words.txt and built
+once per process by get_lexicon(). Run this module to check that matching
+time per character does not grow with the lexicon, and to see the build
+time and memory of a large one:
+
+    python -m audio.lexicon
+"""
+
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'resources', 'language_data', 'hinglish_words.txt')
+
+# Symbols of normalized text: the space between words, then the letters
+_ALPHABET = ' abcdefghijklmnopqrstuvwxyz'
+_SIZE = len(_ALPHABET)
+_SYMBOLS = {c: i for i, c in enumerate(_ALPHABET)}
+
+# Multipliers for word and phrase hashes, used to look words up in bulk
+WORD_BASE = 0x100000001B3
+PHRASE_BASE = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+
+def word_hash(word: str) -> int:
+    """64-bit polynomial hash of a lowercase word; HinglishModel.confidences() computes the same with NumPy"""
+    h = 0
+    power = 1
+    for c in word:
+        h = (h + _SYMBOLS[c] * power) & _MASK
+        power = (power * WORD_BASE) & _MASK
+    return h
+
+
+def phrase_hash(words: Iterable[str]) -> int:
+    """64-bit hash of a sequence of lowercase words, combining their word_hash() values"""
+    h = 0
+    power = 1
+    for word in words:
+        h = (h + word_hash(word) * power) & _MASK
+        power = (power * PHRASE_BASE) & _MASK
+    return h
+
+
+class Lexicon:
+    """Immutable set of romanized words and phrases with a compiled phrase matcher"""
+
+    def __init__(self, entries: Iterable[str]):
+        """
+        Compile the lexicon
+
+        Args:
+            entries (iterable): Lowercase words and space-separated phrases of ASCII letters;
+                anything else is skipped
+        """
+        words = set()
+        phrases = set()
+        for entry in entries:
+            tokens = entry.lower().split()
+            if not tokens or not all(token.isascii() and token.isalpha() for token in tokens):
+                continue
+            if len(tokens) == 1:
+                words.add(tokens[0])
+            else:
+                phrases.add(' '.join(tokens))
+        self.words = frozenset(words)
+        self.phrases = frozenset(phrases)
+        self._build_automaton()
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_LEXICON_PATH) -> 'Lexicon':
+        """
+        Read a lexicon file: one word or phrase per line, blank lines and # comments skipped
+
+        Args:
+            path (str): File to read
+
+        Returns:
+            Lexicon: The compiled lexicon
+        """
+        with open(path, encoding='utf-8') as f:
+            return cls(line for line in f if not line.lstrip().startswith('#'))
+
+    def _build_automaton(self) -> None:
+        """Build the Aho-Corasick transition table and outputs for the phrases"""
+        # Trie in breadth-first order: sorted strings sharing a node are
+        # contiguous, so one pass per depth numbers that depth's nodes, and
+        # each node's children are numbered together, in symbol order.
+        keys = sorted(' ' + phrase + ' ' for phrase in self.phrases)
+        parents = array('i', [0])
+        symbols = array('b', [0])
+        outputs = [()]
+        nodes = [0] * len(keys)
+        active = list(range(len(keys)))
+        depth = 0
+        while active:
+            remaining = []
+            previous = None
+            child = 0
+            for i in active:
+                key = keys[i]
+                edge = (nodes[i], key[depth])
+                if edge != previous:
+                    previous = edge
+                    child = len(parents)
+                    parents.append(nodes[i])
+                    symbols.append(_SYMBOLS[key[depth]])
+                    outputs.append(())
+                nodes[i] = child
+                if depth + 1 == len(key):
+                    outputs[child] = (len(key),)
+                else:
+                    remaining.append(i)
+            active = remaining
+            depth += 1
+
+        # A state's row starts as a copy of its failure state's row, which is
+        # complete because failure states are shallower, then gets its own edges
+        states = len(parents)
+        delta = array('i', [0]) * (states * _SIZE)
+        fail = array('i', [0]) * states
+        child = 1
+        for state in range(states):
+            row = state * _SIZE
+            if state:
+                target = fail[state]
+                delta[row:row + _SIZE] = delta[target * _SIZE:(target + 1) * _SIZE]
+                if outputs[target]:
+                    outputs[state] += outputs[target]
+            while child < states and parents[child] == state:
+                symbol = symbols[child]
+                if state:
+                    fail[child] = delta[fail[state] * _SIZE + symbol]
+                delta[row + symbol] = child
+                child += 1
+        self._delta = delta
+        self._outputs = outputs
+        self.phrase_lengths = tuple(sorted({len(phrase.split()) for phrase in self.phrases}))
+        self.word_hashes = sorted(word_hash(word) for word in self.words)
+        self.phrase_hashes = sorted(phrase_hash(phrase.split()) for phrase in self.phrases)
+
+    def find_phrases(self, words: List[str]) -> List[Tuple[int, int]]:
+        """
+        Find every phrase in a sequence of words, overlapping matches included
+
+        Args:
+            words (list): Lowercase words of ASCII letters, e.g. from HinglishModel.words()
+
+        Returns:
+            list: (first word, word after the last) index pairs in order of their ends
+        """
+        if not self.phrases or len(words) < 2:
+            return []
+        text = ' ' + ' '.join(words) + ' '
+        starts = []
+        offset = 1
+        for word in words:
+            starts.append(offset)
+            offset += len(word) + 1
+
+        delta = self._delta
+        outputs = self._outputs
+        symbols = _SYMBOLS
+        found = []
+        state = 0
+        for i, c in enumerate(text):
+            state = delta[state * _SIZE + symbols[c]]
+            for length in outputs[state]:
+                found.append((bisect_left(starts, i - length + 1), bisect_right(starts, i)))
+        return found
+
+    def match(self, words: List[str]) -> List[bool]:
+        """
+        Mark the words that are in the lexicon or part of a lexicon phrase
+
+        Args:
+            words (list): Lowercase words of ASCII letters
+
+        Returns:
+            list: True for each matched word, in order
+        """
+        matched = [word in self.words for word in words]
+        for first, stop in self.find_phrases(words):
+            matched[first:stop] = [True] * (stop - first)
+        return matched
+
+    def __contains__(self, entry: str) -> bool:
+        return entry in self.words or entry in self.phrases
+
+    def __len__(self) -> int:
+        return len(self.words) + len(self.phrases)
+
+    def __repr__(self) -> str:
+        return f"Lexicon(words={len(self.words)}, phrases={len(self.phrases)})"
+
+
+_lexicon = None
+_lexicon_failed = False
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> Optional[Lexicon]:
+    """Return the process-wide Hinglish lexicon, building it on first use; None if it can't be read"""
+    global _lexicon, _lexicon_failed
+    with _lexicon_lock:
+        if _lexicon is None and not _lexicon_failed:
+            try:
+                _lexicon = Lexicon.load()
+            except OSError as e:
+                print(f"Error loading Hinglish lexicon: {e}")
+                _lexicon_failed = True
+        return _lexicon
+
+
+def _benchmark(entries: int = 50000, repeat: int = 200) -> None:
+    """Time building and match() with the shipped lexicon and a large synthetic one, and measure their memory"""
+    import random
+    import time
+    import tracemalloc
+
+    rng = random.Random(7)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    synthetic = [' '.join(''.join(rng.choice(letters) for _ in range(rng.randint(2, 8)))
+                          for _ in range(rng.randint(1, 4)))
+                 for _ in range(entries)]
+    with open(DEFAULT_LEXICON_PATH, encoding='utf-8') as f:
+        shipped = [line for line in f if not line.lstrip().startswith('#')]
+    words = "are yaar main ghar ja raha hoon, koi baat nahi, kal milte hain".split() * 20
+    words = [word.strip(',') for word in words]
+    characters = len(' '.join(words)) + 2
+
+    for name, lines in (('shipped', shipped), ('synthetic', synthetic)):
+        start = time.perf_counter()
+        lexicon = Lexicon(lines)
+        build = time.perf_counter() - start
+
+        # Rebuilt under tracemalloc, which slows building down too much to time it
+        tracemalloc.start()
+        measured = Lexicon(lines)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del measured
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            lexicon.match(words)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10} {lexicon!r:<40} {elapsed / repeat / characters * 1e9:6.0f} ns/char, "
+              f"{len(lexicon._outputs)} automaton states")
+        print(f"{'':<10} built in {build:.2f}s, {retained / 1e6:.1f} MB retained, {peak / 1e6:.1f} MB peak")
+
+
+if __name__ == '__main__':
+    _benchmark()
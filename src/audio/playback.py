@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Playback completion tracking for pygame mixer channels
+Part of the audio module
+
+pygame only reports the end of a sound through its event queue, which needs
+the display subsystem, so completion is derived from each Sound's length
+instead. A single monitor thread sleeps on a condition variable until the
+earliest expected end, confirms the channel is idle and signals the waiting
+handle. Nothing wakes up while audio is playing.
+"""
+
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+import pygame
+
+# How long to wait between checks once a sound should have ended but the
+# mixer is still draining its output buffer
+_DRAIN_INTERVAL = 0.005
+
+
+class PlaybackHandle:
+    """Waitable handle for audio playing on the mixer"""
+
+    def __init__(self):
+        """Initialize an unfinished handle"""
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until playback finishes
+
+        Args:
+            timeout (float, optional): Seconds to wait. Waits forever if None
+
+        Returns:
+            bool: True if playback finished, False on timeout
+        """
+        return self._done.wait(timeout)
+
+    def done(self) -> bool:
+        """Check if playback has finished or was cancelled"""
+        return self._done.is_set()
+
+    def add_done_callback(self, fn: Callable[['PlaybackHandle'], None]) -> None:
+        """
+        Call fn with this handle once playback finishes
+
+        The callback runs on whichever thread finishes the handle, or right
+        away if it already has.
+
+        Args:
+            fn (callable): Callback taking the handle
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self, cancelled: bool = False) -> None:
+        with self._lock:
+            if self._done.is_set():
+                return
+            self.cancelled = self.cancelled or cancelled
+            self.finished_at = time.monotonic()
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"Error in playback callback: {e}")
+
+    def __repr__(self) -> str:
+        state = 'cancelled' if self.cancelled else ('done' if self.done() else 'playing')
+        return f"PlaybackHandle({state})"
+
+
+class SpeechHandle(PlaybackHandle):
+    """Handle for an utterance queued with block=False"""
+
+    def __init__(self, on_cancel: Optional[Callable[['SpeechHandle'], None]] = None):
+        """
+        Initialize the handle
+
+        Args:
+            on_cancel (callable, optional): Called with the handle when cancel() is requested
+        """
+        super().__init__()
+        self.submitted_at = time.monotonic()
+        self.result: Optional[bool] = None
+        self.backend: Optional[str] = None  # Synthesis backend that produced the audio
+        self._on_cancel = on_cancel
+
+    def cancel(self) -> bool:
+        """
+        Cancel the utterance, stopping it if it is already playing
+
+        Returns:
+            bool: True if cancelled, False if it had already finished
+        """
+        if self.done():
+            return False
+        self.cancelled = True
+        if self._on_cancel is not None:
+            self._on_cancel(self)
+        return True
+
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        """Seconds from submission until audio started, or None if it never did"""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    def __repr__(self) -> str:
+        state = 'cancelled' if self.cancelled else ('done' if self.done() else 'pending')
+        return f"SpeechHandle({state}, result={self.result})"
+
+
+class ChannelPlayer:
+    """Plays Sounds back to back on one mixer channel with gapless handoff"""
+
+    def __init__(self, stop_event: threading.Event, on_start: Optional[Callable[[], None]] = None):
+        """
+        Initialize the player
+
+        Args:
+            stop_event (threading.Event): Set to abandon playback early
+            on_start (callable, optional): Called when the first sound starts playing
+        """
+        self.handle = PlaybackHandle()
+        self.channel = None
+        self.closed = False
+        self._stop = stop_event
+        self._on_start = on_start
+        self._end_time = 0.0     # Expected end of everything played or queued
+        self._last_start = 0.0   # Expected start of the most recently queued sound
+
+    def play(self, sound) -> None:
+        """
+        Play a sound, or queue it behind the one currently playing
+
+        Args:
+            sound (pygame.mixer.Sound): Decoded audio
+        """
+        if self._stop.is_set():
+            return
+
+        length = sound.get_length()
+        now = time.monotonic()
+
+        if self.channel is None:
+            self.channel = pygame.mixer.find_channel(True)
+
+        if not self.channel.get_busy():
+            self.channel.play(sound)
+            if self.handle.started_at is None:
+                self.handle.started_at = now
+                if self._on_start is not None:
+                    self._on_start()
+            self._last_start = now
+            self._end_time = now + length
+        else:
+            # A channel holds a single queued sound. Its slot frees up when
+            # the previously queued sound starts, which we know the time of.
+            if self._stop.wait(max(0.0, self._last_start - time.monotonic())):
+                return
+            while self.channel.get_queue() is not None:
+                if self._stop.wait(_DRAIN_INTERVAL):
+                    return
+            self.channel.queue(sound)
+            self._last_start = max(self._end_time, time.monotonic())
+            self._end_time = self._last_start + length
+
+        get_monitor().watch(self)
+
+    def close(self) -> PlaybackHandle:
+        """
+        Mark that no more sounds will be played
+
+        Returns:
+            PlaybackHandle: Handle signalled once the last sound has finished
+        """
+        self.closed = True
+        if self.channel is None:
+            self.handle._finish(cancelled=self._stop.is_set())
+        else:
+            get_monitor().watch(self)
+        return self.handle
+
+    def cancel(self) -> None:
+        """Stop this player's channel and release anyone waiting on it"""
+        self.closed = True
+        if self.channel is not None:
+            self.channel.stop()
+        self.handle._finish(cancelled=True)
+
+    def _check(self, now: float) -> Tuple[bool, Optional[float]]:
+        """Check if playback is over; if not, also return when to check again"""
+        if self.handle.done():
+            return False, None
+        if not self.closed:
+            return False, None  # play() or close() will wake the monitor
+        if now < self._end_time:
+            return False, self._end_time
+        if self.channel.get_busy():
+            return False, now + _DRAIN_INTERVAL
+        return True, None
+
+
+class PlaybackMonitor:
+    """Background thread that signals PlaybackHandles when their audio ends"""
+
+    def __init__(self):
+        """Start the monitor thread"""
+        self._cond = threading.Condition()
+        self._players = set()
+        self._thread = threading.Thread(target=self._run, name='tts-playback-monitor', daemon=True)
+        self._thread.start()
+
+    def watch(self, player: ChannelPlayer) -> None:
+        """Track a player, or re-evaluate it after its schedule changed"""
+        with self._cond:
+            self._players.add(player)
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                finished = []
+                next_check = None
+                for player in list(self._players):
+                    over, when = player._check(now)
+                    if over:
+                        finished.append(player)
+                    if over or player.handle.done():
+                        self._players.discard(player)
+                    elif when is not None and (next_check is None or when < next_check):
+                        next_check = when
+                if not finished:
+                    self._cond.wait(None if next_check is None else max(0.0, next_check - now))
+                    continue
+            # Finish outside the lock: done-callbacks may start playback, which calls watch()
+            for player in finished:
+                player.handle._finish()
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor() -> PlaybackMonitor:
+    """Return the process-wide playback monitor, starting it on first use"""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = PlaybackMonitor()
+        return _monitor
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+AdaptiveLimiter class for pacing requests to the TTS endpoint
+Part of the audio module
+
+The free Google TTS endpoint throttles clients that send too much at once.
+AdaptiveLimiter combines a token bucket (requests per second) with an AIMD
+concurrency limit (requests in flight): every success raises both a little,
+every throttling response (429 or 5xx) cuts both in half and honours any
+Retry-After. All TextToSpeech instances in a process share one limiter via
+get_limiter(), so together they settle at the highest rate the endpoint
+accepts.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class AdaptiveLimiter:
+    """Token bucket rate limiter with additive-increase/multiplicative-decrease concurrency"""
+
+    def __init__(self, rate: float = 10.0, burst: int = 10, concurrency: int = 8,
+                 min_rate: float = 0.5, max_rate: float = 100.0, rate_increase: float = 0.2,
+                 min_concurrency: int = 1, max_concurrency: int = 32, decrease_factor: float = 0.5,
+                 decrease_cooldown: float = 1.0):
+        """
+        Initialize the limiter
+
+        Args:
+            rate (float): Initial requests per second
+            burst (int): Bucket size, the requests that may be sent back to back
+            concurrency (int): Initial limit on requests in flight
+            min_rate (float): Lowest rate after backing off
+            max_rate (float): Highest rate reached by climbing
+            rate_increase (float): Requests per second added per success
+            min_concurrency (int): Lowest concurrency limit after backing off
+            max_concurrency (int): Highest concurrency limit reached by climbing
+            decrease_factor (float): Multiplier applied to rate and concurrency when throttled
+            decrease_cooldown (float): Seconds after a decrease during which further
+                throttling responses (from requests already in flight) are not counted again
+        """
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self.limit = float(concurrency)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_increase = rate_increase
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self.successes = 0
+        self.throttled = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = float('-inf')
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time since the last refill (lock held)"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a token and a free concurrency slot
+
+        Every successful acquire() must be followed by release().
+
+        Args:
+            timeout (float, optional): Seconds to wait. Waits forever if None
+
+        Returns:
+            bool: True if the request may be sent, False on timeout
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                slot_free = self.in_flight < int(self.limit)
+                if slot_free and self._tokens >= 1 and now >= self._paused_until:
+                    self._tokens -= 1
+                    self.in_flight += 1
+                    return True
+
+                # Without a free slot only release() can help; otherwise sleep until the next token
+                wait = None
+                if slot_free:
+                    wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+                if end is not None:
+                    if now >= end:
+                        return False
+                    wait = end - now if wait is None else min(wait, end - now)
+                self._cond.wait(wait)
+
+    def release(self, success: bool = True, throttled: bool = False,
+                retry_after: Optional[float] = None) -> None:
+        """
+        Return a slot and adjust the limits from the request's outcome
+
+        Args:
+            success (bool): The request succeeded; raises the limits
+            throttled (bool): The endpoint pushed back (429 or 5xx); cuts the limits
+            retry_after (float, optional): Seconds the endpoint asked us to wait
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._last_decrease = now
+                    self._refill(now)
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif success:
+                self.successes += 1
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.rate_increase)
+                # Roughly +1 slot per window of successful requests
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        """Current limits and counters"""
+        with self._cond:
+            return {
+                'rate': round(self.rate, 3),
+                'concurrency_limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'tokens': round(min(self.burst, self._tokens), 3),
+                'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 3),
+                'successes': self.successes,
+                'throttled': self.throttled,
+            }
+
+    def __repr__(self) -> str:
+        return f"AdaptiveLimiter(rate={self.rate:.2f}, concurrency_limit={int(self.limit)}, in_flight={self.in_flight})"
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> AdaptiveLimiter:
+    """Return the process-wide limiter for the TTS endpoint, creating it on first use"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter()
+        return _limiter
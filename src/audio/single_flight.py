@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+SingleFlight class for coalescing identical concurrent calls
+Part of the audio module
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """A call in progress and, once finished, its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and get its result or exception. A follower
+    whose own wait expires gets a TimeoutError. If the leader's call itself
+    timed out, the follower runs the call again while its own time allows,
+    since the leader's deadline may have been shorter. Nothing is remembered
+    once a call finishes, so later callers start a fresh one (caching is left
+    to SynthesisCache).
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight"""
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], object],
+           timeout: Optional[float] = None) -> Tuple[object, bool]:
+        """
+        Run func, or join the identical call already running
+
+        Args:
+            key (hashable): Identifies equivalent calls
+            func (callable): Function to run if no call for key is in flight
+            timeout (float, optional): Seconds to wait for another caller's result
+
+        Returns:
+            tuple: The result, and True if it came from another caller's call
+
+        Raises:
+            TimeoutError: When waiting for another caller takes longer than timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                try:
+                    call.result = func()
+                    return call.result, False
+                except BaseException as e:
+                    call.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not call.done.wait(remaining):
+                raise TimeoutError("Timed out waiting for an identical request in flight")
+            if isinstance(call.error, TimeoutError):
+                # The leader ran out of its own time; ours may not be up yet
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise call.error
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+    def __repr__(self) -> str:
+        return f"SingleFlight(in_flight={self.in_flight()}, coalesced={self.coalesced})"
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Speech recognition backends for SpeechSession
+Part of the audio module
+
+A backend turns captured audio into text. The online Google backend needs a
+network round trip per utterance; the offline Vosk and PocketSphinx backends
+run on this machine. Backends can also recognize incrementally through a
+RecognitionStream, fed audio while it is captured: Vosk reports partial
+hypotheses while the user is still speaking, the others buffer the audio and
+recognize it when the utterance ends.
+
+Vosk needs a model from https://alphacephei.com/vosk/models unpacked into
+resources/models/vosk, or wherever the VOSK_MODEL_PATH environment variable
+points.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import speech_recognition as sr
+
+DEFAULT_VOSK_MODEL_PATH = os.environ.get('VOSK_MODEL_PATH') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resources', 'models', 'vosk')
+
+
+class RecognitionStream:
+    """Recognition of one utterance from audio fed as it is captured"""
+
+    def accept(self, data: bytes) -> Optional[str]:
+        """
+        Feed captured audio
+
+        Args:
+            data (bytes): Next piece of the utterance, as raw PCM
+
+        Returns:
+            str: The partial hypothesis if it changed, None otherwise
+        """
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        """
+        Recognize the rest of the utterance
+
+        Returns:
+            str: Recognized text
+
+        Raises:
+            speech_recognition.UnknownValueError: When nothing was recognized
+            speech_recognition.RequestError: When the engine could not be reached
+        """
+        raise NotImplementedError
+
+
+class _BufferedStream(RecognitionStream):
+    """Stream for engines without partial results: recognizes the whole utterance at the end"""
+
+    def __init__(self, backend: 'RecognitionBackend', sample_rate: int, sample_width: int, language: str):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.language = language
+        self._chunks = []
+
+    def accept(self, data: bytes) -> Optional[str]:
+        self._chunks.append(data)
+        return None
+
+    def finish(self) -> str:
+        audio = sr.AudioData(b''.join(self._chunks), self.sample_rate, self.sample_width)
+        return self.backend.recognize(audio, self.language)
+
+
+class RecognitionBackend:
+    """Base class for speech recognition engines"""
+
+    name = 'base'
+    # True if open_stream() reports partial hypotheses
+    streaming = False
+    # True if the engine needs no network
+    offline = False
+
+    def available(self) -> bool:
+        """Check if the engine can be used on this machine"""
+        return True
+
+    def recognize(self, audio: sr.AudioData, language: str) -> str:
+        """
+        Recognize a whole utterance
+
+        Args:
+            audio (AudioData): Captured audio
+            language (str): Language code, e.g. 'en-IN'
+
+        Returns:
+            str: Recognized text
+
+        Raises:
+            speech_recognition.UnknownValueError: When nothing was recognized
+            speech_recognition.RequestError: When the engine could not be reached
+        """
+        raise NotImplementedError
+
+    def open_stream(self, sample_rate: int, sample_width: int, language: str) -> RecognitionStream:
+        """
+        Start recognizing an utterance incrementally
+
+        Args:
+            sample_rate (int): Samples per second of the audio that will be fed
+            sample_width (int): Bytes per sample
+            language (str): Language code
+
+        Returns:
+            RecognitionStream: Stream to feed; buffers until finish() unless overridden
+        """
+        return _BufferedStream(self, sample_rate, sample_width, language)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class GoogleBackend(RecognitionBackend):
+    """Online recognition with Google's free speech API"""
+
+    name = 'google'
+
+    def __init__(self, key: Optional[str] = None):
+        """
+        Initialize the backend
+
+        Args:
+            key (str, optional): Google Speech API key. Uses the library's default key if None
+        """
+        self.key = key
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData, language: str) -> str:
+        return self.recognizer.recognize_google(audio, key=self.key, language=language)
+
+    def __repr__(self) -> str:
+        return f"GoogleBackend(key={'set' if self.key else None})"
+
+
+class _VoskStream(RecognitionStream):
+    """Vosk recognizer fed chunk by chunk, keeping the text of finished segments"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._segments = []
+        self._partial = ''
+
+    def _text(self, partial: str = '') -> str:
+        return ' '.join(segment for segment in self._segments + [partial] if segment)
+
+    def accept(self, data: bytes) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(data):
+            # Vosk found a pause and finalized the words before it
+            self._segments.append(json.loads(self.recognizer.Result()).get('text', ''))
+            partial = ''
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        text = self._text(partial)
+        if text == self._partial:
+            return None
+        self._partial = text
+        return text
+
+    def finish(self) -> str:
+        self._segments.append(json.loads(self.recognizer.FinalResult()).get('text', ''))
+        text = self._text()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class VoskBackend(RecognitionBackend):
+    """Offline recognition with Vosk (Kaldi), with partial hypotheses while speaking"""
+
+    name = 'vosk'
+    streaming = True
+    offline = True
+
+    def __init__(self, model_path: str = DEFAULT_VOSK_MODEL_PATH):
+        """
+        Initialize the backend; the model is loaded on first use
+
+        Args:
+            model_path (str): Directory of an unpacked Vosk model. The model's language is
+                used whatever language is asked for
+        """
+        self.model_path = model_path
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def available(self) -> bool:
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            return False
+        return os.path.isdir(self.model_path)
+
+    def _get_model(self):
+        """Load the model once; it is shared by all recognizers"""
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    import vosk
+                except ImportError:
+                    raise sr.RequestError("missing vosk module: ensure that vosk is set up correctly.")
+                if not os.path.isdir(self.model_path):
+                    raise sr.RequestError(f"missing Vosk model: no model directory at {self.model_path}")
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_path)
+            return self._model
+
+    def open_stream(self, sample_rate: int, sample_width: int, language: str) -> RecognitionStream:
+        if sample_width != 2:
+            raise ValueError("Vosk needs 16-bit audio")
+        model = self._get_model()
+        import vosk
+
+        return _VoskStream(vosk.KaldiRecognizer(model, sample_rate))
+
+    def recognize(self, audio: sr.AudioData, language: str) -> str:
+        stream = self.open_stream(audio.sample_rate, 2, language)
+        stream.accept(audio.get_raw_data(convert_width=2))
+        return stream.finish()
+
+    def __repr__(self) -> str:
+        return f"VoskBackend(model_path={self.model_path!r})"
+
+
+class SphinxBackend(RecognitionBackend):
+    """Offline recognition with CMU PocketSphinx"""
+
+    name = 'sphinx'
+    offline = True
+
+    def __init__(self, language: Optional[str] = 'en-US'):
+        """
+        Initialize the backend
+
+        Args:
+            language (str, optional): PocketSphinx language, used instead of the session's.
+                Only 'en-US' ships with PocketSphinx; others need an installed language pack.
+                Uses the session's language if None
+        """
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def available(self) -> bool:
+        try:
+            import pocketsphinx  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def recognize(self, audio: sr.AudioData, language: str) -> str:
+        return self.recognizer.recognize_sphinx(audio, language=self.language or language)
+
+    def __repr__(self) -> str:
+        return f"SphinxBackend(language={self.language!r})"
+
+
+def default_backends() -> Dict[str, RecognitionBackend]:
+    """
+    Build the standard backend registry
+
+    Returns:
+        dict: Backend name to backend
+    """
+    backends = [GoogleBackend(), VoskBackend(), SphinxBackend()]
+    return {backend.name: backend for backend in backends}
@@ -4,20 +4,149 @@ TextToSpeech class for multi-language text-to-speech conversion
 Part of the audio module
 """
 
+import io
+import itertools
 import os
-import sys
+import queue
+import re
 import tempfile
 import threading
 import time
-from gtts import gTTS
+import wave
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import pygame
-from typing import Optional, Dict, List, Union
+import requests
+from gtts.tts import gTTSError
+from typing import Optional, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Union
+from audio.circuit_breaker import CircuitBreaker
+from audio.language_processing import (HINGLISH_KEYWORDS, ScriptClassifier, detect_languages, is_hinglish,
+                                       segment_languages)
+from audio.hinglish_model import get_hinglish_model
+from audio.lexicon import get_lexicon
+from audio.playback import ChannelPlayer, PlaybackHandle, SpeechHandle
+from audio.single_flight import SingleFlight
+from audio.tts_cache import SynthesisCache, DEFAULT_CACHE_MAX_BYTES
+from audio.tts_backends import SynthesisBackend, default_backends
+from audio.tts_http import ChunkFetcher, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+
+# Sentence terminators, including the Devanagari danda/double danda and the
+# Urdu, Arabic and CJK full stops. Latin marks only end a sentence before
+# whitespace so that "3.14" and "e.g." stay intact.
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?\u2026])\s+|(?<=[\u0964\u0965\u06d4\u061f\u3002\uff01\uff1f])\s*')
+
+# Characters per gTTS request; a longer text is fetched as several chunks
+_CHUNK_CHARS = 100
+
+# Errors that say a backend is unhealthy: connection, HTTP and timeout
+# failures. Anything else (bad input, a missing voice) leaves its breaker alone,
+# and so does any failure once the caller's own deadline has passed.
+_BACKEND_FAULTS = (gTTSError, requests.exceptions.RequestException, ConnectionError, TimeoutError)
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences on Latin and Indic sentence boundaries
+    
+    Args:
+        text (str): Text to split
+        
+    Returns:
+        list: Non-empty sentences in order
+    """
+    sentences = []
+    for part in _SENTENCE_BOUNDARY.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        if sentences and not any(ch.isalnum() for ch in part):
+            # Stray punctuation such as a repeated danda belongs to the previous sentence
+            sentences[-1] += part
+        else:
+            sentences.append(part)
+    return sentences
+
+
+def is_speakable(text: str) -> bool:
+    """Check if text has anything to pronounce, i.e. a letter or digit"""
+    return any(ch.isalnum() for ch in text)
+
+
+def join_audio(parts: Sequence[bytes]) -> bytes:
+    """
+    Join encoded audio clips into one
+    
+    MP3 streams are concatenated frame by frame. WAV clips are merged into one
+    WAV file, which needs the same channels, sample width and rate throughout.
+    
+    Args:
+        parts (sequence): Encoded clips in playback order, all MP3 or all WAV
+        
+    Returns:
+        bytes: The joined clip
+        
+    Raises:
+        ValueError: When the clips mix formats or WAV parameters
+    """
+    wav = [part[:4] == b'RIFF' and part[8:12] == b'WAVE' for part in parts]
+    if not any(wav):
+        return b''.join(parts)
+    if not all(wav):
+        raise ValueError("Cannot join MP3 and WAV audio")
+    
+    out = io.BytesIO()
+    params = None
+    with wave.open(out, 'wb') as writer:
+        for part in parts:
+            with wave.open(io.BytesIO(part), 'rb') as reader:
+                part_params = reader.getparams()[:3]
+                if params is None:
+                    params = part_params
+                    writer.setnchannels(params[0])
+                    writer.setsampwidth(params[1])
+                    writer.setframerate(params[2])
+                elif part_params != params:
+                    raise ValueError("Cannot join WAV audio with different formats")
+                writer.writeframes(reader.readframes(reader.getnframes()))
+    return out.getvalue()
+
+
+class SaveResult(NamedTuple):
+    """Outcome of one item in TextToSpeech.save_many()"""
+    filename: str
+    success: bool
+    error: Optional[Exception] = None
+
 
 class TextToSpeech:
     """Multi-language Text-to-Speech class using Google TTS"""
     
-    def __init__(self):
-        """Initialize the TextToSpeech class"""
+    def __init__(self, use_cache: bool = True, cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES, in_memory: bool = True,
+                 streaming: bool = False, chunk_workers: int = 4, tts_url: Optional[str] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+                 backend: str = 'gtts', language_backends: Optional[Dict[str, str]] = None,
+                 fallback_backend: Optional[str] = 'espeak', script_threshold: float = 0.3):
+        """
+        Initialize the TextToSpeech class
+        
+        Args:
+            use_cache (bool): Reuse previously synthesized audio from disk
+            cache_dir (str, optional): Cache directory. Uses the per-user cache if None
+            cache_max_bytes (int): Size budget for the cache before LRU eviction
+            in_memory (bool): Synthesize and play from memory, using temp files only as a fallback
+            streaming (bool): Make speak() start playing the first chunk while the rest download
+            chunk_workers (int): Text chunks of a long utterance downloaded concurrently
+            tts_url (str, optional): TTS endpoint overriding Google Translate, e.g. a mock server
+            pool_size (int): Keep-alive connections shared by every synthesis request
+            timeout (float or tuple, optional): HTTP timeout in seconds, or (connect, read)
+            backend (str): Default synthesis backend, 'gtts' (online) or 'espeak' (offline)
+            language_backends (dict, optional): Language code to backend name overrides
+            fallback_backend (str, optional): Backend used while the chosen one is failing
+            script_threshold (float): Share of letters a non-Latin script needs for
+                auto_detect_language() to pick its language
+        """
         self.supported_languages = {
             'en': 'English',
             'es': 'Spanish', 
@@ -69,21 +198,53 @@ class TextToSpeech:
             'ne': 'Nepali'
         }
         
-        # Hinglish patterns and detection
-        self.hinglish_keywords = [
-            'hai', 'hain', 'kar', 'kya', 'kaise', 'kahan', 'kab', 'kyun', 'kaun',
-            'aur', 'main', 'hum', 'tum', 'aap', 'yeh', 'woh', 'iske', 'uske',
-            'mera', 'tera', 'hamara', 'tumhara', 'apka', 'iska', 'uska',
-            'karna', 'hona', 'jana', 'aana', 'lena', 'dena', 'dekha', 'suna',
-            'accha', 'bura', 'bada', 'chota', 'naya', 'purana', 'thik', 'galat',
-            'bahut', 'kam', 'zyada', 'sab', 'kuch', 'koi', 'sabko', 'kisiko'
-        ]
+        self.script_classifier = ScriptClassifier(self.supported_languages, threshold=script_threshold)
+        
+        # Hinglish detection. The lexicon and model are shared by every
+        # instance; the lexicon words are the fallback when the n-gram model
+        # can't be loaded
+        self.hinglish_lexicon = get_lexicon()
+        if self.hinglish_lexicon is not None:
+            self.hinglish_keywords = self.hinglish_lexicon.words
+        else:
+            self.hinglish_keywords = frozenset(HINGLISH_KEYWORDS)
+        self.hinglish_model = get_hinglish_model()
         
         self.current_language = 'en'
         self.slow_speech = False
+        self.in_memory = in_memory
+        self.streaming = streaming
+        self._stop_requested = threading.Event()
+        self._players = weakref.WeakSet()
+        # Chunk queues being played, woken with an end sentinel by stop()
+        self._chunk_queues = weakref.WeakSet()
+        self.fetcher = ChunkFetcher(max_workers=chunk_workers, url=tts_url, timeout=timeout, pool_size=pool_size)
+        self.backends = default_backends(self.fetcher)
+        self.default_backend = backend
+        self.language_backends = dict(language_backends or {})
+        self.fallback_backend = fallback_backend
+        self.breakers = {}
+        self.last_backend = None
+        self.inflight = SingleFlight()
+        self._job_context = threading.local()
+        self._jobs = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._current_job = None
         self._audio_initialized = False
+        self.cache = None
+        if use_cache:
+            self._init_cache(cache_dir, cache_max_bytes)
         self._init_audio()
     
+    def _init_cache(self, cache_dir: Optional[str], max_bytes: int):
+        """Open the on-disk synthesis cache"""
+        try:
+            self.cache = SynthesisCache(cache_dir, max_bytes)
+        except Exception as e:
+            print(f"Warning: Could not initialize synthesis cache: {e}")
+            self.cache = None
+    
     def _init_audio(self):
         """Initialize pygame mixer for audio playback"""
         try:
@@ -93,6 +254,222 @@ class TextToSpeech:
             print(f"Warning: Could not initialize audio: {e}")
             self._audio_initialized = False
     
+    def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        Pre-open connections to the TTS service so the first utterance skips the handshakes
+        
+        Args:
+            connections (int, optional): Connections to open. Uses the pool size if None
+            
+        Returns:
+            int: Number of connections opened
+        """
+        return self.fetcher.warm_up(connections)
+    
+    def register_backend(self, backend: SynthesisBackend) -> None:
+        """
+        Add or replace a synthesis backend
+        
+        Args:
+            backend (SynthesisBackend): Backend, registered under its name
+        """
+        self.backends[backend.name] = backend
+        self.breakers.pop(backend.name, None)
+    
+    def set_backend(self, name: str, language: Optional[str] = None) -> bool:
+        """
+        Choose the synthesis backend
+        
+        Args:
+            name (str): Backend name, e.g. 'gtts' or 'espeak'
+            language (str, optional): Only use it for this language code. Sets the default if None
+            
+        Returns:
+            bool: True if the backend exists, False otherwise
+        """
+        if name not in self.backends:
+            return False
+        if language is None:
+            self.default_backend = name
+        else:
+            self.language_backends[language] = name
+        return True
+    
+    def list_voices(self, language: Optional[str] = None, backend: Optional[str] = None) -> List[str]:
+        """
+        List voices that can be passed as voice_id
+        
+        Args:
+            language (str, optional): Language code. Uses current_language if None
+            backend (str, optional): Backend name. Chosen per language if None
+            
+        Returns:
+            list: Voice identifiers; a numeric voice_id indexes into this list
+        """
+        lang = language or self.current_language
+        return self._get_backend(lang, backend).list_voices(lang)
+    
+    def _get_backend(self, language: str, name: Optional[str] = None) -> SynthesisBackend:
+        """Return the named backend, or the one configured for language"""
+        name = name or self.language_backends.get(language, self.default_backend)
+        if name not in self.backends:
+            raise ValueError(f"Unknown TTS backend '{name}'")
+        return self.backends[name]
+    
+    def get_backend_stats(self) -> Dict[str, Dict[str, object]]:
+        """
+        Get health statistics for each backend that has been used
+        
+        Returns:
+            dict: Backend name to circuit breaker state, error rate and latency percentiles
+        """
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
+    
+    def get_rate_limit_stats(self) -> Dict[str, object]:
+        """
+        Get the current request pacing for the TTS endpoint, shared by every instance
+        
+        Returns:
+            dict: Requests per second, concurrency limit, requests in flight and throttle count
+        """
+        return self.fetcher.limiter.stats()
+    
+    def _get_breaker(self, name: str) -> CircuitBreaker:
+        """Return the circuit breaker guarding a backend, creating it on first use"""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            engine = self.backends[name]
+            breaker = CircuitBreaker(name, probe=lambda: engine.synthesize('ok', 'en', False))
+            breaker = self.breakers.setdefault(name, breaker)
+        return breaker
+    
+    def _candidate_backends(self, language: str, name: Optional[str] = None) -> List[SynthesisBackend]:
+        """Chosen backend followed by the fallback, if it is usable for language"""
+        primary = self._get_backend(language, name)
+        candidates = [primary]
+        fallback = self.backends.get(self.fallback_backend) if self.fallback_backend else None
+        if fallback is not None and fallback is not primary and fallback.available() and fallback.supports(language):
+            candidates.append(fallback)
+        return candidates
+    
+    def _call_backends(self, language: str, name: Optional[str], call,
+                       deadline: Optional[float] = None, chunks: int = 1) -> Tuple[str, object]:
+        """
+        Run call(backend) with failover
+        
+        Backends whose circuit breaker is open are skipped unless nothing else
+        is left. Each attempt's latency feeds its breaker, and so do connection,
+        HTTP and timeout errors; other errors fail over without counting. An
+        attempt cut short by the caller's deadline says nothing about the
+        backend and is not counted either, and no further backend is tried.
+        
+        Args:
+            chunks (int): gTTS-sized chunks of text the call synthesizes, which scale
+                the breaker's slow call limit
+        
+        Returns:
+            tuple: Name of the backend that succeeded and its result
+        """
+        candidates = self._candidate_backends(language, name)
+        error = None
+        for i, engine in enumerate(candidates):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise error or TimeoutError("TTS synthesis did not finish before its deadline")
+            breaker = self._get_breaker(engine.name)
+            if not breaker.allow_request() and i < len(candidates) - 1:
+                continue
+            
+            start = time.monotonic()
+            try:
+                result = call(engine)
+            except Exception as e:
+                now = time.monotonic()
+                if isinstance(e, _BACKEND_FAULTS) and (deadline is None or now < deadline):
+                    breaker.record_failure(now - start)
+                if i < len(candidates) - 1:
+                    print(f"Warning: TTS backend '{engine.name}' failed, trying fallback: {e}")
+                error = e
+                continue
+            
+            breaker.record_success(time.monotonic() - start, chunks)
+            self._record_backend(engine.name)
+            return engine.name, result
+        
+        raise error
+    
+    def _record_backend(self, name: str) -> None:
+        """Remember which backend served the latest audio, and the current utterance"""
+        self.last_backend = name
+        handle = getattr(self._job_context, 'handle', None)
+        if handle is not None:
+            handle.backend = name
+    
+    def _fetch_audio(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                     backend: Optional[str] = None, deadline: Optional[float] = None) -> bytes:
+        """
+        Synthesize with failover, caching the audio under the backend that produced it
+        
+        Concurrent requests for the same audio share a single synthesis call.
+        voice_id belongs to the chosen backend; a fallback speaks with its own
+        default voice, and its audio is cached that way.
+        """
+        self._check_speakable(text)
+        primary = self._get_backend(language, backend)
+        
+        def fetch():
+            name, data = self._call_backends(
+                language, backend,
+                lambda engine: engine.synthesize(text, language, slow, self._engine_voice(engine, primary, voice_id),
+                                                 deadline),
+                deadline, -(-len(text) // _CHUNK_CHARS))
+            voice = voice_id if name == primary.name else None
+            self._cache_store_data(self._cache_key(text, language, slow, voice, name), data)
+            return name, data
+        
+        key = SynthesisCache.make_key(text, language, slow, voice_id, primary.name)
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        (name, data), shared = self.inflight.do(key, fetch, timeout)
+        if shared:
+            self._record_backend(name)
+        return data
+    
+    def _open_stream(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                     backend: Optional[str] = None, deadline: Optional[float] = None) -> Tuple[str, Iterator[bytes]]:
+        """Start streaming with failover; a backend can only be swapped before its first chunk"""
+        self._check_speakable(text)
+        primary = self._get_backend(language, backend)
+        
+        def open_stream(engine):
+            chunks = iter(engine.stream(text, language, slow, self._engine_voice(engine, primary, voice_id), deadline))
+            first = next(chunks)
+            return itertools.chain([first], chunks)
+        
+        return self._call_backends(language, backend, open_stream, deadline)
+    
+    @staticmethod
+    def _engine_voice(engine: SynthesisBackend, primary: SynthesisBackend,
+                      voice_id: Optional[str]) -> Optional[str]:
+        """
+        voice_id for the backend it was given for, None (the default voice) for a fallback
+        
+        Voice names and numeric voice indexes mean different things to each
+        engine, e.g. the gTTS accent 'co.uk' is no espeak voice.
+        """
+        return voice_id if engine is primary else None
+    
+    @staticmethod
+    def _check_speakable(text: str) -> None:
+        """Reject text no backend can speak before it reaches one (and its breaker)"""
+        if not text or not is_speakable(text):
+            raise ValueError("No text to speak")
+    
+    @staticmethod
+    def _deadline(deadline_ms: Optional[int]) -> Optional[float]:
+        """Convert a relative budget in milliseconds to a time.monotonic() deadline"""
+        if deadline_ms is None:
+            return None
+        return time.monotonic() + deadline_ms / 1000.0
+    
     def get_supported_languages(self) -> Dict[str, str]:
         """Get dictionary of supported language codes and names"""
         return self.supported_languages.copy()
@@ -130,7 +507,9 @@ class TextToSpeech:
         """
         self.slow_speech = slow
     
-    def speak(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,voice_id: Optional[str] = None) -> bool:
+    def speak(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,
+              voice_id: Optional[str] = None, block: bool = True, backend: Optional[str] = None,
+              deadline_ms: Optional[int] = None) -> Union[bool, SpeechHandle]:
         """
         Convert text to speech and play it
         
@@ -138,24 +517,122 @@ class TextToSpeech:
             text (str): Text to convert to speech
             language (str, optional): Language code. Uses current_language if None
             slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            voice_id (str, optional): Voice identifier
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds, counted
+                from when the job starts. Playback itself is not limited
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, False otherwise (SpeechHandle when block is False)
+        """
+        lang = language or self.current_language
+        speed = slow if slow is not None else self.slow_speech
+        
+        if self.streaming:
+            return self._submit(block, self._stream_and_play, text, lang, speed, voice_id, backend, deadline_ms)
+        return self._submit(block, self._generate_and_play, text, lang, speed, voice_id, backend, deadline_ms)
+    
+    def speak_streaming(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,
+                        voice_id: Optional[str] = None, block: bool = True,
+                        backend: Optional[str] = None) -> Union[bool, SpeechHandle]:
+        """
+        Convert text to speech, playing each chunk as soon as it is downloaded
+        
+        Args:
+            text (str): Text to convert to speech
+            language (str, optional): Language code. Uses current_language if None
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            voice_id (str, optional): Voice identifier
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            
+        Returns:
+            bool: True if successful, False otherwise (SpeechHandle when block is False)
+        """
+        lang = language or self.current_language
+        speed = slow if slow is not None else self.slow_speech
+        
+        return self._submit(block, self._stream_and_play, text, lang, speed, voice_id, backend)
+    
+    def speak_pipelined(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,
+                        voice_id: Optional[str] = None, lookahead: int = 2,
+                        block: bool = True, backend: Optional[str] = None) -> Union[bool, SpeechHandle]:
+        """
+        Speak text sentence by sentence, synthesizing upcoming sentences during playback
+        
+        Args:
+            text (str): Text to convert to speech
+            language (str, optional): Language code. Uses current_language if None
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            voice_id (str, optional): Voice identifier
+            lookahead (int): Maximum number of synthesized sentences waiting to be played
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            
+        Returns:
+            bool: True if successful, False otherwise (SpeechHandle when block is False)
+        """
+        lang = language or self.current_language
+        speed = slow if slow is not None else self.slow_speech
+        
+        return self._submit(block, self._pipeline_and_play, text, lang, speed, voice_id, lookahead, backend)
+    
+    def synthesize(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,
+                   voice_id: Optional[str] = None, backend: Optional[str] = None,
+                   deadline_ms: Optional[int] = None) -> Optional[bytes]:
+        """
+        Convert text to speech without playing it
+        
+        Args:
+            text (str): Text to convert to speech
+            language (str, optional): Language code. Uses current_language if None
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            voice_id (str, optional): Voice identifier
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds
+            
+        Returns:
+            bytes: Encoded audio (MP3 from gTTS, WAV from espeak), or None on failure
         """
         lang = language or self.current_language
         speed = slow if slow is not None else self.slow_speech
         
-        return self._generate_and_play(text, lang, speed)
+        try:
+            if lang not in self.supported_languages:
+                print(f"Error: Language '{lang}' not supported.")
+                return None
+            return self._synthesize(text, lang, speed, voice_id, backend, self._deadline(deadline_ms))
+        except Exception as e:
+            print(f"Error generating speech: {e}")
+            return None
     
-    def save(self, text: str, filename: str, language: Optional[str] = None, slow: Optional[bool] = None) -> bool:
+    def play_audio(self, data: bytes, block: bool = True) -> Union[bool, SpeechHandle]:
+        """
+        Play encoded audio, e.g. from synthesize(), after any queued utterances
+        
+        Args:
+            data (bytes): MP3 or WAV audio
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
+            
+        Returns:
+            bool: True if successful, False otherwise (SpeechHandle when block is False)
+        """
+        return self._submit(block, self._play_synthesized, data)
+    
+    def save(self, text: str, filename: str, language: Optional[str] = None, slow: Optional[bool] = None,
+             backend: Optional[str] = None, deadline_ms: Optional[int] = None, voice_id: Optional[str] = None) -> bool:
         """
         Convert text to speech and save to file
         
         Args:
             text (str): Text to convert to speech
-            filename (str): Output filename
+            filename (str): Output filename. gTTS writes MP3, espeak writes WAV
             language (str, optional): Language code. Uses current_language if None
             slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds
+            voice_id (str, optional): Voice identifier
             
         Returns:
             bool: True if successful, False otherwise
@@ -163,9 +640,43 @@ class TextToSpeech:
         lang = language or self.current_language
         speed = slow if slow is not None else self.slow_speech
         
-        return self._generate_audio(text, lang, speed, filename)
+        return self._generate_audio(text, lang, speed, filename, backend, deadline_ms, voice_id)
     
-    def speak_and_save(self, text: str, filename: str, language: Optional[str] = None, slow: Optional[bool] = None) -> bool:
+    def save_many(self, items: Iterable[Sequence], max_workers: int = 4) -> List[SaveResult]:
+        """
+        Convert many texts to speech files concurrently
+        
+        Args:
+            items (iterable): (text, filename[, language[, slow[, voice_id]]]) tuples. Missing or
+                None language and slow use current_language and slow_speech
+            max_workers (int): Maximum number of files synthesized at once
+            
+        Returns:
+            list: SaveResult for each item, in input order
+        """
+        jobs = []
+        for item in items:
+            text, filename = item[0], item[1]
+            language = item[2] if len(item) > 2 else None
+            slow = item[3] if len(item) > 3 else None
+            voice_id = item[4] if len(item) > 4 else None
+            jobs.append((text, filename, language or self.current_language,
+                         slow if slow is not None else self.slow_speech, voice_id))
+        
+        def run(job):
+            text, filename, language, slow, voice_id = job
+            try:
+                self._write_audio(text, language, slow, filename, voice_id=voice_id)
+                return SaveResult(filename, True)
+            except Exception as e:
+                return SaveResult(filename, False, e)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='tts-save') as executor:
+            return list(executor.map(run, jobs))
+    
+    def speak_and_save(self, text: str, filename: str, language: Optional[str] = None, slow: Optional[bool] = None,
+                       block: bool = True, backend: Optional[str] = None,
+                       deadline_ms: Optional[int] = None, voice_id: Optional[str] = None) -> Union[bool, SpeechHandle]:
         """
         Convert text to speech, save to file, and play it
         
@@ -174,37 +685,138 @@ class TextToSpeech:
             filename (str): Output filename
             language (str, optional): Language code. Uses current_language if None
             slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
+            backend (str, optional): Synthesis backend name. Chosen per language if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds, counted
+                from when the job starts. Playback itself is not limited
+            voice_id (str, optional): Voice identifier
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, False otherwise (SpeechHandle when block is False)
         """
         lang = language or self.current_language
         speed = slow if slow is not None else self.slow_speech
         
-        if self._generate_audio(text, lang, speed, filename):
+        return self._submit(block, self._save_and_play, text, lang, speed, filename, backend, deadline_ms, voice_id)
+    
+    def _save_and_play(self, text: str, language: str, slow: bool, filename: str,
+                       backend: Optional[str] = None, deadline_ms: Optional[int] = None,
+                       voice_id: Optional[str] = None) -> bool:
+        """Generate TTS audio, save it to file and play the file"""
+        if self._generate_audio(text, language, slow, filename, backend, deadline_ms, voice_id):
             if self._audio_initialized:
                 self._play_audio_file(filename)
             return True
         return False
     
-    def _generate_and_play(self, text: str, language: str, slow: bool ,voice_id: Optional[str] = None) -> bool:
+    def _submit(self, block: bool, func, *args) -> Union[bool, SpeechHandle]:
+        """
+        Run a synthesize-and-play job on the playback worker thread
+        
+        Jobs run one at a time in submission order, so utterances never overlap.
+        
+        Args:
+            block (bool): Wait for the job and return its bool result
+            func (callable): Job returning True on success
+            
+        Returns:
+            bool or SpeechHandle: Job result if block is True, else a handle to it
+        """
+        if block and threading.current_thread() is self._worker:
+            return func(*args)  # Already on the worker; queueing would deadlock
+        
+        handle = SpeechHandle(on_cancel=self._cancel_job)
+        self._ensure_worker()
+        self._jobs.put((handle, func, args))
+        
+        if not block:
+            return handle
+        handle.wait()
+        return bool(handle.result)
+    
+    def _ensure_worker(self) -> None:
+        """Start the playback worker thread on first use"""
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_jobs, name='tts-playback-worker', daemon=True)
+                self._worker.start()
+    
+    def _run_jobs(self) -> None:
+        """Playback worker loop; the only thread that drives the mixer"""
+        while True:
+            handle, func, args = self._jobs.get()
+            with self._worker_lock:
+                skip = handle.cancelled
+                if not skip:
+                    self._current_job = handle
+                    self._stop_requested.clear()
+            if skip:
+                # Finish outside the lock: done-callbacks may queue more speech
+                handle.result = False
+                handle._finish(cancelled=True)
+                continue
+            
+            self._job_context.handle = handle
+            try:
+                handle.result = bool(func(*args)) and not handle.cancelled
+            except Exception as e:
+                print(f"Error in playback worker: {e}")
+                handle.result = False
+            finally:
+                with self._worker_lock:
+                    self._current_job = None
+                self._job_context.handle = None
+                handle._finish()
+    
+    def _cancel_job(self, handle: SpeechHandle) -> None:
+        """Stop a job if it is the one playing; queued jobs are skipped by the worker"""
+        with self._worker_lock:
+            if handle is not self._current_job:
+                return
+            # Flag the stop while the job is still current, so the next job isn't affected
+            self._stop_requested.set()
+            players = list(self._players)
+        # Cancelling players finishes their handles, which must not happen under the lock
+        self._stop_players(players)
+    
+    def _mark_started(self) -> None:
+        """Record when the current job's first audio started"""
+        handle = self._current_job
+        if handle is not None and handle.started_at is None:
+            handle.started_at = time.monotonic()
+    
+    def _generate_and_play(self, text: str, language: str, slow: bool ,voice_id: Optional[str] = None,
+                           backend: Optional[str] = None, deadline_ms: Optional[int] = None) -> bool:
         """Generate TTS audio and play it directly"""
+        deadline = self._deadline(deadline_ms)
         try:
             if language not in self.supported_languages:
                 print(f"Error: Language '{language}' not supported.")
                 return False
             
-            # Create gTTS object
-            tts = gTTS(text=text, lang=language, slow=slow)
+            # Read the cached audio once: a path could be evicted by another put() before playback
+            cached = self._cache_lookup(text, language, slow, voice_id, backend)
+            if cached:
+                self._play_audio_data(cached)
+                return True
+            
+            data = self._fetch_audio(text, language, slow, voice_id, backend, deadline)
+            
+            if self.in_memory:
+                if self._audio_initialized:
+                    self._play_audio_data(data)
+                else:
+                    print("Audio playback not available.")
+                return True
             
             # Create temporary file
             tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
             tmp_filename = tmp_file.name
-            tmp_file.close()  # Close the file so gTTS can write to it
             
             try:
                 # Save audio to temporary file
-                tts.save(tmp_filename)
+                tmp_file.write(data)
+                tmp_file.close()
                 
                 if self._audio_initialized:
                     self._play_audio_file(tmp_filename)
@@ -214,6 +826,7 @@ class TextToSpeech:
             finally:
                 # Clean up temporary file
                 try:
+                    tmp_file.close()
                     if os.path.exists(tmp_filename):
                         os.unlink(tmp_filename)
                 except Exception as cleanup_error:
@@ -225,23 +838,245 @@ class TextToSpeech:
             print(f"Error generating speech: {e}")
             return False
     
-    def _generate_audio(self, text: str, language: str, slow: bool, filename: str) -> bool:
-        """Generate TTS audio and save to file"""
+    def _stream_and_play(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                         backend: Optional[str] = None, deadline_ms: Optional[int] = None) -> bool:
+        """Generate TTS audio chunk by chunk, queueing each chunk for gapless playback"""
+        deadline = self._deadline(deadline_ms)
         try:
             if language not in self.supported_languages:
                 print(f"Error: Language '{language}' not supported.")
                 return False
             
-            # Create gTTS object
-            tts = gTTS(text=text, lang=language, slow=slow)
-            tts.save(filename)
+            if not self._audio_initialized:
+                # Nothing to gain from streaming
+                return self._generate_and_play(text, language, slow, voice_id, backend, deadline_ms)
+            
+            cached = self._cache_lookup(text, language, slow, voice_id, backend)
+            if cached:
+                self._play_audio_data(cached)
+                return True
+            
+            # Download on a background thread so playback can start with the first chunk.
+            # The thread also caches the audio, so a stopped utterance can free the
+            # playback worker while the rest of its download completes the cache.
+            chunks = queue.Queue()
+            handle = getattr(self._job_context, 'handle', None)
+            
+            def fetch():
+                self._job_context.handle = handle
+                try:
+                    name, stream = self._open_stream(text, language, slow, voice_id, backend, deadline)
+                    received = []
+                    for chunk in stream:
+                        received.append(chunk)
+                        chunks.put(chunk)
+                    self._cache_store_data(self._cache_key(text, language, slow, voice_id, name),
+                                           b''.join(received))
+                except Exception as e:
+                    chunks.put(e)
+                finally:
+                    chunks.put(None)
+            
+            threading.Thread(target=fetch, daemon=True).start()
+            
+            self._play_chunk_queue(chunks)
+            return True
+            
+        except Exception as e:
+            print(f"Error generating speech: {e}")
+            return False
+    
+    def _pipeline_and_play(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                           lookahead: int = 2, backend: Optional[str] = None) -> bool:
+        """Synthesize sentence N+1 on a background thread while sentence N plays"""
+        try:
+            if language not in self.supported_languages:
+                print(f"Error: Language '{language}' not supported.")
+                return False
+            
+            sentences = [sentence for sentence in split_sentences(text) if is_speakable(sentence)]
+            if not self._audio_initialized or len(sentences) < 2:
+                return self._generate_and_play(text, language, slow, voice_id, backend)
+            
+            # At most lookahead segments wait, so a long paragraph doesn't run far
+            # ahead of playback; the player frees a slot per segment it takes and
+            # one more when it finishes, which wakes the producer to see abort
+            segments = queue.Queue()
+            slots = threading.Semaphore(max(1, lookahead))
+            abort = threading.Event()
+            
+            def put(item):
+                if abort.is_set():
+                    return False
+                slots.acquire()
+                if abort.is_set():
+                    return False
+                segments.put(item)
+                return True
+            
+            handle = getattr(self._job_context, 'handle', None)
+            
+            def produce():
+                self._job_context.handle = handle
+                try:
+                    for sentence in sentences:
+                        if not put(self._synthesize(sentence, language, slow, voice_id, backend)):
+                            return
+                except Exception as e:
+                    put(e)
+                finally:
+                    put(None)
+            
+            threading.Thread(target=produce, daemon=True).start()
+            self._play_chunk_queue(segments, abort, slots)
+            
+            return True
+            
+        except Exception as e:
+            print(f"Error generating speech: {e}")
+            return False
+    
+    def _synthesize(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                    backend: Optional[str] = None, deadline: Optional[float] = None) -> bytes:
+        """Return encoded audio for text, from the cache when possible"""
+        cached = self._cache_lookup(text, language, slow, voice_id, backend)
+        if cached:
+            return cached
+        
+        return self._fetch_audio(text, language, slow, voice_id, backend, deadline)
+    
+    def _play_chunk_queue(self, chunks: queue.Queue, abort: Optional[threading.Event] = None,
+                          slots: Optional[threading.Semaphore] = None) -> None:
+        """
+        Play audio chunks from a queue back to back until a None sentinel arrives
+        
+        Exceptions put on the queue are re-raised. stop() puts a None on the
+        queue, so this returns right away without waiting for the remaining
+        chunks. If an abort event is given it is set on return so the producer
+        can give up early, and a slot is released for each chunk taken and once
+        more on return, to wake a producer waiting for one.
+        """
+        player = self._new_player()
+        self._chunk_queues.add(chunks)
+        try:
+            while not self._stop_requested.is_set():
+                chunk = chunks.get()
+                if slots is not None:
+                    slots.release()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                if self._stop_requested.is_set():
+                    break
+                player.play(pygame.mixer.Sound(file=io.BytesIO(chunk)))
+            
+            # Wait for the last chunk to finish
+            player.close().wait()
+        finally:
+            self._chunk_queues.discard(chunks)
+            if abort is not None:
+                abort.set()
+            if slots is not None:
+                slots.release()
+    
+    def _play_synthesized(self, data: bytes) -> bool:
+        """Play audio synthesized ahead of time"""
+        self._play_audio_data(data)
+        return True
+    
+    def _generate_audio(self, text: str, language: str, slow: bool, filename: str,
+                        backend: Optional[str] = None, deadline_ms: Optional[int] = None,
+                        voice_id: Optional[str] = None) -> bool:
+        """Generate TTS audio and save to file"""
+        try:
+            if language not in self.supported_languages:
+                print(f"Error: Language '{language}' not supported.")
+                return False
             
+            self._write_audio(text, language, slow, filename, backend, self._deadline(deadline_ms), voice_id)
             return True
             
         except Exception as e:
             print(f"Error saving audio: {e}")
             return False
     
+    def _write_audio(self, text: str, language: str, slow: bool, filename: str,
+                     backend: Optional[str] = None, deadline: Optional[float] = None,
+                     voice_id: Optional[str] = None) -> None:
+        """Generate TTS audio and save to file, raising on failure"""
+        if language not in self.supported_languages:
+            raise ValueError(f"Language '{language}' not supported.")
+        
+        data = self._synthesize(text, language, slow, voice_id, backend, deadline)
+        with open(filename, 'wb') as f:
+            f.write(data)
+    
+    def _cache_lookup(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                      backend: Optional[str] = None) -> Optional[bytes]:
+        """Return the cached audio for a request (None on a miss, a failed read or with no cache)"""
+        key = self._cache_key(text, language, slow, voice_id, self._get_backend(language, backend).name)
+        if key is None:
+            return None
+        return self.cache.get(key)
+    
+    def _cache_key(self, text: str, language: str, slow: bool, voice_id: Optional[str],
+                   backend_name: str) -> Optional[str]:
+        """Return the cache key for audio from a backend, or None with no cache"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(text, language, slow, voice_id, backend_name)
+    
+    def _cache_store_data(self, key: Optional[str], data: bytes) -> None:
+        """Add freshly synthesized audio bytes to the cache, never failing the caller"""
+        if self.cache is None or key is None:
+            return
+        try:
+            self.cache.put(key, data)
+        except Exception as e:
+            print(f"Warning: Could not cache audio: {e}")
+    
+    def _new_player(self) -> ChannelPlayer:
+        """Create a channel player for one utterance that stop() can cancel"""
+        player = ChannelPlayer(self._stop_requested, on_start=self._mark_started)
+        self._players.add(player)
+        return player
+    
+    def _play_sound(self, sound) -> PlaybackHandle:
+        """Play a decoded sound and wait until it has finished"""
+        player = self._new_player()
+        player.play(sound)
+        handle = player.close()
+        handle.wait()
+        return handle
+    
+    def _play_audio_data(self, data: bytes) -> None:
+        """Play encoded audio from memory, falling back to a temporary file"""
+        if not self._audio_initialized:
+            print("Audio playback not available.")
+            return
+        
+        try:
+            self._play_sound(pygame.mixer.Sound(file=io.BytesIO(data)))
+            return
+            
+        except Exception as e:
+            print(f"In-memory playback failed, using temporary file: {e}")
+        
+        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
+        tmp_filename = tmp_file.name
+        try:
+            tmp_file.write(data)
+            tmp_file.close()
+            self._play_audio_file(tmp_filename)
+        finally:
+            try:
+                tmp_file.close()
+                if os.path.exists(tmp_filename):
+                    os.unlink(tmp_filename)
+            except Exception as cleanup_error:
+                print(f"Warning: Could not delete temporary file: {cleanup_error}")
+    
     def _play_audio_file(self, filename: str) -> None:
         """Play audio file using pygame"""
         if not self._audio_initialized:
@@ -254,35 +1089,42 @@ class TextToSpeech:
                 print(f"Audio file not found: {filename}")
                 return
             
-            # Load and play the audio file
-            pygame.mixer.music.load(filename)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
+            # Decode the file so its length is known and completion can be signalled
+            self._play_sound(pygame.mixer.Sound(filename))
                 
         except Exception as e:
             print(f"Error playing audio: {e}")
-            # Try alternative method using pygame.mixer.Sound
+            # Try alternative method using pygame.mixer.music, which streams
+            # the file without reporting its length
             try:
-                sound = pygame.mixer.Sound(filename)
-                sound.play()
-                # Wait for sound to finish
-                while pygame.mixer.get_busy():
-                    time.sleep(0.1)
+                pygame.mixer.music.load(filename)
+                pygame.mixer.music.play()
+                self._mark_started()
+                while pygame.mixer.music.get_busy():
+                    if self._stop_requested.wait(0.1):
+                        break
             except Exception as e2:
                 print(f"Alternative playback also failed: {e2}")
     
     def stop(self) -> None:
         """Stop current audio playback"""
+        self._stop_requested.set()
+        self._stop_players(list(self._players))
+    
+    def _stop_players(self, players: List[ChannelPlayer]) -> None:
+        """Cancel channel players, wake chunk queues waiting for audio and silence the mixer"""
+        for chunks in list(self._chunk_queues):
+            chunks.put(None)
+        for player in players:
+            player.cancel()
         if self._audio_initialized:
             pygame.mixer.music.stop()
+            pygame.mixer.stop()
     
     def is_playing(self) -> bool:
         """Check if audio is currently playing"""
         if self._audio_initialized:
-            return pygame.mixer.music.get_busy()
+            return pygame.mixer.music.get_busy() or pygame.mixer.get_busy()
         return False
     
     def detect_hinglish(self, text: str) -> bool:
@@ -295,21 +1137,24 @@ class TextToSpeech:
         Returns:
             bool: True if Hinglish is detected
         """
-        text_lower = text.lower()
-        hinglish_count = 0
-        english_count = 0
-        
-        words = text_lower.split()
-        
-        for word in words:
-            if word in self.hinglish_keywords:
-                hinglish_count += 1
-        
+        if self.hinglish_model is not None:
+            return self.hinglish_model.is_hinglish(text)
         # If more than 20% of words are common Hinglish words, consider it Hinglish
-        if len(words) > 0 and (hinglish_count / len(words)) > 0.2:
-            return True
+        return is_hinglish(text, self.hinglish_keywords, 0.2)
+    
+    def hinglish_confidence(self, text: str) -> float:
+        """
+        Confidence that text is Hinglish (romanized Hindi, possibly mixed with English)
+        
+        Args:
+            text (str): Text to analyze
             
-        return False
+        Returns:
+            float: Probability between 0 and 1 (0 or 1 from the keywords if the model isn't loaded)
+        """
+        if self.hinglish_model is not None:
+            return self.hinglish_model.confidence(text)
+        return 1.0 if is_hinglish(text, self.hinglish_keywords, 0.2) else 0.0
     
     def auto_detect_language(self, text: str) -> str:
         """
@@ -321,10 +1166,10 @@ class TextToSpeech:
         Returns:
             str: Detected language code
         """
-        # Check for Devanagari script (Hindi)
-        devanagari_count = sum(1 for char in text if '\u0900' <= char <= '\u097F')
-        if devanagari_count > len(text) * 0.3:
-            return 'hi'
+        # Check the script (Devanagari, Tamil, Arabic, Cyrillic, CJK, ...)
+        language = self.script_classifier.detect(text)
+        if language is not None:
+            return language
         
         # Check for Hinglish
         if self.detect_hinglish(text):
@@ -333,75 +1178,224 @@ class TextToSpeech:
         # Default to current language
         return self.current_language
     
-    def speak_hinglish(self, text: str, slow: bool = False, auto_detect: bool = True) -> bool:
+    def detect_languages(self, texts: Iterable[str]):
+        """
+        Auto-detect the language of many texts at once, e.g. to pick voices for a corpus offline
+        
+        Gives the same result as auto_detect_language() for each text, computed
+        with NumPy over the whole batch.
+        
+        Args:
+            texts (iterable): Texts to analyze
+            
+        Returns:
+            numpy.ndarray: Detected language code for each text, in input order
+        """
+        return detect_languages(list(texts), self.script_classifier, self.hinglish_keywords, self.current_language,
+                                model=self.hinglish_model)
+    
+    def segment_languages(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Split mixed-language text into runs to be spoken with different voices
+        
+        Args:
+            text (str): Text to split, e.g. "Your meeting हैं at 5 baje"
+            
+        Returns:
+            list: (language code, text) pairs in order
+        """
+        return segment_languages(text, self.script_classifier, self.hinglish_keywords, self.current_language,
+                                 self.hinglish_model)
+    
+    def speak_mixed(self, text: str, slow: Optional[bool] = None, block: bool = True,
+                    deadline_ms: Optional[int] = None) -> Union[bool, SpeechHandle]:
+        """
+        Speak mixed-language text, each run in its own language, as one clip
+        
+        The runs are synthesized concurrently, so the wait before playback is
+        that of the slowest run rather than the sum of all of them.
+        
+        Args:
+            text (str): Text to convert to speech
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds, counted
+                from when the job starts. Playback itself is not limited
+            
+        Returns:
+            bool: True if successful, False otherwise (SpeechHandle when block is False)
+        """
+        speed = slow if slow is not None else self.slow_speech
+        
+        return self._submit(block, self._mixed_and_play, text, speed, deadline_ms)
+    
+    def synthesize_mixed(self, text: str, slow: Optional[bool] = None,
+                         deadline_ms: Optional[int] = None) -> Optional[bytes]:
+        """
+        Convert mixed-language text to one clip without playing it
+        
+        Args:
+            text (str): Text to convert to speech
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds
+            
+        Returns:
+            bytes: Encoded audio, or None on failure
+        """
+        speed = slow if slow is not None else self.slow_speech
+        
+        try:
+            return join_audio(self._synthesize_segments(self.segment_languages(text), speed,
+                                                        self._deadline(deadline_ms)))
+        except Exception as e:
+            print(f"Error generating speech: {e}")
+            return None
+    
+    def save_mixed(self, text: str, filename: str, slow: Optional[bool] = None,
+                   deadline_ms: Optional[int] = None) -> bool:
+        """
+        Convert mixed-language text to one clip and save it to file
+        
+        Args:
+            text (str): Text to convert to speech
+            filename (str): Output filename
+            slow (bool, optional): Speech speed. Uses slow_speech setting if None
+            deadline_ms (int, optional): Time budget for synthesis in milliseconds
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        data = self.synthesize_mixed(text, slow, deadline_ms)
+        if data is None:
+            return False
+        
+        try:
+            with open(filename, 'wb') as f:
+                f.write(data)
+            return True
+        except Exception as e:
+            print(f"Error saving audio: {e}")
+            return False
+    
+    def _synthesize_segments(self, segments: List[Tuple[str, str]], slow: bool,
+                             deadline: Optional[float] = None) -> List[bytes]:
+        """Synthesize (language, text) runs, chunk_workers at a time, returning their audio in order"""
+        if not segments:
+            raise ValueError("Nothing to speak")
+        if len(segments) == 1:
+            language, text = segments[0]
+            return [self._synthesize(text, language, slow, deadline=deadline)]
+        
+        handle = getattr(self._job_context, 'handle', None)
+        
+        def run(segment):
+            self._job_context.handle = handle
+            language, text = segment
+            return self._synthesize(text, language, slow, deadline=deadline)
+        
+        # Bounded like a long text's chunks, however often the script alternates
+        workers = min(len(segments), self.fetcher.max_workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts-segment') as executor:
+            return list(executor.map(run, segments))
+    
+    def _mixed_and_play(self, text: str, slow: bool, deadline_ms: Optional[int] = None) -> bool:
+        """Synthesize every language run at once and play them as one clip"""
+        try:
+            parts = self._synthesize_segments(self.segment_languages(text), slow, self._deadline(deadline_ms))
+            if not self._audio_initialized:
+                print("Audio playback not available.")
+                return True
+            
+            try:
+                data = join_audio(parts)
+            except ValueError:
+                # Runs from different backends (MP3 and WAV) are queued back to back instead
+                chunks = queue.Queue()
+                for part in parts:
+                    chunks.put(part)
+                chunks.put(None)
+                self._play_chunk_queue(chunks)
+                return True
+            
+            self._play_audio_data(data)
+            return True
+            
+        except Exception as e:
+            print(f"Error generating speech: {e}")
+            return False
+    
+    def speak_hinglish(self, text: str, slow: bool = False, auto_detect: bool = True,
+                       block: bool = True) -> Union[bool, SpeechHandle]:
         """
         Speak Hinglish text with optimal settings
         
         Args:
             text (str): Hinglish text to speak
             slow (bool): Speech speed
-            auto_detect (bool): Whether to auto-detect language
+            auto_detect (bool): Whether to auto-detect the language of each run of
+                mixed-script text (see speak_mixed())
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
             
         Returns:
-            bool: True if successful
+            bool: True if successful (SpeechHandle when block is False)
         """
         if auto_detect:
-            lang = self.auto_detect_language(text)
-        else:
-            lang = 'hi'  # Force Hindi
-            
-        return self.speak(text, language=lang, slow=slow)
+            return self.speak_mixed(text, slow=slow, block=block)
+        
+        return self.speak(text, language='hi', slow=slow, block=block)  # Force Hindi
     
-    def speak_hindi(self, text: str, slow: bool = False, voice_id: Optional[str] = None) -> bool:
+    def speak_hindi(self, text: str, slow: bool = False, voice_id: Optional[str] = None,
+                    block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Hindi"""
-        return self.speak(text, 'hi', slow,voice_id=voice_id)
+        return self.speak(text, 'hi', slow,voice_id=voice_id, block=block)
     
-    def speak_tamil(self, text: str, slow: bool = False) -> bool:
+    def speak_tamil(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Tamil"""  
-        return self.speak(text, 'ta', slow)
+        return self.speak(text, 'ta', slow, block=block)
     
-    def speak_telugu(self, text: str, slow: bool = False) -> bool:
+    def speak_telugu(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Telugu"""
-        return self.speak(text, 'te', slow)
+        return self.speak(text, 'te', slow, block=block)
     
-    def speak_gujarati(self, text: str, slow: bool = False) -> bool:
+    def speak_gujarati(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Gujarati"""
-        return self.speak(text, 'gu', slow)
+        return self.speak(text, 'gu', slow, block=block)
     
-    def speak_punjabi(self, text: str, slow: bool = False) -> bool:
+    def speak_punjabi(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Punjabi"""
-        return self.speak(text, 'pa', slow)
+        return self.speak(text, 'pa', slow, block=block)
     
-    def speak_marathi(self, text: str, slow: bool = False) -> bool:
+    def speak_marathi(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Marathi"""
-        return self.speak(text, 'mr', slow)
+        return self.speak(text, 'mr', slow, block=block)
     
     # Convenience methods for different languages
-    def speak_english(self, text: str, slow: bool = False) -> bool:
+    def speak_english(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in English"""
-        return self.speak(text, 'en', slow)
+        return self.speak(text, 'en', slow, block=block)
     
-    def speak_spanish(self, text: str, slow: bool = False) -> bool:
+    def speak_spanish(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Spanish"""
-        return self.speak(text, 'es', slow)
+        return self.speak(text, 'es', slow, block=block)
     
-    def speak_french(self, text: str, slow: bool = False) -> bool:
+    def speak_french(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in French"""
-        return self.speak(text, 'fr', slow)
+        return self.speak(text, 'fr', slow, block=block)
     
-    def speak_german(self, text: str, slow: bool = False) -> bool:
+    def speak_german(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in German"""
-        return self.speak(text, 'de', slow)
+        return self.speak(text, 'de', slow, block=block)
     
-    def speak_japanese(self, text: str, slow: bool = False) -> bool:
+    def speak_japanese(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Japanese"""
-        return self.speak(text, 'ja', slow)
+        return self.speak(text, 'ja', slow, block=block)
     
-    def speak_chinese(self, text: str, slow: bool = False) -> bool:
+    def speak_chinese(self, text: str, slow: bool = False, block: bool = True) -> Union[bool, SpeechHandle]:
         """Speak text in Chinese"""
-        return self.speak(text, 'zh', slow)
+        return self.speak(text, 'zh', slow, block=block)
     
-    def __call__(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None) -> bool:
+    def __call__(self, text: str, language: Optional[str] = None, slow: Optional[bool] = None,
+                 block: bool = True) -> Union[bool, SpeechHandle]:
         """
         Make the class callable - same as speak() method
         
@@ -409,11 +1403,12 @@ class TextToSpeech:
             text (str): Text to convert to speech
             language (str, optional): Language code
             slow (bool, optional): Speech speed
+            block (bool): Wait for playback to finish. If False, return a SpeechHandle immediately
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, False otherwise (SpeechHandle when block is False)
         """
-        return self.speak(text, language, slow)
+        return self.speak(text, language, slow, block=block)
     
     def __repr__(self) -> str:
         """String representation of the TTS object"""
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Batch transcription of recorded utterances
+Part of the audio module
+
+transcribe_files() loads WAV, AIFF and FLAC files through sr.AudioFile and
+recognizes them on a pool of worker processes, so offline backends (Vosk,
+PocketSphinx) use every core. Each result is appended to a JSONL file as
+soon as it is ready, one object per line:
+
+    {"path": ..., "status": "ok", "text": ..., "duration": 2.1, "elapsed": 0.4, "backend": "vosk",
+     "error": null}
+
+status is "ok", "no_speech" (nothing recognized) or "error" (unreadable
+file, engine unreachable). Running again with the same output file skips
+the files that already have an "ok" or "no_speech" line, so an interrupted
+run resumes where it stopped and errors are retried.
+
+    python -m audio.transcribe results.jsonl recordings/ --workers 8 --backend vosk
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import speech_recognition as sr
+
+from audio.Speech_reco import VoiceActivityDetector
+from audio.stt_backends import default_backends
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.aif', '.aiff')
+# Statuses that are not retried when resuming
+FINAL_STATUSES = ('ok', 'no_speech')
+
+# Per-process state, set up once by _init_worker()
+_worker = {}
+
+
+def find_audio_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expand directories into the audio files below them
+
+    Args:
+        paths (iterable): Files and directories
+
+    Returns:
+        list: Files, directories expanded in sorted order
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(os.path.join(root, name) for name in sorted(names)
+                         if name.lower().endswith(AUDIO_EXTENSIONS))
+    return files
+
+
+def read_finished(output: str) -> Set[str]:
+    """
+    Paths that already have a final result in a JSONL output file
+
+    Args:
+        output (str): Output file; missing files have no results
+
+    Returns:
+        set: Paths not to transcribe again
+    """
+    finished = set()
+    if not os.path.exists(output):
+        return finished
+    with open(output, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short when the previous run was interrupted
+                continue
+            if isinstance(record, dict) and record.get('status') in FINAL_STATUSES:
+                finished.add(record.get('path'))
+    return finished
+
+
+def _init_worker(backend: str, language: str, use_vad: bool) -> None:
+    """Create the backend and detector once per worker process"""
+    _worker['backend'] = default_backends()[backend]
+    _worker['language'] = language
+    _worker['vad'] = VoiceActivityDetector() if use_vad and np is not None else None
+
+
+def _transcribe_file(path: str) -> Dict[str, object]:
+    """Recognize one file in a worker process, returning its result record"""
+    backend = _worker['backend']
+    record = {'path': path, 'status': 'error', 'text': None, 'duration': None, 'elapsed': None,
+              'backend': backend.name, 'error': None}
+    start = time.perf_counter()
+    try:
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        record['duration'] = round(len(audio.frame_data) / (audio.sample_rate * audio.sample_width), 3)
+        if _worker['vad'] is not None:
+            audio = _worker['vad'].trim(audio)
+        record['text'] = backend.recognize(audio, _worker['language'])
+        record['status'] = 'ok'
+    except sr.UnknownValueError:
+        record['status'] = 'no_speech'
+    except (sr.RequestError, ValueError, OSError, EOFError) as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['elapsed'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def transcribe_files(paths: Iterable[str], output: Optional[str] = None, workers: Optional[int] = None,
+                     backend: str = 'google', language: str = 'en-IN', use_vad: bool = True,
+                     resume: bool = True) -> Iterator[Dict[str, object]]:
+    """
+    Transcribe audio files on a pool of worker processes
+
+    Results come in the order they finish, not the order of paths. At most
+    two files per worker are queued at a time, so any number of paths can be
+    given.
+
+    Args:
+        paths (iterable): WAV, AIFF or FLAC files
+        output (str, optional): JSONL file each result is appended to as it finishes
+        workers (int, optional): Worker processes. Uses one per core if None
+        backend (str): Recognition backend: 'google' (online), 'vosk' or 'sphinx' (offline)
+        language (str): Recognition language, e.g. 'en-IN'
+        use_vad (bool): Trim silence before recognition. Needs numpy
+        resume (bool): Skip files that already have a final result in output
+
+    Returns:
+        iterator: Result records, as written to output
+
+    Raises:
+        ValueError: When the backend is unknown or can't be used on this machine. Raised
+            by the call itself, before any worker is started
+    """
+    backends = default_backends()
+    if backend not in backends:
+        raise ValueError(f"Unknown speech recognition backend '{backend}'")
+    # Every file would fail the same way in the workers; say so once instead
+    if not backends[backend].available():
+        raise ValueError(f"Speech recognition backend '{backend}' is not available: "
+                         f"{backends[backend]!r} is missing its module or model")
+    workers = max(1, workers or os.cpu_count() or 1)
+    finished = read_finished(output) if output and resume else set()
+    pending_paths = [path for path in paths if path not in finished]
+    return _run_pool(pending_paths, output, workers, backend, language, use_vad)
+
+
+def _run_pool(paths: List[str], output: Optional[str], workers: int, backend: str, language: str,
+              use_vad: bool) -> Iterator[Dict[str, object]]:
+    """Recognize paths on a new process pool, yielding records as they finish"""
+    pending_paths = iter(paths)
+
+    out = None
+    if output:
+        out = open(output, 'a', encoding='utf-8')
+        # Don't glue the first result onto a line cut short by an interruption
+        if out.tell() > 0:
+            with open(output, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    out.write('\n')
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(backend, language, use_vad))
+    try:
+        running = set()
+        for path in pending_paths:
+            running.add(executor.submit(_transcribe_file, path))
+            if len(running) >= 2 * workers:
+                break
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                if out is not None:
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    out.flush()
+                yield record
+                path = next(pending_paths, None)
+                if path is not None:
+                    running.add(executor.submit(_transcribe_file, path))
+    finally:
+        # On interruption, finish only the files already being recognized
+        executor.shutdown(wait=True, cancel_futures=True)
+        if out is not None:
+            out.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns the exit status"""
+    parser = argparse.ArgumentParser(prog='python -m audio.transcribe',
+                                     description="Transcribe recorded utterances to JSONL")
+    parser.add_argument('output', help="JSONL file to append results to; finished files are skipped")
+    parser.add_argument('paths', nargs='+', help="Audio files, or directories to search for them")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument('-b', '--backend', default='google', choices=sorted(default_backends()),
+                        help="Recognition backend (default: google)")
+    parser.add_argument('-l', '--language', default='en-IN', help="Recognition language (default: en-IN)")
+    parser.add_argument('--no-vad', action='store_true', help="Don't trim silence before recognition")
+    parser.add_argument('--restart', action='store_true', help="Transcribe files that already have results")
+    args = parser.parse_args(argv)
+
+    paths = find_audio_files(args.paths)
+    finished = set() if args.restart else read_finished(args.output)
+    total = sum(1 for path in paths if path not in finished)
+
+    try:
+        results = transcribe_files(paths, args.output, args.workers, args.backend, args.language,
+                                   not args.no_vad, not args.restart)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+    print(f"Transcribing {total} of {len(paths)} files")
+
+    counts = {}
+    start = time.perf_counter()
+    for n, record in enumerate(results, 1):
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+        detail = record['text'] if record['status'] == 'ok' else record['error'] or record['status']
+        print(f"[{n}/{total}] {record['path']}: {detail}")
+
+    elapsed = time.perf_counter() - start
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items())) or "nothing to do"
+    print(f"Finished in {elapsed:.1f}s: {summary}")
+    return 1 if counts.get('error') else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
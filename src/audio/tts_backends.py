@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Speech synthesis backends for TextToSpeech
+Part of the audio module
+
+A backend turns text into encoded audio bytes that pygame can decode. The
+online gTTS backend returns MP3; the offline espeak-ng backend returns WAV.
+"""
+
+import shutil
+import subprocess
+import time
+from typing import Dict, Iterator, List, Optional
+
+from audio.tts_http import ChunkFetcher
+
+
+class SynthesisBackend:
+    """Base class for speech synthesis engines"""
+
+    name = 'base'
+
+    def available(self) -> bool:
+        """Check if the engine can be used on this machine"""
+        return True
+
+    def supports(self, language: str) -> bool:
+        """Check if the engine can speak a language code"""
+        return True
+
+    def list_voices(self, language: Optional[str] = None) -> List[str]:
+        """
+        List voice identifiers accepted as voice_id
+
+        Args:
+            language (str, optional): Only list voices for this language code
+
+        Returns:
+            list: Voice identifiers; a numeric voice_id indexes into this list
+        """
+        return []
+
+    def resolve_voice(self, voice_id: Optional[str], language: str) -> Optional[str]:
+        """
+        Map a voice_id onto one of the engine's voices
+
+        Voice ids are specific to an engine: TextToSpeech only passes one to
+        the backend it was chosen for, never to a fallback.
+
+        Args:
+            voice_id (str, optional): Voice name, or an index into list_voices(language)
+            language (str): Language code
+
+        Returns:
+            str: Engine voice, or None for the engine's default
+        """
+        if voice_id is None:
+            return None
+        voice_id = str(voice_id)
+        if voice_id.isdigit():
+            voices = self.list_voices(language)
+            index = int(voice_id)
+            return voices[index] if index < len(voices) else None
+        return voice_id
+
+    def synthesize(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                   deadline: Optional[float] = None) -> bytes:
+        """
+        Convert text to encoded audio
+
+        Args:
+            text (str): Text to convert to speech
+            language (str): Language code
+            slow (bool): Speech speed
+            voice_id (str, optional): Voice identifier
+            deadline (float, optional): time.monotonic() value by which to give up
+
+        Returns:
+            bytes: Encoded audio
+
+        Raises:
+            TimeoutError: When the deadline passes first
+        """
+        raise NotImplementedError
+
+    def stream(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+               deadline: Optional[float] = None) -> Iterator[bytes]:
+        """Yield encoded audio in playable pieces; the whole clip unless overridden"""
+        yield self.synthesize(text, language, slow, voice_id, deadline)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class GTTSBackend(SynthesisBackend):
+    """Online Google Translate TTS, returning MP3"""
+
+    name = 'gtts'
+
+    # Regional Google hosts give different accents; these are the voices
+    ACCENTS = {
+        'en': ['com', 'com.au', 'co.uk', 'us', 'ca', 'co.in', 'ie', 'co.za', 'com.ng'],
+        'fr': ['fr', 'ca'],
+        'pt': ['com.br', 'pt'],
+        'es': ['com.mx', 'es', 'us'],
+    }
+
+    def __init__(self, fetcher: ChunkFetcher):
+        """
+        Initialize the backend
+
+        Args:
+            fetcher (ChunkFetcher): Fetcher used for all requests
+        """
+        self.fetcher = fetcher
+
+    def list_voices(self, language: Optional[str] = None) -> List[str]:
+        if language is None:
+            return sorted({tld for accents in self.ACCENTS.values() for tld in accents})
+        return list(self.ACCENTS.get(language, []))
+
+    def synthesize(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                   deadline: Optional[float] = None) -> bytes:
+        tld = self.resolve_voice(voice_id, language) or 'com'
+        return self.fetcher.fetch(text, language, slow, tld, deadline)
+
+    def stream(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+               deadline: Optional[float] = None) -> Iterator[bytes]:
+        tld = self.resolve_voice(voice_id, language) or 'com'
+        return self.fetcher.stream(text, language, slow, tld, deadline)
+
+    def __repr__(self) -> str:
+        return f"GTTSBackend({self.fetcher!r})"
+
+
+class EspeakBackend(SynthesisBackend):
+    """Offline synthesis with the espeak-ng command line tool, returning WAV"""
+
+    name = 'espeak'
+
+    # Language codes whose espeak-ng voice has a different name
+    LANGUAGE_VOICES = {
+        'zh': 'cmn',
+        'no': 'nb',
+    }
+    VARIANTS = ['', '+m1', '+m2', '+m3', '+f1', '+f2', '+f3', '+f4']
+
+    def __init__(self, executable: Optional[str] = None, rate: int = 175, slow_rate: int = 120,
+                 timeout: float = 30.0):
+        """
+        Initialize the backend
+
+        Args:
+            executable (str, optional): Path to espeak-ng. Searched on PATH if None
+            rate (int): Words per minute at normal speed
+            slow_rate (int): Words per minute for slow speech
+            timeout (float): Seconds to allow espeak-ng to run
+        """
+        self.executable = executable or shutil.which('espeak-ng') or shutil.which('espeak')
+        self.rate = rate
+        self.slow_rate = slow_rate
+        self.timeout = timeout
+        self._languages = None
+
+    def available(self) -> bool:
+        return self.executable is not None
+
+    def _installed_languages(self) -> List[str]:
+        """Language names of the installed espeak-ng voices"""
+        if self._languages is None:
+            languages = []
+            if self.available():
+                try:
+                    result = subprocess.run([self.executable, '--voices'], capture_output=True,
+                                            timeout=self.timeout, check=True)
+                    # Columns: Pty Language Age/Gender VoiceName File Other Languages
+                    for line in result.stdout.decode('utf-8', 'replace').splitlines()[1:]:
+                        columns = line.split()
+                        if len(columns) > 1:
+                            languages.append(columns[1])
+                except (OSError, subprocess.SubprocessError):
+                    pass
+            self._languages = languages
+        return self._languages
+
+    def _voice_for(self, language: str) -> str:
+        return self.LANGUAGE_VOICES.get(language, language)
+
+    def supports(self, language: str) -> bool:
+        voice = self._voice_for(language)
+        return any(name == voice or name.startswith(voice + '-') for name in self._installed_languages())
+
+    def list_voices(self, language: Optional[str] = None) -> List[str]:
+        if language is None:
+            names = self._installed_languages()
+        else:
+            voice = self._voice_for(language)
+            names = [n for n in self._installed_languages() if n == voice or n.startswith(voice + '-')]
+        return [name + variant for name in names for variant in self.VARIANTS]
+
+    def synthesize(self, text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                   deadline: Optional[float] = None) -> bytes:
+        if not self.available():
+            raise RuntimeError("espeak-ng is not installed")
+
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise TimeoutError("espeak-ng synthesis did not finish before its deadline")
+
+        voice = self.resolve_voice(voice_id, language) or self._voice_for(language)
+        command = [self.executable, '--stdout', '--stdin', '-b', '1',
+                   '-v', voice, '-s', str(self.slow_rate if slow else self.rate)]
+        try:
+            result = subprocess.run(command, input=text.encode('utf-8'), capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise TimeoutError("espeak-ng synthesis did not finish before its deadline")
+        if result.returncode != 0 or not result.stdout:
+            error = result.stderr.decode('utf-8', 'replace').strip()
+            raise RuntimeError(f"espeak-ng failed: {error or 'no audio produced'}")
+        return result.stdout
+
+    def __repr__(self) -> str:
+        return f"EspeakBackend(executable={self.executable!r})"
+
+
+def default_backends(fetcher: ChunkFetcher) -> Dict[str, SynthesisBackend]:
+    """
+    Build the standard backend registry
+
+    Args:
+        fetcher (ChunkFetcher): Fetcher for the gTTS backend
+
+    Returns:
+        dict: Backend name to backend
+    """
+    backends = [GTTSBackend(fetcher), EspeakBackend()]
+    return {backend.name: backend for backend in backends}
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+SynthesisCache class for persistent, content-addressed TTS audio caching
+Part of the audio module
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'krishna', 'tts'
+)
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Temporary files from put() older than this were left by a crashed writer
+STALE_PART_SECONDS = 3600
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so equivalent utterances share one cache entry
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        str: NFC-normalized text with collapsed whitespace
+    """
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+class SynthesisCache:
+    """
+    On-disk audio cache keyed on synthesis parameters with LRU eviction
+
+    Entries hold whatever the backend produced (MP3 from gTTS, WAV from
+    espeak), so they get a neutral suffix; pygame tells the formats apart by
+    their content. The size budget is kept per instance: other instances or
+    processes sharing the directory are only counted when an instance loads
+    its index, so together they can exceed max_bytes until the next start.
+    """
+
+    SUFFIX = '.audio'
+    # Suffix of entries written before WAV audio was cached, renamed on load
+    LEGACY_SUFFIX = '.mp3'
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initialize the cache and index any entries already on disk
+
+        Args:
+            cache_dir (str, optional): Directory for cached audio. Uses DEFAULT_CACHE_DIR if None
+            max_bytes (int): Total size budget; least recently used entries are evicted past it
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU order from file modification times, removing stale temporary files"""
+        found = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if name.endswith('.part'):
+                    # Left by a writer that crashed between writing and renaming
+                    if now - os.stat(path).st_mtime > STALE_PART_SECONDS:
+                        os.unlink(path)
+                    continue
+                if name.endswith(self.LEGACY_SUFFIX):
+                    name = name[:-len(self.LEGACY_SUFFIX)] + self.SUFFIX
+                    os.replace(path, os.path.join(self.cache_dir, name))
+                    path = os.path.join(self.cache_dir, name)
+                if not name.endswith(self.SUFFIX):
+                    continue
+                st = os.stat(path)
+            except OSError:
+                continue
+            found.append((st.st_mtime, name[:-len(self.SUFFIX)], st.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def make_key(text: str, language: str, slow: bool, voice_id: Optional[str] = None,
+                 backend: Optional[str] = None) -> str:
+        """
+        Build the content address for a synthesis request
+
+        Args:
+            text (str): Text to be spoken
+            language (str): Language code
+            slow (bool): Speech speed
+            voice_id (str, optional): Voice identifier
+            backend (str, optional): Name of the synthesis backend
+
+        Returns:
+            str: Hex digest identifying the audio
+        """
+        payload = json.dumps([normalize_text(text), language, bool(slow), voice_id, backend],
+                             ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def get_path(self, key: str) -> Optional[str]:
+        """
+        Look up a cached entry and mark it as recently used
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            str: Path to the cached audio, or None on a miss
+        """
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            if not os.path.exists(path):
+                # Removed behind our back
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        try:
+            os.utime(path)  # Persist recency for the next process
+        except OSError:
+            pass
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read a cached entry
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            bytes: Cached audio data, or None on a miss
+        """
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            # Evicted or replaced since the lookup
+            with self._lock:
+                self.hits -= 1
+                self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store audio for a key, evicting old entries to stay within budget
+
+        Args:
+            key (str): Key from make_key()
+            data (bytes): Encoded audio
+        """
+        if not data or len(data) > self.max_bytes:
+            return
+
+        # Write to a temporary name and rename so readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under budget (lock held)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    os.unlink(self._path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of cached audio in bytes"""
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"SynthesisCache(dir='{self.cache_dir}', entries={len(self)}, bytes={self._total_bytes})"
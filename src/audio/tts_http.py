@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+ChunkFetcher class for fetching Google TTS audio chunk by chunk
+Part of the audio module
+
+gTTS splits long text into chunks of at most 100 characters and downloads
+them one after another, opening a new connection for each. ChunkFetcher
+reuses gTTS's tokenizer and request packaging but sends the chunk requests
+itself over one pooled keep-alive session, so they can run concurrently,
+skip repeated TLS handshakes and be pointed at a different endpoint (e.g.
+a local mock server).
+
+Each chunk request can be bounded by a deadline. A request still outstanding
+after the usual (percentile) latency gets a hedged duplicate, the first
+answer wins, and failed requests are retried with jittered exponential
+backoff while the deadline allows. Every request first passes the shared
+AdaptiveLimiter, which slows all fetchers down when Google starts throttling.
+"""
+
+import base64
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from gtts import gTTS
+from gtts.tts import gTTSError
+from gtts.utils import _translate_url
+
+from audio.rate_limit import AdaptiveLimiter, get_limiter
+
+_AUDIO_PATTERN = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5.0, 30.0)  # (connect, read) seconds
+
+
+class ChunkFetcher:
+    """Fetches the chunks of a gTTS request concurrently, preserving their order"""
+
+    def __init__(self, max_workers: int = 4, url: Optional[str] = None,
+                 timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+                 verify: bool = True, pool_size: int = DEFAULT_POOL_SIZE, max_retries: int = 2,
+                 retry_base_delay: float = 0.1, retry_max_delay: float = 2.0,
+                 hedge_percentile: Optional[float] = 95.0, hedge_min_samples: int = 20,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        """
+        Initialize the fetcher
+
+        Args:
+            max_workers (int): Maximum chunks downloaded at once; 1 fetches serially
+            url (str, optional): TTS endpoint overriding the Google Translate URL
+            timeout (float or tuple, optional): Request timeout in seconds, or a
+                (connect, read) tuple. Waits forever if None
+            verify (bool): Verify TLS certificates
+            pool_size (int): Keep-alive connections kept open per host
+            max_retries (int): Retries of a failed chunk request (connection errors, 429 and 5xx)
+            retry_base_delay (float): Backoff before the first retry; doubles per retry, with full jitter
+            retry_max_delay (float): Upper bound for the retry backoff
+            hedge_percentile (float, optional): Send a duplicate request once one has been
+                outstanding longer than this latency percentile. Disabled if None
+            hedge_min_samples (int): Latency samples needed before hedging starts
+            limiter (AdaptiveLimiter, optional): Request pacing. Uses the process-wide limiter if None
+        """
+        self.max_workers = max(1, max_workers)
+        self.url = url
+        self.timeout = timeout
+        self.verify = verify
+        self.pool_size = max(1, pool_size)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.limiter = limiter or get_limiter()
+        self.hedged_requests = 0
+        self.retried_requests = 0
+        self._latencies = deque(maxlen=200)
+        self._latency_lock = threading.Lock()
+
+        # One session for every request so connections (and their TLS
+        # handshakes) are reused across chunks and utterances
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._executor = None
+        if self.max_workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tts-chunk')
+        # Separate pool for individual sends so chunk tasks can wait on them without deadlocking
+        self._send_executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='tts-send')
+
+    def prepare(self, text: str, language: str, slow: bool,
+                tld: str = 'com') -> Tuple[gTTS, List[requests.PreparedRequest]]:
+        """
+        Tokenize text and build one HTTP request per chunk
+
+        Args:
+            text (str): Text to convert to speech
+            language (str): Language code
+            slow (bool): Speech speed
+            tld (str): Google Translate domain, which selects the accent
+
+        Returns:
+            tuple: The gTTS object and its prepared chunk requests, in order
+        """
+        tts = gTTS(text=text, tld=tld, lang=language, slow=slow)
+        prepared = tts._prepare_requests()
+        if self.url:
+            for request in prepared:
+                request.prepare_url(self.url, None)
+        return tts, prepared
+
+    def fetch_chunk(self, tts: gTTS, request: requests.PreparedRequest,
+                    deadline: Optional[float] = None) -> bytes:
+        """
+        Fetch one chunk's audio, hedging slow requests and retrying failed ones
+
+        Args:
+            tts (gTTS): Object the request was prepared from, used for error messages
+            request (requests.PreparedRequest): Chunk request
+            deadline (float, optional): time.monotonic() value by which to give up
+
+        Returns:
+            bytes: MP3 audio for the chunk
+
+        Raises:
+            gTTSError: When the request fails or the response has no audio
+            TimeoutError: When the deadline passes first
+        """
+        attempt = 0
+        while True:
+            try:
+                return self._hedged_send(tts, request, deadline)
+            except gTTSError as e:
+                if attempt >= self.max_retries or not self._retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                self.retried_requests += 1
+
+    @staticmethod
+    def _retryable(error: gTTSError) -> bool:
+        """Connection failures, throttling and server errors are worth retrying"""
+        if error.rsp is None:
+            return True
+        return error.rsp.status_code == 429 or error.rsp.status_code >= 500
+
+    def _hedged_send(self, tts: gTTS, request: requests.PreparedRequest, deadline: Optional[float]) -> bytes:
+        """Send a request, adding a duplicate if it runs past the hedge delay"""
+        hedge_after = self._hedge_delay()
+        if deadline is None and hedge_after is None:
+            return self._send(tts, request, deadline)
+
+        pending = {self._send_executor.submit(self._send, tts, request, deadline)}
+        if hedge_after is not None:
+            done, pending = wait(pending, timeout=self._remaining(deadline, hedge_after))
+            if done:
+                return done.pop().result()
+            if deadline is None or time.monotonic() < deadline:
+                pending.add(self._send_executor.submit(self._send, tts, request, deadline))
+                self.hedged_requests += 1
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED)
+            if not done:
+                break  # Deadline passed; abandon whatever is still in flight
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError("TTS request did not finish before its deadline")
+
+    def _send(self, tts: gTTS, request: requests.PreparedRequest, deadline: Optional[float]) -> bytes:
+        """Send one chunk request through the rate limiter and decode its audio"""
+        if not self.limiter.acquire(self._remaining(deadline)):
+            raise TimeoutError("TTS request did not finish before its deadline")
+
+        start = time.monotonic()
+        response = None
+        success = False
+        try:
+            settings = self.session.merge_environment_settings(request.url, {}, None, self.verify, None)
+            response = self.session.send(request, timeout=self._timeout_for(deadline), **settings)
+            response.raise_for_status()
+            audio = self._decode(tts, response)
+            success = True
+        except requests.exceptions.HTTPError:
+            raise gTTSError(tts=tts, response=response)
+        except requests.exceptions.RequestException:
+            raise gTTSError(tts=tts)
+        finally:
+            throttled = response is not None and (response.status_code == 429 or response.status_code >= 500)
+            self.limiter.release(success, throttled, self._retry_after(response) if throttled else None)
+
+        with self._latency_lock:
+            self._latencies.append(time.monotonic() - start)
+        return audio
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Seconds from a Retry-After header, if given as a number"""
+        value = response.headers.get('Retry-After', '')
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Latency percentile after which a request gets hedged, once enough samples exist"""
+        if self.hedge_percentile is None:
+            return None
+        with self._latency_lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(self.hedge_percentile / 100.0 * len(latencies)))
+        return latencies[index]
+
+    @staticmethod
+    def _remaining(deadline: Optional[float], cap: Optional[float] = None) -> Optional[float]:
+        """Seconds left until deadline, optionally capped"""
+        if deadline is None:
+            return cap
+        remaining = max(0.0, deadline - time.monotonic())
+        return remaining if cap is None else min(remaining, cap)
+
+    def _timeout_for(self, deadline: Optional[float]):
+        """Request timeout shortened to what is left of the deadline"""
+        if deadline is None:
+            return self.timeout
+        remaining = max(0.001, deadline - time.monotonic())
+        if self.timeout is None:
+            return remaining
+        if isinstance(self.timeout, tuple):
+            return tuple(min(t, remaining) for t in self.timeout)
+        return min(self.timeout, remaining)
+
+    @staticmethod
+    def _decode(tts: gTTS, response: requests.Response) -> bytes:
+        """Extract the base64 audio from a batchexecute response"""
+        audio = []
+        for line in response.iter_lines(chunk_size=1024):
+            decoded_line = line.decode('utf-8')
+            if 'jQ1olc' not in decoded_line:
+                continue
+            match = _AUDIO_PATTERN.search(decoded_line)
+            if not match:
+                raise gTTSError(tts=tts, response=response)
+            audio.append(base64.b64decode(match.group(1).encode('ascii')))
+
+        if not audio:
+            raise gTTSError(tts=tts, response=response)
+        return b''.join(audio)
+
+    def stream(self, text: str, language: str, slow: bool, tld: str = 'com',
+               deadline: Optional[float] = None) -> Iterator[bytes]:
+        """
+        Yield MP3 audio chunk by chunk, in order
+
+        Later chunks are downloaded while earlier ones are being consumed.
+
+        Args:
+            text (str): Text to convert to speech
+            language (str): Language code
+            slow (bool): Speech speed
+            tld (str): Google Translate domain, which selects the accent
+            deadline (float, optional): time.monotonic() value by which to give up
+
+        Yields:
+            bytes: MP3 audio for each chunk
+        """
+        tts, prepared = self.prepare(text, language, slow, tld)
+        if self._executor is None or len(prepared) == 1:
+            for request in prepared:
+                yield self.fetch_chunk(tts, request, deadline)
+            return
+
+        futures = [self._executor.submit(self.fetch_chunk, tts, request, deadline) for request in prepared]
+        try:
+            for future in futures:
+                yield future.result(timeout=self._remaining(deadline))
+        finally:
+            # Consumer stopped early or a chunk failed
+            for future in futures:
+                future.cancel()
+
+    def fetch(self, text: str, language: str, slow: bool, tld: str = 'com',
+              deadline: Optional[float] = None) -> bytes:
+        """
+        Download the complete MP3 audio for text
+
+        Args:
+            text (str): Text to convert to speech
+            language (str): Language code
+            slow (bool): Speech speed
+            tld (str): Google Translate domain, which selects the accent
+            deadline (float, optional): time.monotonic() value by which to give up
+
+        Returns:
+            bytes: Concatenated MP3 audio of all chunks
+        """
+        return b''.join(self.stream(text, language, slow, tld, deadline))
+
+    def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        Open keep-alive connections to the TTS host ahead of the first request
+
+        Args:
+            connections (int, optional): Connections to open. Uses pool_size if None
+
+        Returns:
+            int: Number of connections successfully opened
+        """
+        parts = urlsplit(self.url or _translate_url(tld='com'))
+        base_url = f"{parts.scheme}://{parts.netloc}/"
+        count = min(connections or self.pool_size, self.pool_size)
+
+        def probe(_):
+            try:
+                # Any response means the connection is up and back in the pool
+                self.session.head(base_url, timeout=self.timeout, verify=self.verify)
+                return True
+            except requests.exceptions.RequestException:
+                return False
+
+        # Concurrent probes so each one needs its own connection
+        with ThreadPoolExecutor(max_workers=count, thread_name_prefix='tts-warmup') as executor:
+            return sum(executor.map(probe, range(count)))
+
+    def close(self) -> None:
+        """Close pooled connections and stop the download threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._send_executor.shutdown(wait=False)
+        self.session.close()
+
+    def __repr__(self) -> str:
+        return f"ChunkFetcher(max_workers={self.max_workers}, url={self.url!r})"
@@ -0,0 +1,739 @@
+#!/usr/bin/env python3
+"""
+Tests for the audio module
+Part of the tests
+
+ChunkFetcher is pointed at a local batchexecute stub server. The stub
+answers each chunk with the chunk's own text as its "audio", so the
+reassembled bytes show the chunk order, and it can delay or fail requests
+per chunk to exercise reassembly, back-off, hedging and deadlines.
+
+The batch language detection is checked against the per-text functions
+over a generated corpus; the cache, request coalescing, circuit breaker,
+lexicon, VAD and batch transcription are tested on their own.
+"""
+
+import base64
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+from gtts.tts import gTTSError
+
+import audio.language_processing as language_processing
+import audio.transcribe as transcribe
+from audio.circuit_breaker import CircuitBreaker
+from audio.language_processing import (HINGLISH_KEYWORDS, ScriptClassifier, detect_language, detect_languages,
+                                       segment_languages)
+from audio.lexicon import Lexicon
+from audio.rate_limit import AdaptiveLimiter
+from audio.single_flight import SingleFlight
+from audio.Speech_reco import VoiceActivityDetector
+from audio.stt_backends import RecognitionBackend
+from audio.text_to_speech import TextToSpeech
+from audio.tts_cache import STALE_PART_SECONDS, SynthesisCache
+from audio.tts_http import ChunkFetcher
+
+# Long enough for gTTS to split into several chunks of at most 100 characters
+LONG_TEXT = ' '.join(f"Sentence number {i} is here to make the text long enough to be split." for i in range(6))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """batchexecute endpoint answering with the chunk text, as scripted by the server"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        request = json.loads(urllib.parse.unquote_plus(body.split('f.req=')[1].rstrip('&')))
+        text = json.loads(request[0][0][1])[0]
+        delay, status = self.server.next_reply(text)
+        time.sleep(delay)
+
+        if status != 200:
+            self.send_response(status)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        audio = base64.b64encode(text.encode('utf-8')).decode('ascii')
+        out = (')]}\'\n\n123\n[["wrb.fr","jQ1olc","[\\"%s\\"]",null,null,null,"generic"]]\n' % audio).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+
+class _StubServer(ThreadingHTTPServer):
+    """Stub server recording every request; replies are scripted per attempt"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}/batchexecute"
+        self.requests = []
+        # Function of (chunk text, attempt number) returning (delay, status)
+        self.reply = lambda text, attempt: (0.0, 200)
+        self._lock = threading.Lock()
+
+    def next_reply(self, text: str):
+        with self._lock:
+            attempt = sum(1 for seen in self.requests if seen == text)
+            self.requests.append(text)
+        return self.reply(text, attempt)
+
+
+@pytest.fixture
+def server():
+    stub = _StubServer()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+def _fetcher(server: _StubServer, **kwargs) -> ChunkFetcher:
+    """Fetcher for the stub with its own limiter, so tests don't share pacing"""
+    kwargs.setdefault('limiter', AdaptiveLimiter(rate=1000.0, burst=100, concurrency=16))
+    kwargs.setdefault('hedge_percentile', None)
+    return ChunkFetcher(url=server.url, **kwargs)
+
+
+def _chunks(fetcher: ChunkFetcher, text: str):
+    """Chunk texts in order, as gTTS tokenizes them"""
+    tts, _ = fetcher.prepare(text, 'en', False)
+    return tts._tokenize(text)
+
+
+def test_chunks_reassembled_in_order(server):
+    fetcher = _fetcher(server, max_workers=8)
+    chunks = _chunks(fetcher, LONG_TEXT)
+    assert len(chunks) >= 4
+
+    # Later chunks answer first
+    delays = {chunk: 0.1 * (len(chunks) - i) for i, chunk in enumerate(chunks)}
+    server.reply = lambda text, attempt: (delays[text], 200)
+    start = time.monotonic()
+    audio = fetcher.fetch(LONG_TEXT, 'en', False)
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert audio == ''.join(chunks).encode('utf-8')
+    assert sorted(server.requests) == sorted(chunks)
+    # Concurrent: about the slowest chunk, not the sum of all of them
+    assert elapsed < sum(delays.values()) * 0.75
+
+
+def test_stream_yields_chunks_in_order(server):
+    fetcher = _fetcher(server, max_workers=4)
+    chunks = _chunks(fetcher, LONG_TEXT)
+    server.reply = lambda text, attempt: (0.05 * (len(chunks) - chunks.index(text)), 200)
+
+    streamed = list(fetcher.stream(LONG_TEXT, 'en', False))
+    fetcher.close()
+
+    assert streamed == [chunk.encode('utf-8') for chunk in chunks]
+
+
+def test_serial_fetch_matches_concurrent(server):
+    fetcher = _fetcher(server, max_workers=1)
+    chunks = _chunks(fetcher, LONG_TEXT)
+
+    audio = fetcher.fetch(LONG_TEXT, 'en', False)
+    fetcher.close()
+
+    assert audio == ''.join(chunks).encode('utf-8')
+    assert server.requests == chunks
+
+
+def test_throttled_chunk_backs_off_and_retries(server):
+    limiter = AdaptiveLimiter(rate=1000.0, burst=100, concurrency=16)
+    fetcher = _fetcher(server, max_workers=1, max_retries=3, retry_base_delay=0.01, limiter=limiter)
+    server.reply = lambda text, attempt: (0.0, 429 if attempt < 2 else 200)
+
+    assert fetcher.fetch('hello there', 'en', False) == b'hello there'
+    fetcher.close()
+
+    assert server.requests == ['hello there'] * 3
+    assert fetcher.retried_requests == 2
+    # The limiter saw the throttling and backed off
+    assert limiter.throttled >= 1
+    assert limiter.rate < 1000.0
+
+
+def test_throttling_gives_up_after_max_retries(server):
+    fetcher = _fetcher(server, max_workers=1, max_retries=2, retry_base_delay=0.01)
+    server.reply = lambda text, attempt: (0.0, 429)
+
+    with pytest.raises(gTTSError):
+        fetcher.fetch('hello there', 'en', False)
+    fetcher.close()
+
+    assert len(server.requests) == 3
+
+
+def test_client_error_not_retried(server):
+    fetcher = _fetcher(server, max_workers=1, max_retries=2, retry_base_delay=0.01)
+    server.reply = lambda text, attempt: (0.0, 400)
+
+    with pytest.raises(gTTSError):
+        fetcher.fetch('hello there', 'en', False)
+    fetcher.close()
+
+    assert server.requests == ['hello there']
+
+
+def test_slow_request_is_hedged(server):
+    fetcher = _fetcher(server, max_workers=1, hedge_percentile=50.0, hedge_min_samples=5)
+    # Fast requests set the latency percentile the hedge waits for
+    for i in range(5):
+        fetcher.fetch(f'warm up {i}', 'en', False)
+    assert fetcher.hedged_requests == 0
+
+    # The first attempt stalls; the duplicate answers straight away
+    server.reply = lambda text, attempt: (2.0 if attempt == 0 else 0.0, 200)
+    start = time.monotonic()
+    audio = fetcher.fetch('hedge me', 'en', False)
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert audio == b'hedge me'
+    assert fetcher.hedged_requests == 1
+    assert server.requests.count('hedge me') == 2
+    assert elapsed < 1.0
+
+
+def test_deadline_stops_waiting(server):
+    fetcher = _fetcher(server, max_workers=4)
+    server.reply = lambda text, attempt: (2.0, 200)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        fetcher.fetch(LONG_TEXT, 'en', False, deadline=time.monotonic() + 0.3)
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert elapsed < 1.5
+
+
+def test_deadline_stops_retrying(server):
+    fetcher = _fetcher(server, max_workers=1, max_retries=10, retry_base_delay=0.2, retry_max_delay=0.2)
+    server.reply = lambda text, attempt: (0.05, 503)
+
+    start = time.monotonic()
+    with pytest.raises((gTTSError, TimeoutError)):
+        fetcher.fetch('hello there', 'en', False, deadline=time.monotonic() + 0.5)
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert elapsed < 1.0
+    assert len(server.requests) < 11
+
+
+# Language detection
+
+# Pieces mixed into the detection corpus: English, Hinglish keywords and
+# sentences, several scripts with their marker letters, digits, punctuation
+# and the Unicode spaces str.split() separates words on
+_PIECES = [
+    'the', 'meeting', 'is', 'at', 'five', 'please', 'call', 'me', 'tomorrow',
+    'kya', 'hai', 'aap', 'kaise', 'ho', 'main', 'ghar', 'ja', 'raha', 'hoon', 'bahut', 'accha', 'yaar',
+    'chalo', 'kal', 'milte', 'hain', 'baje', 'thik',
+    'नमस्ते', 'आप', 'कैसे', 'हैं', '।',
+    'привет', 'як', 'справи', 'їжак', 'єнот', 'ђак', 'љубав',
+    'مرحبا', 'کیا', 'ہے', 'بات', 'ٹھیک', '،',
+    'שלום', 'γειά', 'σου', 'வணக்கம்', 'నమస్తే', 'ಹಲೋ', 'ഹലോ', 'ਸਤ', 'ਸ੍ਰੀ', 'નમસ્તે', 'ଓଡ଼ିଆ',
+    'বাংলা', 'অসমীয়া', 'ৰাজ্য', 'สวัสดี', '안녕하세요', '你好', 'こんにちは', '東京', 'Việt', 'Nam', 'phở',
+    '5', '10:30', '!', '?', '...', '-', '😀', 'café', 'naïve',
+]
+_SPACES = [' ', ' ', ' ', '  ', '\t', '\n', ' ', ' ', '　']
+
+
+def _corpus(size: int = 3000, seed: int = 17):
+    """Random mixes of the pieces, plus the edge cases"""
+    rng = random.Random(seed)
+    texts = ['', ' ', ' ', '123', '!!!', 'hai', 'HAI', 'Kya Haal Hai', 'नमस्ते', 'hello world']
+    for _ in range(size):
+        words = rng.choices(_PIECES, k=rng.randint(1, 12))
+        text = ''
+        for word in words:
+            text += word + rng.choice(_SPACES)
+        texts.append(text if rng.random() < 0.5 else text.strip())
+    return texts
+
+
+@pytest.fixture
+def tts(monkeypatch):
+    monkeypatch.setenv('SDL_AUDIODRIVER', 'dummy')
+    return TextToSpeech(use_cache=False)
+
+
+@pytest.mark.parametrize('block', [16384, 7, 1])
+def test_detect_languages_matches_scalar_detection(monkeypatch, block):
+    monkeypatch.setattr(language_processing, '_BLOCK_TEXTS', block)
+    classifier = ScriptClassifier(['en', 'hi', 'ru', 'uk', 'sr', 'ar', 'ur', 'he', 'el', 'ta', 'te', 'kn',
+                                   'ml', 'pa', 'gu', 'bn', 'as', 'th', 'ko', 'zh', 'ja', 'vi'])
+    corpus = _corpus(400 if block == 1 else 3000)
+
+    expected = [detect_language(text, classifier, HINGLISH_KEYWORDS, default='fr') for text in corpus]
+    assert detect_languages(corpus, classifier, HINGLISH_KEYWORDS, default='fr').tolist() == expected
+
+    # Markers of languages the classifier can't return fall back to the script's base language
+    narrow = ScriptClassifier(['en', 'hi', 'ru', 'ar'], script_languages={'Devanagari': 'mr'})
+    expected = [detect_language(text, narrow, HINGLISH_KEYWORDS) for text in corpus]
+    assert detect_languages(corpus, narrow, HINGLISH_KEYWORDS).tolist() == expected
+
+
+def test_batch_detection_matches_auto_detect_language(tts):
+    corpus = _corpus()
+    assert tts.hinglish_model is not None
+
+    # With the Hinglish model
+    expected = [tts.auto_detect_language(text) for text in corpus]
+    assert 'hi' in expected and 'en' in expected
+    assert tts.detect_languages(corpus).tolist() == expected
+
+    # With the keywords, as when the model can't be loaded
+    tts.hinglish_model = None
+    tts.current_language = 'de'
+    expected = [tts.auto_detect_language(text) for text in corpus]
+    assert tts.detect_languages(corpus).tolist() == expected
+
+    assert tts.detect_languages([]).tolist() == []
+
+
+def test_script_classifier():
+    classifier = ScriptClassifier(['en', 'hi', 'ru', 'uk', 'ar', 'ur', 'zh', 'ja'])
+
+    assert classifier.detect('नमस्ते दुनिया') == 'hi'
+    assert classifier.detect('Hello world') is None
+    assert classifier.detect('12345 !?') is None
+    assert classifier.detect('привет мир') == 'ru'
+    assert classifier.detect('привіт світ') == 'uk'
+    assert classifier.detect('مرحبا') == 'ar'
+    assert classifier.detect('کیا بات ہے') == 'ur'
+    assert classifier.detect('東京') == 'zh'
+    assert classifier.detect('東京へようこそ') == 'ja'
+    # Serbian markers, but Serbian can't be returned: the base Cyrillic language
+    assert classifier.detect('љубав') == 'ru'
+    # Thai is not among the languages
+    assert classifier.detect('สวัสดี') is None
+
+    # A script needs threshold of the letters to decide
+    assert classifier.detect('Meeting at the office नमस्ते') is None
+    assert ScriptClassifier(['hi'], threshold=0.1).detect('Meeting at the office नमस्ते') == 'hi'
+    # Too few letters
+    assert ScriptClassifier(['hi'], min_chars=5).detect('नम') is None
+    # Overrides for shared scripts
+    assert ScriptClassifier(['hi', 'mr'], script_languages={'Devanagari': 'mr'}).detect('नमस्ते') == 'mr'
+
+
+def test_segment_languages():
+    classifier = ScriptClassifier(['en', 'hi'])
+
+    def segments(text):
+        return segment_languages(text, classifier, HINGLISH_KEYWORDS)
+
+    assert segments('Your meeting हैं at 5 pm') == [('en', 'Your meeting'), ('hi', 'हैं'), ('en', 'at 5 pm')]
+    # Romanized runs can be Hinglish and merge with the Devanagari next to them
+    assert segments('नमस्ते aap kaise hain') == [('hi', 'नमस्ते aap kaise hain')]
+    # Numbers and punctuation join the run before them; leading ones the first run
+    assert segments('10:30 meeting, नमस्ते!') == [('en', '10:30 meeting,'), ('hi', 'नमस्ते!')]
+    assert segments('42 !') == [('en', '42 !')]
+    assert segments('   ') == []
+    assert segments('Hello there') == [('en', 'Hello there')]
+
+
+def test_lexicon_matches_words_and_phrases():
+    lexicon = Lexicon(['kya', 'hai', 'kya baat hai', 'baat hai', 'thik hai', 'café', 'Bahut Accha', ''])
+
+    assert lexicon.words == {'kya', 'hai'}
+    assert lexicon.phrases == {'kya baat hai', 'baat hai', 'thik hai', 'bahut accha'}
+    assert 'baat hai' in lexicon and 'baat' not in lexicon
+    assert len(lexicon) == 6
+
+    words = 'arre kya baat hai bahut accha thik hai na'.split()
+    # Overlapping phrases all found, in order of their ends
+    assert lexicon.find_phrases(words) == [(1, 4), (2, 4), (4, 6), (6, 8)]
+    assert lexicon.match(words) == [False, True, True, True, True, True, True, True, False]
+    # Whole words only
+    assert lexicon.find_phrases('bbaat hai'.split()) == []
+    assert lexicon.find_phrases('baat haii'.split()) == []
+
+
+def test_lexicon_find_phrases_matches_brute_force():
+    rng = random.Random(5)
+    vocabulary = ['a', 'ab', 'b', 'ba', 'abc', 'c']
+    entries = {' '.join(rng.choices(vocabulary, k=rng.randint(2, 4))) for _ in range(30)}
+    lexicon = Lexicon(entries)
+    for _ in range(200):
+        words = rng.choices(vocabulary, k=rng.randint(0, 12))
+        expected = sorted(((first, stop) for first in range(len(words))
+                           for stop in range(first + 2, len(words) + 1)
+                           if ' '.join(words[first:stop]) in lexicon.phrases),
+                          key=lambda span: (span[1], -span[0]))
+        assert sorted(lexicon.find_phrases(words), key=lambda span: (span[1], -span[0])) == expected
+
+
+# Synthesis cache
+
+def test_cache_round_trip_and_key_normalization(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=1000)
+    key = cache.make_key('Hello   world\n', 'en', False)
+    # Whitespace and Unicode normalization give the same key; other parameters don't
+    assert key == cache.make_key('Hello world', 'en', False)
+    assert cache.make_key('café', 'fr', False) == cache.make_key('café', 'fr', False)
+    assert len({key, cache.make_key('Hello world', 'en', True), cache.make_key('Hello world', 'hi', False),
+                cache.make_key('Hello world', 'en', False, 'co.uk'),
+                cache.make_key('Hello world', 'en', False, backend='espeak')}) == 5
+
+    assert cache.get(key) is None
+    cache.put(key, b'audio')
+    assert cache.get(key) == b'audio'
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 1 and cache.size_bytes == 5
+
+    cache.put(key, b'longer audio')
+    assert len(cache) == 1 and cache.size_bytes == 12
+
+    # Empty or oversized data is not cached
+    cache.put('empty', b'')
+    cache.put('huge', b'x' * 1001)
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0 and cache.size_bytes == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=300)
+    for key in 'abc':
+        cache.put(key, key.encode() * 100)
+    cache.get('a')
+    cache.put('d', b'd' * 100)
+
+    assert cache.size_bytes == 300
+    assert cache.get('b') is None
+    assert [cache.get(key) is not None for key in 'acd'] == [True, True, True]
+    assert not os.path.exists(os.path.join(tmp_path, 'b' + SynthesisCache.SUFFIX))
+
+
+def test_cache_index_rebuilt_from_disk(tmp_path):
+    now = time.time()
+    for age, key in enumerate('cba'):
+        path = os.path.join(tmp_path, key + SynthesisCache.SUFFIX)
+        with open(path, 'wb') as f:
+            f.write(key.encode() * 100)
+        os.utime(path, (now - age * 10, now - age * 10))
+    # Entries from before the neutral suffix are kept under the new one
+    legacy = os.path.join(tmp_path, 'd' + SynthesisCache.LEGACY_SUFFIX)
+    with open(legacy, 'wb') as f:
+        f.write(b'd' * 100)
+    os.utime(legacy, (now - 100, now - 100))
+    # Temporary files of crashed writers are removed once stale
+    for name, age in (('stale.part', STALE_PART_SECONDS + 60), ('fresh.part', 0)):
+        path = os.path.join(tmp_path, name)
+        open(path, 'wb').close()
+        os.utime(path, (now - age, now - age))
+
+    cache = SynthesisCache(str(tmp_path), max_bytes=300)
+
+    # Oldest by modification time evicted first: the legacy entry
+    assert len(cache) == 3 and cache.size_bytes == 300
+    assert sorted(os.listdir(tmp_path)) == ['a.audio', 'b.audio', 'c.audio', 'fresh.part']
+    assert cache.get('a') == b'a' * 100
+
+    cache.put('e', b'e' * 100)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+
+
+# Request coalescing
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def synthesize():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b'audio'
+
+    results = []
+
+    def caller():
+        results.append(flight.do('key', synthesize))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flight.coalesced < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [(b'audio', False)] + [(b'audio', True)] * 3
+    assert flight.in_flight() == 0
+    # Finished calls are not remembered
+    assert flight.do('key', lambda: b'again') == (b'again', False)
+
+
+def _lead_in_background(flight: SingleFlight, func):
+    """Start a leader running func and wait until it is in flight"""
+    errors = []
+
+    def leader():
+        try:
+            flight.do('key', func)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.01)
+    return thread, errors
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError('backend failed')
+
+    thread, errors = _lead_in_background(flight, fail)
+    threading.Timer(0.1, release.set).start()
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: b'unused')
+    thread.join(5)
+    assert isinstance(errors[0], ValueError)
+
+
+def test_single_flight_follower_timeout():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread, _ = _lead_in_background(flight, lambda: release.wait(5))
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        flight.do('key', lambda: b'unused', timeout=0.1)
+    assert time.monotonic() - start < 1.0
+    release.set()
+    thread.join(5)
+
+
+def test_single_flight_retries_after_leader_timeout():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def time_out():
+        release.wait(5)
+        raise TimeoutError('leader deadline')
+
+    thread, errors = _lead_in_background(flight, time_out)
+    threading.Timer(0.1, release.set).start()
+    # The follower has time left, so it runs the call itself
+    assert flight.do('key', lambda: b'audio', timeout=5) == (b'audio', False)
+    thread.join(5)
+    assert isinstance(errors[0], TimeoutError)
+
+
+# Circuit breaker
+
+def test_breaker_trips_on_consecutive_failures():
+    breaker = CircuitBreaker('test', failure_threshold=3, min_calls=100, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.trip_count == 1
+
+    breaker.reset()
+    assert breaker.allow_request()
+    assert breaker.stats()['calls'] == 0
+
+
+def test_breaker_trips_on_error_rate():
+    breaker = CircuitBreaker('test', failure_threshold=10, error_rate_threshold=0.5, window_size=10,
+                             min_calls=6, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_success(0.1)
+        breaker.record_failure()
+    # Half the calls failed, but too few calls to judge
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    assert breaker.error_rate == 0.5
+
+
+def test_breaker_slow_calls_scale_with_chunks():
+    breaker = CircuitBreaker('test', failure_threshold=2, slow_call_seconds=1.0, min_calls=100, reset_timeout=60)
+    breaker.record_success(3.5, chunks=4)
+    breaker.record_success(1.5)
+    assert breaker.allow_request()
+    assert breaker.stats()['error_rate'] == 0.5
+    assert breaker.latency_percentile(50) == 3.5
+
+    breaker.record_success(5.0, chunks=4)
+    assert not breaker.allow_request()
+
+    unlimited = CircuitBreaker('test', failure_threshold=1, slow_call_seconds=None)
+    unlimited.record_success(1000.0)
+    assert unlimited.allow_request()
+
+
+def test_breaker_probe_closes_after_recovery():
+    healthy = threading.Event()
+
+    def probe():
+        if not healthy.is_set():
+            raise ConnectionError('still down')
+
+    breaker = CircuitBreaker('test', probe=probe, failure_threshold=1, reset_timeout=0.05,
+                             max_reset_timeout=0.1)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.3)
+    assert not breaker.allow_request()
+
+    healthy.set()
+    deadline = time.monotonic() + 5
+    while not breaker.allow_request() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert breaker.allow_request()
+    assert breaker.trip_count == 1
+
+
+# Voice activity detection
+
+def _utterance(sample_rate: int = 16000):
+    """Quiet noise, a second of voiced sound with a long pause inside, quiet noise"""
+    rng = np.random.default_rng(3)
+
+    def voiced(seconds):
+        t = np.arange(int(sample_rate * seconds)) / sample_rate
+        return sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6)) * 6000
+
+    def quiet(seconds):
+        return rng.normal(0, 60, int(sample_rate * seconds))
+
+    samples = np.concatenate([quiet(1.0), voiced(0.5), quiet(1.5), voiced(0.5), quiet(1.0)])
+    return sr.AudioData(samples.astype('<i2').tobytes(), sample_rate, 2)
+
+
+def test_vad_trim_drops_silence_and_keeps_speech():
+    vad = VoiceActivityDetector()
+    audio = _utterance()
+    trimmed = vad.trim(audio)
+
+    seconds = len(trimmed.frame_data) / (trimmed.sample_rate * trimmed.sample_width)
+    # Both voiced parts, their padding and at most max_pause_ms of the pause between them
+    assert 1.0 <= seconds <= 1.0 + (2 * 2 * vad.padding_ms + vad.max_pause_ms) / 1000.0 + 0.1
+    # Every loud sample survives
+    loud = [np.count_nonzero(np.abs(np.frombuffer(data, dtype='<i2')) > 1000)
+            for data in (audio.frame_data, trimmed.frame_data)]
+    assert loud[1] == loud[0]
+
+
+def test_vad_trim_leaves_silence_alone():
+    rng = np.random.default_rng(4)
+    silence = sr.AudioData(rng.normal(0, 60, 16000).astype('<i2').tobytes(), 16000, 2)
+    assert VoiceActivityDetector().trim(silence) is silence
+
+
+# Batch transcription
+
+class _LengthBackend(RecognitionBackend):
+    """Recognizes any audio as its length in samples"""
+
+    name = 'length'
+
+    def recognize(self, audio: sr.AudioData, language: str) -> str:
+        samples = len(audio.frame_data) // audio.sample_width
+        if samples == 0:
+            raise sr.UnknownValueError()
+        return str(samples)
+
+
+def _write_wav(path: str, samples: int) -> None:
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(b'\x00\x00' * samples)
+
+
+def test_read_finished_skips_cut_and_failed_lines(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    assert transcribe.read_finished(str(output)) == set()
+    output.write_text('{"path": "a.wav", "status": "ok"}\n'
+                      '{"path": "b.wav", "status": "no_speech"}\n'
+                      '{"path": "c.wav", "status": "error"}\n'
+                      '[1, 2]\n'
+                      '{"path": "d.wav", "sta', encoding='utf-8')
+    assert transcribe.read_finished(str(output)) == {'a.wav', 'b.wav'}
+
+
+def test_transcribe_resumes_after_errors(tmp_path, monkeypatch):
+    # Worker processes are forked, so they see the patched registry
+    monkeypatch.setattr(transcribe, 'default_backends', lambda: {'length': _LengthBackend()})
+    paths = [str(tmp_path / f'{name}.wav') for name in ('one', 'two', 'empty', 'broken')]
+    _write_wav(paths[0], 100)
+    _write_wav(paths[1], 200)
+    _write_wav(paths[2], 0)
+    (tmp_path / 'broken.wav').write_bytes(b'not audio')
+    output = str(tmp_path / 'results.jsonl')
+
+    records = list(transcribe.transcribe_files(paths, output, workers=2, backend='length', use_vad=False))
+    statuses = {os.path.basename(r['path']): (r['status'], r['text']) for r in records}
+    assert statuses == {'one.wav': ('ok', '100'), 'two.wav': ('ok', '200'), 'empty.wav': ('no_speech', None),
+                        'broken.wav': ('error', None)}
+
+    # Interrupted mid-line; the next run starts on a new line and retries only the error
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('{"path": "')
+    _write_wav(paths[3], 300)
+    records = list(transcribe.transcribe_files(paths, output, workers=2, backend='length', use_vad=False))
+    assert [(r['path'], r['text']) for r in records] == [(paths[3], '300')]
+    assert transcribe.read_finished(output) == set(paths)
+
+    assert list(transcribe.transcribe_files(paths, output, workers=2, backend='length', use_vad=False)) == []
+    assert len(list(transcribe.transcribe_files(paths[:1], output, workers=1, backend='length', use_vad=False,
+                                                resume=False))) == 1
+
+
+def test_transcribe_rejects_unusable_backend(tmp_path):
+    with pytest.raises(ValueError):
+        transcribe.transcribe_files([], backend='nonexistent')
+    unavailable = [name for name, backend in transcribe.default_backends().items() if not backend.available()]
+    if unavailable:
+        with pytest.raises(ValueError):
+            transcribe.transcribe_files([], backend=unavailable[0])